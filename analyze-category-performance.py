@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """Analyze Search Console Performance by Category and Page"""
 
-import openpyxl
+import os
 import sys
 from pathlib import Path
 from statistics import mean
 
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.analytics_store import AnalyticsStore
+
 excel_file = Path("seach-console-perf/lescalculateurs.fr-Performance-on-Search-2026-05-02.xlsx")
 
 if not excel_file.exists():
@@ -80,25 +85,14 @@ categories = {
 }
 
 try:
-    wb = openpyxl.load_workbook(excel_file)
-    ws_pages = wb['Pages']
+    store = AnalyticsStore.ensure([excel_file])
     
     # Load all pages
-    all_pages = {}
-    for row in ws_pages.iter_rows(min_row=2, values_only=True):
-        if row[0] is None:
-            break
-        url = row[0]
-        clics = row[1] or 0
-        impr = row[2] or 0
-        ctr = row[3] or 0
-        pos = row[4] or 0
-        all_pages[url] = {
-            'clics': clics,
-            'impr': impr,
-            'ctr': ctr,
-            'pos': pos,
-        }
+    all_pages = store.table(['page', 'clicks', 'impressions', 'ctr', 'position'],
+                            store.mask(source=excel_file, dimension='page'))
+    page_urls = all_pages['page'].astype(str)
+    for key in ('clicks', 'impressions', 'ctr', 'position'):
+        all_pages[key] = np.nan_to_num(all_pages[key])
     
     print("\n" + "="*140)
     print("📊 CATEGORY PERFORMANCE ANALYSIS - lescalculateurs.fr")
@@ -112,10 +106,16 @@ try:
         matching_pages = []
         for url in urls:
             # Partial URL match (in case of truncation)
-            for full_url, data in all_pages.items():
-                if url in full_url or full_url.endswith(url.split('/')[-1]):
-                    matching_pages.append((full_url, data))
-                    break
+            hits = np.flatnonzero((np.char.find(page_urls, url) >= 0)
+                                  | np.char.endswith(page_urls, url.split('/')[-1]))
+            if len(hits):
+                i = hits[0]
+                matching_pages.append((page_urls[i], {
+                    'clics': all_pages['clicks'][i],
+                    'impr': all_pages['impressions'][i],
+                    'ctr': all_pages['ctr'][i],
+                    'pos': all_pages['position'][i],
+                }))
         
         if not matching_pages:
             print(f"❌ {category:30s} | No matching pages found")
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Analyze updated Search Console data (May 3, 2026) for COFIDIS integration planning"""
 
-import openpyxl
+import os
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.workbook import load_sheet, sheet_names
+
 print("\n" + "="*180)
 print("📊 COFIDIS AFFILIATION - Updated Search Console Analysis (May 3, 2026)")
 print("="*180 + "\n")
@@ -16,16 +20,14 @@ if not excel_file.exists():
     exit(1)
 
 try:
-    wb = openpyxl.load_workbook(excel_file)
-    print(f"✅ Loaded workbook with sheets: {wb.sheetnames}\n")
+    sheetnames = sheet_names(excel_file)
+    print(f"✅ Loaded workbook with sheets: {sheetnames}\n")
     
     # Get Pages sheet
-    if 'Pages' not in wb.sheetnames:
-        print("❌ 'Pages' sheet not found. Available sheets:", wb.sheetnames)
+    if 'Pages' not in sheetnames:
+        print("❌ 'Pages' sheet not found. Available sheets:", sheetnames)
         exit(1)
     
-    ws_pages = wb['Pages']
-    
     # Extract relevant pages for COFIDIS
     target_pages = {
         '/pages/pret': 'Simulateur Prêt Immobilier',
@@ -38,10 +40,7 @@ try:
     
     pages_data = {}
     
-    for row_idx, row in enumerate(ws_pages.iter_rows(min_row=2, values_only=True), start=2):
-        if not row or row[0] is None:
-            break
-        
+    for row_idx, row in enumerate(load_sheet(excel_file, 'Pages'), start=2):
         page_url = row[0]
         clics = row[1] or 0
         impr = row[2] or 0
@@ -120,15 +119,10 @@ try:
     print("🔍 SEARCH CONSOLE KEYWORDS - Credit/Financing Intent")
     print("="*180 + "\n")
     
-    if 'Requêtes' in wb.sheetnames:
-        ws_req = wb['Requêtes']
-        
+    if 'Requêtes' in sheetnames:
         credit_keywords = []
         
-        for row in ws_req.iter_rows(min_row=2, values_only=True):
-            if not row or row[0] is None:
-                break
-            
+        for row in load_sheet(excel_file, 'Requêtes'):
             query = str(row[0]).lower()
             clics = row[1] or 0
             impr = row[2] or 0
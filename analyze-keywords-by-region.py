@@ -1,26 +1,26 @@
 #!/usr/bin/env python3
 """Analyze Search Console keywords to identify regional opportunities + volume"""
 
-import openpyxl
+import os
+import sys
 from pathlib import Path
 import re
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.gazetteer import Gazetteer
+from lib.workbook import load_sheet
+
 # Load Search Console data
 excel_file = Path("seach-console-perf/lescalculateurs.fr-Performance-on-Search-2026-05-02.xlsx")
-wb = openpyxl.load_workbook(excel_file)
 
 print("\n" + "="*160)
 print("🔍 SEARCH CONSOLE - Analyse par Région + Détection des Pages Manquantes")
 print("="*160 + "\n")
 
 # Extract keywords sheet
-ws_req = wb['Requêtes']
-
 keywords = []
-for row in ws_req.iter_rows(min_row=2, values_only=True):
-    if row[0] is None:
-        break
+for row in load_sheet(excel_file, 'Requêtes'):
     query = row[0] or ''
     clics = row[1] or 0
     impr = row[2] or 0
@@ -62,31 +62,16 @@ print("\n\n" + "="*160)
 print("🗺️ KEYWORDS BY REGION DETECTED:")
 print("-" * 160)
 
-french_regions = {
-    # Major cities
-    'paris': 'Île-de-France', 'lyon': 'Auvergne-Rhône-Alpes', 'marseille': 'PACA', 'toulouse': 'Occitanie',
-    'bordeaux': 'Nouvelle-Aquitaine', 'lille': 'Hauts-de-France', 'nantes': 'Pays de la Loire',
-    'strasbourg': 'Alsace', 'montpellier': 'Occitanie', 'nice': 'PACA',
-    'rennes': 'Bretagne', 'reims': 'Champagne-Ardenne', 'rouen': 'Normandie',
-    'nancy': 'Lorraine', 'lens': 'Hauts-de-France', 'brest': 'Bretagne',
-    'lille': 'Hauts-de-France', 'saint-etienne': 'Auvergne-Rhône-Alpes',
-    'toulon': 'PACA', 'grenoble': 'Auvergne-Rhône-Alpes', 'angers': 'Pays de la Loire',
-    'dijon': 'Bourgogne-Franche-Comté', 'nîmes': 'Occitanie', 'clermont': 'Auvergne-Rhône-Alpes',
-    # Regions
-    'ile de france': 'Île-de-France', 'rhone alpes': 'Auvergne-Rhône-Alpes', 'alsace': 'Alsace',
-    'aquitaine': 'Nouvelle-Aquitaine', 'provence': 'PACA', 'bretagne': 'Bretagne',
-    # Departments - extract dept codes
-}
+# Places are recognised word by word with a gazetteer (regions, departments,
+# communes) compiled once into a trie and cached in .cache/gazetteer.json
+gazetteer = Gazetteer.load()
 
 regional_keywords = defaultdict(list)
 
 for kw in keywords:
-    found_region = None
-    for city_key, region in french_regions.items():
-        if city_key in kw['query']:
-            found_region = region
-            break
-    
+    kw['places'] = gazetteer.tag(kw['query'])
+    found_region = gazetteer.first_region(kw['places'])
+
     if found_region:
         regional_keywords[found_region].append(kw)
 
@@ -118,8 +103,7 @@ salary_regional = []
 for kw in keywords:
     if 'salaire' in kw['query'] or 'revenu' in kw['query']:
         # Check for regional/city terms
-        has_region = any(city in kw['query'] for city in ['paris', 'lyon', 'marseille', 'toulouse', 'bordeaux', 
-                                                            'lille', 'nantes', 'region', 'ile de france', 'alsace'])
+        has_region = bool(kw['places']) or 'region' in kw['query']
         if has_region or len(kw['query'].split()) >= 3:
             salary_regional.append(kw)
 
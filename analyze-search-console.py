@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Analyze Search Console Performance data - Full Diagnostic"""
 
-import openpyxl
+import os
 import sys
 from pathlib import Path
-from statistics import mean, stdev
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.analytics_store import AnalyticsStore
 
 excel_file = Path("seach-console-perf/lescalculateurs.fr-Performance-on-Search-2026-05-02.xlsx")
 
@@ -13,7 +17,16 @@ if not excel_file.exists():
     sys.exit(1)
 
 try:
-    wb = openpyxl.load_workbook(excel_file)
+    store = AnalyticsStore.ensure([excel_file])
+    source = excel_file
+    metrics = ['clicks', 'impressions', 'ctr', 'position']
+
+    def top(dimension, key, limit=None):
+        """Lignes d'une feuille de l'export, triées par clics"""
+        rows = store.records([key] + metrics, store.mask(source=source, dimension=dimension),
+                             sort_by='clicks', limit=limit)
+        return [tuple(r.values()) for r in rows]
+
     print("\n" + "="*120)
     print("📊 SEARCH CONSOLE DIAGNOSTIC - lescalculateurs.fr")
     print("="*120 + "\n")
@@ -21,38 +34,26 @@ try:
     # GRAPHIQUE - Données par jour
     print("📈 1️⃣ DAILY PERFORMANCE SUMMARY")
     print("-" * 120)
-    ws_graph = wb['Graphique']
-    data_graph = []
-    for row in ws_graph.iter_rows(min_row=2, values_only=True):
-        if row[0] is None:
-            break
-        data_graph.append(row)
+    graph = store.table(['date', 'clicks', 'impressions', 'ctr', 'position'],
+                        store.mask(source=source, dimension='date'))
     
-    if data_graph:
-        clics = [r[1] for r in data_graph if r[1] is not None]
-        impressions = [r[2] for r in data_graph if r[2] is not None]
-        ctr = [r[3] for r in data_graph if r[3] is not None]
-        position = [r[4] for r in data_graph if r[4] is not None]
+    if len(graph['date']):
+        clics, impressions, ctr, position = (graph[k][~np.isnan(graph[k])]
+                                             for k in ('clicks', 'impressions', 'ctr', 'position'))
         
-        print(f"  📅 Period: {data_graph[0][0]} to {data_graph[-1][0]} ({len(data_graph)} days)")
-        print(f"  👆 Clicks: {sum(clics):.0f} total | avg {mean(clics):.1f}/day | range {min(clics):.0f}-{max(clics):.0f}")
-        print(f"  👁️ Impressions: {sum(impressions):.0f} total | avg {mean(impressions):.0f}/day")
-        print(f"  🎯 CTR: avg {mean(ctr)*100:.2f}% | range {min(ctr)*100:.2f}%-{max(ctr)*100:.2f}%")
-        print(f"  📍 Position: avg {mean(position):.1f} | range {min(position):.1f}-{max(position):.1f} (lower=better)")
+        print(f"  📅 Period: {graph['date'][0]} to {graph['date'][-1]} ({len(graph['date'])} days)")
+        print(f"  👆 Clicks: {clics.sum():.0f} total | avg {clics.mean():.1f}/day | range {clics.min():.0f}-{clics.max():.0f}")
+        print(f"  👁️ Impressions: {impressions.sum():.0f} total | avg {impressions.mean():.0f}/day")
+        print(f"  🎯 CTR: avg {ctr.mean()*100:.2f}% | range {ctr.min()*100:.2f}%-{ctr.max()*100:.2f}%")
+        print(f"  📍 Position: avg {position.mean():.1f} | range {position.min():.1f}-{position.max():.1f} (lower=better)")
     print()
     
     # REQUÊTES - Top queries
     print("🔍 2️⃣ TOP KEYWORDS (REQUÊTES)")
     print("-" * 120)
-    ws_req = wb['Requêtes']
-    req_data = []
-    for row in ws_req.iter_rows(min_row=2, values_only=True):
-        if row[0] is None:
-            break
-        req_data.append(row)
-    
-    req_data.sort(key=lambda x: x[1] if x[1] else 0, reverse=True)
-    print(f"  Total keywords: {len(req_data)}")
+    req_count = int(store.mask(source=source, dimension='query').sum())
+    req_data = top('query', 'query', limit=15)
+    print(f"  Total keywords: {req_count}")
     print(f"\n  🏆 Top 15 Keywords by Clicks:")
     for i, row in enumerate(req_data[:15], 1):
         query, clics, impr, ctr_val, pos = row[0], row[1] or 0, row[2] or 0, row[3] or 0, row[4] or 0
@@ -62,15 +63,9 @@ try:
     # PAGES - Top pages
     print("📄 3️⃣ TOP PAGES")
     print("-" * 120)
-    ws_pages = wb['Pages']
-    pages_data = []
-    for row in ws_pages.iter_rows(min_row=2, values_only=True):
-        if row[0] is None:
-            break
-        pages_data.append(row)
-    
-    pages_data.sort(key=lambda x: x[1] if x[1] else 0, reverse=True)
-    print(f"  Total pages: {len(pages_data)}")
+    pages_count = int(store.mask(source=source, dimension='page').sum())
+    pages_data = top('page', 'page', limit=15)
+    print(f"  Total pages: {pages_count}")
     print(f"\n  🏆 Top 15 Pages by Clicks:")
     for i, row in enumerate(pages_data[:15], 1):
         page, clics, impr, ctr_val, pos = row[0], row[1] or 0, row[2] or 0, row[3] or 0, row[4] or 0
@@ -82,15 +77,9 @@ try:
     print("✨ 4️⃣ SEARCH APPEARANCE (Rich Results, Featured Snippets, etc.)")
     print("-" * 120)
     try:
-        ws_appear = wb['Apparence dans les résultats de']
-        appear_data = []
-        for row in ws_appear.iter_rows(min_row=2, values_only=True):
-            if row[0] is None:
-                break
-            appear_data.append(row)
+        appear_data = top('appearance', 'segment', limit=10)
         
         if appear_data:
-            appear_data.sort(key=lambda x: x[1] if x[1] else 0, reverse=True)
             for i, row in enumerate(appear_data[:10], 1):
                 app_type, clics, impr, ctr_val, pos = row[0], row[1] or 0, row[2] or 0, row[3] or 0, row[4] or 0
                 print(f"    {i:2d}. {str(app_type):50s} | {clics:3.0f} clics | {impr:5.0f} impr | {ctr_val*100:5.2f}% CTR")
@@ -104,14 +93,7 @@ try:
     print("📱 5️⃣ DEVICES")
     print("-" * 120)
     try:
-        ws_dev = wb['Appareils']
-        dev_data = []
-        for row in ws_dev.iter_rows(min_row=2, values_only=True):
-            if row[0] is None:
-                break
-            dev_data.append(row)
-        
-        dev_data.sort(key=lambda x: x[1] if x[1] else 0, reverse=True)
+        dev_data = top('device', 'segment')
         total_clicks = sum([r[1] or 0 for r in dev_data])
         for row in dev_data:
             device, clics, impr, ctr_val, pos = row[0], row[1] or 0, row[2] or 0, row[3] or 0, row[4] or 0
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """Audit Meta Tags (title, description) for problem pages"""
 
-import re
+import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.page_index import PageIndex
+
 # Define pages to audit
 pages_to_audit = {
     "ARE - Cumul": "src/pages/are/are-cumul-salaire-temps-partiel-2026.html",
@@ -22,6 +26,9 @@ pages_to_audit = {
     "Impôt - Décote": "src/pages/impot/impot-decote-2026-simulation.html",
 }
 
+# Index partagé des pages : seules les pages modifiées sont réanalysées
+index = PageIndex()
+
 print("\n" + "="*140)
 print("🔍 META TAGS AUDIT - Problem Pages")
 print("="*140 + "\n")
@@ -34,19 +41,11 @@ for name, filepath in pages_to_audit.items():
         continue
     
     try:
-        content = file.read_text(encoding='utf-8')
-        
-        # Extract title
-        title_match = re.search(r'<title>([^<]+)</title>', content)
-        title = title_match.group(1) if title_match else "NOT FOUND"
+        page = index.get(filepath)
         
-        # Extract meta description
-        desc_match = re.search(r'<meta\s+name=["\']description["\']\s+content=["\']([^"\']+)["\']', content)
-        description = desc_match.group(1) if desc_match else "NOT FOUND"
-        
-        # Check for noindex
-        noindex_match = re.search(r'<meta\s+name=["\']robots["\']\s+content=["\']([^"\']*noindex[^"\']*)["\']', content)
-        noindex = "🚨 NOINDEX DETECTED!" if noindex_match else "✓ Indexed"
+        title = page['title'] or "NOT FOUND"
+        description = page['description'] or "NOT FOUND"
+        noindex = "🚨 NOINDEX DETECTED!" if 'noindex' in (page['robots'] or '').lower() else "✓ Indexed"
         
         print(f"📄 {name:35s}")
         print(f"   Title: {title[:95]}")
@@ -58,5 +57,7 @@ for name, filepath in pages_to_audit.items():
         print(f"⚠️  {name:35s} | ERROR: {e}")
         print()
 
+index.close()
+
 print("="*140)
 print("✓ Audit complete!\n")
@@ -2,7 +2,27 @@
 """Audit RSA/Prime/APL pages - meta titles, descriptions, and identify fixes"""
 
 from pathlib import Path
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.cache import AuditCache, rules_fingerprint
+from lib.page_index import PageIndex
+
+# À incrémenter quand extract_page_facts() change (invalide le cache)
+CACHE_VERSION = 1
+
+
+def extract_page_facts(content, category):
+    """Extrait les indicateurs de calculateur d'une page (les meta tags viennent de l'index)"""
+    return {
+        'has_calc_id': re.search(rf'id=["\']({category}-calculator|calculator)["\']', content, re.IGNORECASE) is not None,
+        'has_calc_class': re.search(rf'class=["\'][^"\']*({category}-calculator|calculator)[^"\']*["\']', content, re.IGNORECASE) is not None,
+        'quick_values_count': len(re.findall(r'class=["\'][^"\']*quick-value-btn[^"\']*["\']', content, re.IGNORECASE)),
+        'presets_count': len(re.findall(r'class=["\'][^"\']*preset-situation-btn[^"\']*["\']', content, re.IGNORECASE)),
+    }
+
 
 print("\n" + "="*160)
 print("🔍 AUDIT: RSA/Prime d'Activité/APL Pages - Meta Tags + Structure")
@@ -23,6 +43,8 @@ pages_to_check = {
 
 issues = []
 recommendations = []
+cache = AuditCache('audit-weak-pages-v2', rules_fingerprint(CACHE_VERSION, pages_to_check))
+index = PageIndex()
 
 for category, page_path in pages_to_check.items():
     p = Path(page_path)
@@ -35,16 +57,14 @@ for category, page_path in pages_to_check.items():
     print(f"📄 {category.upper()} - {page_path}")
     print(f"{'='*160}")
     
-    content = p.read_text(encoding='utf-8')
-    
-    # Extract meta tags with regex
-    title_match = re.search(r'<title[^>]*>(.*?)</title>', content, re.IGNORECASE)
-    title_text = title_match.group(1).strip() if title_match else "NOT FOUND"
-    
-    desc_match = re.search(r'<meta\s+name=["\']description["\'][^>]*content=["\']([^"\']*)["\']', content, re.IGNORECASE)
-    if not desc_match:
-        desc_match = re.search(r'<meta\s+content=["\']([^"\']*)["\'][^>]*name=["\']description["\']', content, re.IGNORECASE)
-    desc_text = desc_match.group(1).strip() if desc_match else "NOT FOUND"
+    # Meta tags depuis l'index des pages ; indicateurs réutilisés si la page n'a pas changé
+    page = index.get(page_path)
+    title_text = page['title'].strip() if page['title'] is not None else "NOT FOUND"
+    desc_text = page['description'].strip() if page['description'] is not None else "NOT FOUND"
+    facts = cache.get(page_path)
+    if facts is None:
+        facts = extract_page_facts(p.read_text(encoding='utf-8'), category)
+        cache.put(page_path, facts)
     
     print(f"\n📝 CURRENT META:")
     print(f"   Title:       {title_text}")
@@ -64,13 +84,13 @@ for category, page_path in pages_to_check.items():
         print(f"   \"{kw}\" → Title {title_check} | Description {desc_check}")
     
     # Check for calculator presence
-    has_calc_id = re.search(rf'id=["\']({category}-calculator|calculator)["\']', content, re.IGNORECASE) is not None
-    has_calc_class = re.search(rf'class=["\'][^"\']*({category}-calculator|calculator)[^"\']*["\']', content, re.IGNORECASE) is not None
+    has_calc_id = facts['has_calc_id']
+    has_calc_class = facts['has_calc_class']
     has_calc = "✅" if (has_calc_id or has_calc_class) else "❌"
     
     # Check for quick values/presets
-    quick_values_count = len(re.findall(r'class=["\'][^"\']*quick-value-btn[^"\']*["\']', content, re.IGNORECASE))
-    presets_count = len(re.findall(r'class=["\'][^"\']*preset-situation-btn[^"\']*["\']', content, re.IGNORECASE))
+    quick_values_count = facts['quick_values_count']
+    presets_count = facts['presets_count']
     has_quick = "✅" if (quick_values_count > 0 or presets_count > 0) else "❌"
     print(f"\n🧮 CALCULATOR: {has_calc}")
     print(f"⚡ QUICK VALUES/PRESETS: {has_quick} ({quick_values_count} quick + {presets_count} presets)")
@@ -125,6 +145,9 @@ for category, page_path in pages_to_check.items():
             print(f"   {i}. {rec}")
             recommendations.append({'page': category, 'recommendation': rec})
 
+cache.save()
+index.close()
+
 print("\n\n" + "="*160)
 print(f"📊 SUMMARY: {len(issues)} issues found | {len(recommendations)} recommendations")
 print("="*160 + "\n")
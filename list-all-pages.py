@@ -1,40 +1,27 @@
 #!/usr/bin/env python3
 """List all pages from Search Console to find pret/financement pages"""
 
-import openpyxl
+import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.analytics_store import AnalyticsStore
+
 excel_file = Path("seach-console-perf/lescalculateurs.fr-Performance-on-Search-2026-05-03.xlsx")
 
-wb = openpyxl.load_workbook(excel_file)
-ws_pages = wb['Pages']
+store = AnalyticsStore.ensure([excel_file])
 
 print("\n" + "="*180)
 print("🔍 ALL PAGES - May 3, 2026 Search Console")
 print("="*180 + "\n")
 
-pages = []
-
-for row in ws_pages.iter_rows(min_row=2, values_only=True):
-    if not row or row[0] is None:
-        break
-    
-    url = row[0]
-    clics = row[1] or 0
-    impr = row[2] or 0
-    ctr = row[3] or 0 if row[3] else 0
-    pos = row[4] or 0
-    
-    pages.append({
-        'url': url,
-        'clics': clics,
-        'impr': impr,
-        'ctr': ctr,
-        'pos': pos,
-    })
-
-# Sort by clicks
-pages.sort(key=lambda x: x['clics'], reverse=True)
+# Sorted by clicks
+pages = [
+    {'url': r['page'], 'clics': r['clicks'], 'impr': r['impressions'], 'ctr': r['ctr'], 'pos': r['position']}
+    for r in store.records(['page', 'clicks', 'impressions', 'ctr', 'position'],
+                           store.mask(source=excel_file, dimension='page'), sort_by='clicks')
+]
 
 # Display top 50 pages
 print(f"📊 TOP 50 PAGES BY CLICKS:\n")
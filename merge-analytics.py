@@ -1,38 +1,41 @@
 #!/usr/bin/env python3
 """Merge Google Search Console + Bing + Vercel Analytics into one consolidated report"""
 
-import openpyxl
 import csv
+import os
+import sys
 from pathlib import Path
-from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.analytics_store import AnalyticsStore
+
+excel_file = Path("seach-console-perf/lescalculateurs.fr-Performance-on-Search-2026-05-03.xlsx")
+vercel_file = Path("seach-console-perf/Top Pages - Apr 3, 1_00 - May 3, 1_59.csv")
+bing_file = Path("seach-console-perf/www.lescalculateurs.fr_SearchPerformanceOverview_All_5_3_2026.csv")
+
+
+
+def load(path):
+    """Entrepôt après ingestion de l'export (une erreur n'affecte que sa section)"""
+    if not path.exists():
+        raise FileNotFoundError(f"No such file: '{path}'")
+    # Les URL sont déjà normalisées en chemins (/pages/...) par l'entrepôt
+    return AnalyticsStore.ensure([path])
+
 
 # 1. Load Google Search Console data
 print("\n📊 Charger données Google Search Console (Excel)...")
 google_data = {}
-excel_file = Path("seach-console-perf/lescalculateurs.fr-Performance-on-Search-2026-05-03.xlsx")
 
 try:
-    wb = openpyxl.load_workbook(excel_file)
-    ws_pages = wb['Pages']
-    
-    for row in ws_pages.iter_rows(min_row=2, values_only=True):
-        if not row or row[0] is None:
-            break
-        
-        url = row[0]
-        # Normalize URL: remove https://www.lescalculateurs.fr prefix
-        if url.startswith("https://www.lescalculateurs.fr"):
-            url_path = url.replace("https://www.lescalculateurs.fr", "")
-        elif url.startswith("https://lescalculateurs.fr"):
-            url_path = url.replace("https://lescalculateurs.fr", "")
-        else:
-            url_path = url
-        
-        google_data[url_path] = {
-            'google_clics': row[1] or 0,
-            'google_impr': row[2] or 0,
-            'google_ctr': row[3] or 0,
-            'google_pos': row[4] or 0,
+    store = load(excel_file)
+    for row in store.records(['page', 'clicks', 'impressions', 'ctr', 'position'],
+                             store.mask(source=excel_file, dimension='page')):
+        google_data[row['page']] = {
+            'google_clics': int(row['clicks']),
+            'google_impr': int(row['impressions']),
+            'google_ctr': row['ctr'],
+            'google_pos': row['position'],
         }
     
     print(f"✅ Loaded {len(google_data)} pages from Google Search Console")
@@ -42,24 +45,14 @@ except Exception as e:
 # 2. Load Vercel Analytics data
 print("📊 Charger données Vercel Analytics...")
 vercel_data = {}
-vercel_file = Path("seach-console-perf/Top Pages - Apr 3, 1_00 - May 3, 1_59.csv")
 
 try:
-    with open(vercel_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            page_path = row['Page']
-            # Ensure path starts with /
-            if not page_path.startswith('/'):
-                page_path = '/' + page_path
-            
-            visitors = int(row['Visitors'])
-            total = int(row['Total'])
-            
-            vercel_data[page_path] = {
-                'vercel_visitors': visitors,
-                'vercel_pageviews': total,
-            }
+    store = load(vercel_file)
+    for row in store.records(['page', 'visitors', 'page_views'], store.mask(source=vercel_file)):
+        vercel_data[row['page']] = {
+            'vercel_visitors': int(row['visitors']),
+            'vercel_pageviews': int(row['page_views']),
+        }
     
     print(f"✅ Loaded {len(vercel_data)} pages from Vercel Analytics")
 except Exception as e:
@@ -67,7 +60,6 @@ except Exception as e:
 
 # 3. Load Bing data (aggregate by URL if available)
 print("📊 Charger données Bing Webmaster Tools...")
-bing_file = Path("seach-console-perf/www.lescalculateurs.fr_SearchPerformanceOverview_All_5_3_2026.csv")
 
 bing_totals = {
     'bing_clics': 0,
@@ -76,11 +68,10 @@ bing_totals = {
 }
 
 try:
-    with open(bing_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            bing_totals['bing_clics'] += int(row['Clicks'])
-            bing_totals['bing_impr'] += int(row['Impressions'])
+    store = load(bing_file)
+    bing_mask = store.mask(source=bing_file)
+    bing_totals['bing_clics'] += int(store.column('clicks', bing_mask).sum())
+    bing_totals['bing_impr'] += int(store.column('impressions', bing_mask).sum())
     
     # Calculate avg CTR
     if bing_totals['bing_impr'] > 0:
@@ -1,73 +1,60 @@
 #!/usr/bin/env python3
 """Analyze VDF data + Search Console to recommend 5 new high-value pages"""
 
-import csv
-import openpyxl
+import os
+import sys
 from pathlib import Path
-from statistics import mean
 import re
 
-# Load Search Console data
-excel_file = Path("seach-console-perf/lescalculateurs.fr-Performance-on-Search-2026-05-02.xlsx")
-wb = openpyxl.load_workbook(excel_file)
+import numpy as np
 
-# Get VDF metrics
-ws_vdf = wb['VDF - Revenu Médian'] if 'VDF - Revenu Médian' in wb.sheetnames else None
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.vdf_store import VdfStore
 
-# Load and analyze VDF data
+# Load and analyze VDF data (converted once to .cache/vdf/, memory-mapped afterwards)
 vdf_file = Path("vdf/revenu-des-francais-a-la-commune-1765372688826.csv")
 
 print("\n" + "="*140)
 print("🔍 VDF DATA ANALYSIS - Top 5 Pages à Créer Basées sur Revenus + Opportunité SEO")
 print("="*140 + "\n")
 
-communes_data = []
-
 try:
-    with open(vdf_file, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f, delimiter=';')
-        
-        for row in reader:
-            try:
-                nom = row.get('Nom géographique GMS', '').strip()
-                code = row.get('Code géographique', '').strip()
-                
-                # Get median revenue (DISP = disposable)
-                mediane_str = row.get('[DISP] Médiane (€)', '').strip()
-                if not mediane_str:
-                    mediane_str = row.get('[DEC] Médiane (€)', '').strip()
-                
-                mediane = float(mediane_str) if mediane_str and mediane_str != '' else 0
-                
-                # Get quartiles
-                q1_str = row.get('[DISP] 1ᵉ quartile (€)', '').strip()
-                q3_str = row.get('[DISP] 3ᵉ quartile (€)', '').strip()
-                
-                q1 = float(q1_str) if q1_str else 0
-                q3 = float(q3_str) if q3_str else 0
-                
-                if mediane > 0 and nom and not nom.startswith('L\''):
-                    # Calculate wealth score: median + difference from Q1 to Q3
-                    wealth_score = mediane + ((q3 - q1) / 2)
-                    
-                    communes_data.append({
-                        'nom': nom,
-                        'code': code,
-                        'mediane': mediane,
-                        'q1': q1,
-                        'q3': q3,
-                        'wealth_score': wealth_score,
-                    })
-                    
-            except (ValueError, TypeError, KeyError) as e:
-                continue
-    
-    # Sort by wealth score (median + range)
-    communes_data.sort(key=lambda x: x['wealth_score'], reverse=True)
-    
+    vdf = VdfStore.ensure(vdf_file)
+    noms = np.char.strip(vdf.column('nom'))
+    codes = np.char.strip(vdf.column('code'))
+
+    # Get median revenue (DISP = disposable), DEC as fallback for empty cells only
+    # (a DISP median under statistical secrecy skips the commune)
+    mediane = np.asarray(vdf.column('mediane'))
+    if vdf.has('mediane_dec'):
+        mediane = np.where(np.isnan(mediane) & ~vdf.secret('mediane'), vdf.column('mediane_dec'), mediane)
+    mediane = np.nan_to_num(mediane)
+
+    # Get quartiles (empty cells count as 0, communes under statistical secrecy are skipped)
+    q1 = np.nan_to_num(vdf.column('q1'))
+    q3 = np.nan_to_num(vdf.column('q3'))
+
+    eligible = ((mediane > 0) & ~vdf.secret('q1') & ~vdf.secret('q3')
+                & (noms != '') & ~np.char.startswith(noms, "L'"))
+    # Calculate wealth score: median + difference from Q1 to Q3
+    wealth_score = mediane + ((q3 - q1) / 2)
+
+    def commune(i):
+        return {
+            'nom': str(noms[i]),
+            'code': str(codes[i]),
+            'mediane': float(mediane[i]),
+            'q1': float(q1[i]),
+            'q3': float(q3[i]),
+            'wealth_score': float(wealth_score[i]),
+        }
+
+    # Top by wealth score (median + range), without sorting every commune
+    top_rows = VdfStore.top_k(wealth_score, 20, eligible)
+
     print("📊 TOP 20 COMMUNES by Wealth/Income:")
     print("-" * 140)
-    for i, com in enumerate(communes_data[:20], 1):
+    for i, com in enumerate((commune(r) for r in top_rows), 1):
         print(f"{i:2d}. {com['nom']:45s} | Médiane: {com['mediane']:8.0f}€ | Q1-Q3: {com['q1']:8.0f}€-{com['q3']:8.0f}€ | Score: {com['wealth_score']:10.0f}")
     
     print("\n" + "="*140)
@@ -76,7 +63,13 @@ try:
     
     # Select top 5 unique communes (avoid similar names)
     selected = []
-    for com in communes_data:
+    # Candidates in score order; widen the top-k only if too many similar names
+    k = 100
+    candidates = VdfStore.top_k(wealth_score, k, eligible)
+    while len(candidates) == k and len({noms[r].split()[0] for r in candidates}) < 5:
+        k *= 10
+        candidates = VdfStore.top_k(wealth_score, k, eligible)
+    for com in (commune(r) for r in candidates):
         # Filter out very small communes and duplicates
         if len(selected) >= 5:
             break
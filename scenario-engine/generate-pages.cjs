@@ -12,6 +12,7 @@
  * Usage : node scenario-engine/generate-pages.cjs
  */
 
+const crypto = require("crypto");
 const fs = require("fs");
 const path = require("path");
 
@@ -80,6 +81,85 @@ function calculerPrime(b, d) {
     details: { montantBase: mb, bonification: bonif },
   };
 }
+// ─── Grilles précalculées (python tools/build_result_grids.py) ───
+// En-tête JSON + binaire int32 LE en centimes, axes situation × enfants ×
+// revenusProf × logement. Grille absente ou périmée (version, barèmes ou code
+// des moteurs JS/Python différents) -> calcul direct.
+const GRID_DIR = path.join(__dirname, "..", ".cache", "grids");
+const GRID_VERSION = 1;
+const GRID_AXES = ["situation", "enfants", "revenusProf", "logement"];
+// Fonctions dont dépendent les montants ; à garder identique à ENGINE_SOURCES
+// de tools/lib/result_grid.py
+const ENGINE_SOURCES = {
+  "prime-activite": [
+    [__filename, ["getPrimeForfait", "getHousingForfait", "getBonification", "calculerPrime"]],
+    [
+      path.join(__dirname, "..", "tools", "lib", "reference_engines.py"),
+      ["js_round", "_round2", "prime_activite"],
+    ],
+  ],
+};
+const grids = {};
+// Texte d'une fonction de premier niveau : même règle que function_source() en Python
+function functionSource(text, name) {
+  const lines = text.split("\n");
+  const start = lines.findIndex(
+    (line) => line.startsWith(`function ${name}(`) || line.startsWith(`def ${name}(`),
+  );
+  if (start < 0) return "";
+  const block = [lines[start]];
+  for (const line of lines.slice(start + 1)) {
+    if (line && !/^\s/.test(line) && !"})".includes(line[0])) break;
+    block.push(line);
+  }
+  while (block.length && !block[block.length - 1].trim()) block.pop();
+  return block.join("\n");
+}
+function engineDigest(aideKey) {
+  const h = crypto.createHash("sha256");
+  for (const [file, functions] of ENGINE_SOURCES[aideKey] || []) {
+    const text = fs.readFileSync(file, "utf-8").replace(/\r\n/g, "\n");
+    for (const fn of functions) h.update(functionSource(text, fn) + "\n");
+  }
+  return h.digest("hex").slice(0, 16);
+}
+function getGrid(aideKey, aide) {
+  if (aideKey in grids) return grids[aideKey];
+  grids[aideKey] = null;
+  const headerPath = path.join(GRID_DIR, `${aideKey}.json`);
+  if (!fs.existsSync(headerPath)) return null;
+  const header = JSON.parse(fs.readFileSync(headerPath, "utf-8"));
+  if (
+    header.version !== GRID_VERSION ||
+    JSON.stringify(header.baremes) !== JSON.stringify(aide["barèmes"]) ||
+    header.engine !== engineDigest(aideKey)
+  )
+    return null;
+  grids[aideKey] = { header, cells: fs.readFileSync(path.join(GRID_DIR, header.bin)) };
+  return grids[aideKey];
+}
+function lookupGrid(grid, d) {
+  if (!grid) return null;
+  const { header, cells } = grid;
+  for (const [k, v] of Object.entries(header.fixed)) if (d[k] !== v) return null;
+  let offset = 0;
+  for (let i = 0; i < GRID_AXES.length; i++) {
+    const idx = header.axes[GRID_AXES[i]].indexOf(d[GRID_AXES[i]]);
+    if (idx < 0) return null;
+    offset = offset * header.shape[i] + idx;
+  }
+  offset *= header.fields.length;
+  const r = {};
+  header.fields.forEach((f, j) => {
+    r[f] = cells.readInt32LE(4 * (offset + j)) / 100;
+  });
+  if (r.montantBase === 0) return null; // entrées hors moteur (revenus nuls)
+  return {
+    success: true,
+    montantEstime: r.montantEstime,
+    details: { montantBase: r.montantBase, bonification: r.bonification },
+  };
+}
 function applyOverrides(base, overrides) {
   const result = { ...base };
   for (const [k, v] of Object.entries(overrides)) {
@@ -138,9 +218,11 @@ function generatePage(aideKey, aide, scenario, revenuLevel, seoVariantIdx) {
   });
   baseDefaults.revenusProf = revenuLevel;
 
-  const baseResult = calculerPrime(b, baseDefaults);
+  const grid = getGrid(aideKey, aide);
+  const calc = (d) => lookupGrid(grid, d) || calculerPrime(b, d);
+  const baseResult = calc(baseDefaults);
   const scenarioValues = applyOverrides(baseDefaults, scenario.overrides);
-  let scenarioResult = calculerPrime(b, scenarioValues);
+  let scenarioResult = calc(scenarioValues);
 
   if (scenario.overrides._reformeBaremeReduction && scenarioResult.montantEstime > 0) {
     const reduc = scenario.overrides._reformeBaremeReduction;
@@ -469,6 +551,11 @@ function generateAll() {
     console.log(
       `Génération de ${scenarios.length} scénarios × ${revenuLevels.length} salaires pour ${aideKey}...`,
     );
+    console.log(
+      getGrid(aideKey, aide)
+        ? `  Montants lus dans la grille ${path.join(".cache", "grids", aideKey + ".bin")}`
+        : "  Pas de grille à jour : calcul direct",
+    );
 
     for (const scenario of scenarios) {
       for (const revenuLevel of revenuLevels) {
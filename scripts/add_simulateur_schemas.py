@@ -3,12 +3,22 @@
 Script SEO : Ajout de HowTo + BreadcrumbList + liens internes
 sur toutes les pages du cluster "Simulateurs"
 """
+import argparse
+import difflib
 import os
 import re
 import csv
 import json
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from lib.blob_store import BlobStore, stage_name
+from lib.page_index import PageIndex, page_key
+from lib.profiling import add_profile_argument, count, enable_from_args, enabled, stage
+from lib.regex_rules import RuleRunner, cost_report, write_cost_report
+from lib.scan import scan_files
 
 # ---------- CONFIG ----------
 SRC_DIR = Path("pages_YMYL_FINAL_V2")  # Dossier source principal
@@ -41,6 +51,11 @@ SIMULATEUR_TYPES = {
     r'foncier|foncière': 'Revenu foncier',
 }
 
+# Motifs compilés une seule fois par processus, coût mesuré par règle
+SIMULATEUR_RULES = RuleRunner('simulateur', [(pattern, pattern) for pattern in SIMULATEUR_PATTERNS])
+FORM_RULES = RuleRunner('formulaire', [(r'<input|type=["\']number["\']|calculator|simulateur', 'formulaire')])
+TYPE_RULES = RuleRunner('type', list(SIMULATEUR_TYPES.items()))
+
 # Liens internes à ajouter (rotatifs selon le type)
 CLUSTER_LINKS = {
     'default': [
@@ -76,28 +91,20 @@ def detect_simulateur_type(content: str, filename: str) -> str:
     content_lower = content.lower()
     filename_lower = filename.lower()
     
-    for pattern, sim_type in SIMULATEUR_TYPES.items():
-        if re.search(pattern, content_lower) or re.search(pattern, filename_lower):
-            return sim_type
+    for rule in TYPE_RULES:
+        if TYPE_RULES.search(rule, content_lower) or TYPE_RULES.search(rule, filename_lower):
+            return rule.label
     return 'Simulateur'
 
 
-def extract_page_title(content: str) -> str:
-    """Extrait le title de la page"""
-    match = re.search(r'<title>(.*?)</title>', content, re.IGNORECASE)
-    return match.group(1).strip() if match else "Simulateur 2026"
+def extract_page_title(page: Dict) -> str:
+    """Title de la page (depuis l'index des pages)"""
+    return page['title'] or "Simulateur 2026"
 
 
-def extract_canonical_url(content: str) -> str:
-    """Extrait l'URL canonique de la page"""
-    match = re.search(r'<link[^>]*rel=["\']canonical["\'][^>]*href=["\']([^"\']+)["\']', content, re.IGNORECASE)
-    if match:
-        return match.group(1)
-    # Essayer avec meta og:url
-    match = re.search(r'<meta[^>]*property=["\']og:url["\'][^>]*content=["\']([^"\']+)["\']', content, re.IGNORECASE)
-    if match:
-        return match.group(1)
-    return ""
+def extract_canonical_url(page: Dict) -> str:
+    """URL canonique de la page, sinon og:url (depuis l'index des pages)"""
+    return page['canonical'] or page['og_url'] or ""
 
 
 def has_schema_type(content: str, schema_type: str) -> bool:
@@ -242,102 +249,196 @@ def generate_internal_links(sim_type: str) -> str:
 </div>'''
 
 
-def is_simulateur_file(file: Path) -> bool:
-    """Détermine si un fichier est un simulateur"""
-    try:
-        content = file.read_text(encoding='utf-8').lower()
-        # Vérifier les patterns de simulateur
-        for pattern in SIMULATEUR_PATTERNS:
-            if re.search(pattern, content):
-                # Vérifier qu'il contient un formulaire ou des inputs
-                if re.search(r'<input|type=["\']number["\']|calculator|simulateur', content):
+def is_simulateur(content: str, filename: str) -> bool:
+    """Détermine si une page (déjà lue) est un simulateur"""
+    content = content.lower()
+    # Vérifier les patterns de simulateur
+    for rule in SIMULATEUR_RULES:
+        if SIMULATEUR_RULES.search(rule, content):
+            # Vérifier qu'il contient un formulaire ou des inputs
+            for form in FORM_RULES:
+                if FORM_RULES.search(form, content):
                     return True
-        # Vérifier aussi selon le nom de fichier
-        filename = file.name.lower()
-        for pattern in SIMULATEUR_TYPES.keys():
-            if re.search(pattern, filename):
-                return True
-        return False
-    except Exception:
-        return False
+    # Vérifier aussi selon le nom de fichier
+    filename = filename.lower()
+    for rule in TYPE_RULES:
+        if TYPE_RULES.search(rule, filename):
+            return True
+    return False
 
 
-def process_file(file: Path) -> Tuple[str, str, str, str, str]:
+def transform_content(content: str, filename: str, title: str,
+                      canonical_url: str) -> Tuple[str, str, str, str, str]:
     """
-    Traite un fichier simulateur
-    Retourne: (status, howto_added, breadcrumb_added, internal_links_added, message)
+    Applique HowTo, BreadcrumbList et liens internes au contenu.
+    Retourne: (nouveau contenu, howto_added, breadcrumb_added, internal_links_added, type)
     """
+    sim_type = detect_simulateur_type(content, filename)
+    
+    howto_added = 'NON'
+    breadcrumb_added = 'NON'
+    
+    # 1. Ajouter HowTo s'il n'existe pas
+    if not has_howto(content):
+        howto_schema = generate_howto(sim_type, title)
+        # Insérer avant </head>
+        content = re.sub(r'(</head>)', howto_schema + r'\n\1', content, flags=re.IGNORECASE)
+        howto_added = 'OUI'
+    
+    # 2. Ajouter BreadcrumbList s'il n'existe pas
+    if not has_breadcrumb(content):
+        breadcrumb_schema = generate_breadcrumb(sim_type, canonical_url)
+        content = re.sub(r'(</head>)', breadcrumb_schema + r'\n\1', content, flags=re.IGNORECASE)
+        breadcrumb_added = 'OUI'
+    
+    # 3. Ajouter les liens internes avant </body>, sinon avant </main>, sinon à la fin
+    links_html = generate_internal_links(sim_type)
+    if '</body>' in content.lower():
+        content = re.sub(r'(</body>)', links_html + r'\n\1', content, flags=re.IGNORECASE)
+    elif '</main>' in content.lower():
+        content = re.sub(r'(</main>)', links_html + r'\n\1', content, flags=re.IGNORECASE)
+    else:
+        content = content.rstrip() + '\n' + links_html + '\n'
+    
+    return content, howto_added, breadcrumb_added, 'OUI', sim_type
+
+
+def output_path(file: Path) -> Path:
+    """Chemin de sortie : même arborescence, suffixe _SIMULATEURS_PLUS"""
+    out_file = OUT_DIR / file.relative_to(SRC_DIR)
+    return out_file.parent / (out_file.stem + "_SIMULATEURS_PLUS.html")
+
+
+def process_file(task: Tuple[Path, str, str, bool, bool, bool]) -> Optional[Dict]:
+    """
+    Traite un fichier en une seule lecture : détection, transformation, écriture.
+    task = (fichier, title, canonical, écrire, calculer le diff, via le stockage de blobs)
+    Retourne None si le fichier n'est pas un simulateur, sinon la ligne du rapport.
+    """
+    file, title, canonical_url, write, with_diff, use_store = task
+    row = {
+        'fichier': str(file.relative_to(SRC_DIR)),
+        'howto_added': 'NON',
+        'breadcrumb_added': 'NON',
+        'internal_links_added': 'NON',
+        'status': 'ERROR',
+        'message': '',
+        'out_file': str(output_path(file)),
+        'diff': '',
+        'sha256': '',
+    }
     try:
-        content = file.read_text(encoding='utf-8')
-        original_content = content
-        
-        # Détecter le type de simulateur
-        sim_type = detect_simulateur_type(content, file.name)
-        title = extract_page_title(content)
-        canonical_url = extract_canonical_url(content)
-        
-        howto_added = 'NON'
-        breadcrumb_added = 'NON'
-        internal_links_added = 'NON'
-        
-        # 1. Ajouter HowTo s'il n'existe pas
-        if not has_howto(content):
-            howto_schema = generate_howto(sim_type, title)
-            # Insérer avant </head>
-            content = re.sub(r'(</head>)', howto_schema + r'\n\1', content, flags=re.IGNORECASE)
-            howto_added = 'OUI'
-        
-        # 2. Ajouter BreadcrumbList s'il n'existe pas
-        if not has_breadcrumb(content):
-            breadcrumb_schema = generate_breadcrumb(sim_type, canonical_url)
-            content = re.sub(r'(</head>)', breadcrumb_schema + r'\n\1', content, flags=re.IGNORECASE)
-            breadcrumb_added = 'OUI'
-        
-        # 3. Ajouter les liens internes avant </body> ou </main> ou </article>
-        links_html = generate_internal_links(sim_type)
+        with stage('lecture'):
+            content = file.read_text(encoding='utf-8')
+            if enabled():
+                count(files=1, bytes=len(content.encode('utf-8')))
+    except Exception:
+        return None
+    with stage('détection'):
+        simulateur = is_simulateur(content, file.name)
+    if not simulateur:
+        return None
+    
+    try:
+        with stage('transformation'):
+            new_content, howto, breadcrumb, links, sim_type = transform_content(
+                content, file.name, title, canonical_url)
         
-        # Essayer d'insérer avant </body>, sinon avant </main>, sinon à la fin
-        if '</body>' in content.lower():
-            content = re.sub(r'(</body>)', links_html + r'\n\1', content, flags=re.IGNORECASE)
-            internal_links_added = 'OUI'
-        elif '</main>' in content.lower():
-            content = re.sub(r'(</main>)', links_html + r'\n\1', content, flags=re.IGNORECASE)
-            internal_links_added = 'OUI'
+        if new_content == content:
+            row.update(status='NO_CHANGE', message='Aucun changement nécessaire')
         else:
-            # Ajouter à la fin du fichier
-            content = content.rstrip() + '\n' + links_html + '\n'
-            internal_links_added = 'OUI'
-        
-        # Vérifier si des changements ont été faits
-        if content == original_content:
-            return ('NO_CHANGE', 'NON', 'NON', 'NON', 'Aucun changement nécessaire')
+            row.update(status='OK', howto_added=howto, breadcrumb_added=breadcrumb,
+                       internal_links_added=links, message=f'Type: {sim_type}')
         
-        return ('OK', howto_added, breadcrumb_added, internal_links_added, f'Type: {sim_type}')
+        if with_diff:
+            with stage('diff'):
+                row['diff'] = ''.join(difflib.unified_diff(
+                    content.splitlines(keepends=True), new_content.splitlines(keepends=True),
+                    fromfile=str(file), tofile=row['out_file'], n=2))
         
+        if write:
+            with stage('écriture'):
+                out_file = output_path(file)
+                out_file.parent.mkdir(parents=True, exist_ok=True)
+                if use_store:
+                    # Page rangée une fois dans .cache/blobs, la sortie en est une copie
+                    # (rien n'est réécrit si elle a déjà ce contenu)
+                    store = BlobStore()
+                    row['sha256'] = store.put_bytes(new_content.encode('utf-8'))
+                    store.materialize(row['sha256'], out_file)
+                else:
+                    out_file.write_text(new_content, encoding='utf-8')
     except Exception as e:
-        return ('ERROR', 'NON', 'NON', 'NON', str(e))
+        row.update(status='ERROR', howto_added='NON', breadcrumb_added='NON',
+                   internal_links_added='NON', message=str(e))
+    return row
+
+
+def write_stage_manifest(rows: List[Dict]):
+    """Manifeste de l'étape pages_SIMULATEURS_PLUS (parent : le dossier source)"""
+    store = BlobStore()
+    manifest = store.new_manifest(stage_name(OUT_DIR), OUT_DIR, parent=stage_name(SRC_DIR))
+    for row in rows:
+        if row['sha256']:
+            out_file = Path(row['out_file'])
+            store.add_entry(manifest, out_file.relative_to(OUT_DIR).as_posix(), row['sha256'], out_file)
+    store.write_manifest(manifest)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ajout HowTo + BreadcrumbList + liens internes aux simulateurs")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="Nombre de processus (0 = tous les cœurs, 1 = séquentiel)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Ne rien écrire (ni pages ni rapport CSV)")
+    parser.add_argument('--diff', action='store_true',
+                        help="Afficher le diff des modifications (implique --dry-run)")
+    parser.add_argument('--rule-costs', metavar='FICHIER',
+                        help="Écrire le classement complet du coût des règles (JSON)")
+    parser.add_argument('--store', action='store_true',
+                        help="Écrire les pages via le stockage de blobs (.cache/blobs) et le manifeste de l'étape")
+    add_profile_argument(parser)
+    return parser.parse_args()
 
 
 def main():
     """Fonction principale"""
+    args = parse_args()
+    enable_from_args(args)
+    dry_run = args.dry_run or args.diff
+    
     print("=" * 60)
     print("🔧 SEO ENGINE - Enrichissement des simulateurs")
     print("=" * 60)
     
-    # Créer le dossier de sortie
-    OUT_DIR.mkdir(exist_ok=True)
-    
     # Scanner les fichiers
     print(f"\n📁 Scan de {SRC_DIR}...")
     
     all_files = list(SRC_DIR.rglob('*.html'))
-    simulateur_files = [f for f in all_files if is_simulateur_file(f)]
+    
+    # Title et canonical viennent de l'index (seules les pages modifiées sont réanalysées)
+    with stage('index'), PageIndex() as index:
+        index.refresh([SRC_DIR])
+        pages = {page['path']: page for page in index.pages(page_key(SRC_DIR) + '/')}
+    tasks = []
+    for file in all_files:
+        page = pages[page_key(file)]
+        tasks.append((file, extract_page_title(page), extract_canonical_url(page), not dry_run, args.diff, args.store))
+    
+    if not dry_run:
+        OUT_DIR.mkdir(exist_ok=True)
+    
+    # Chaque fichier est lu, transformé et écrit une seule fois, en parallèle
+    with stage('analyse'):
+        csv_rows: List[Dict] = [row for row in scan_files(tasks, process_file, jobs=args.jobs) if row is not None]
+    
+    if args.store and not dry_run:
+        with stage('manifeste'):
+            write_stage_manifest(csv_rows)
     
     print(f"   Total fichiers HTML: {len(all_files)}")
-    print(f"   Simulateurs détectés: {len(simulateur_files)}")
+    print(f"   Simulateurs détectés: {len(csv_rows)}")
     
-    # Traiter chaque fichier
-    csv_rows: List[Dict] = []
     stats = {
         'total': 0,
         'ok': 0,
@@ -348,93 +449,45 @@ def main():
         'links_added': 0,
     }
     
-    for file in simulateur_files:
+    for row in csv_rows:
         stats['total'] += 1
-        rel_path = str(file.relative_to(SRC_DIR))
-        
-        print(f"\n🔍 Traitement: {rel_path}")
+        status = row['status']
         
-        # Traiter le fichier
-        status, howto, breadcrumb, links, message = process_file(file)
-        
-        # Recopier le fichier traité dans le dossier de sortie
-        try:
-            content = file.read_text(encoding='utf-8')
-            
-            # Ré-appliquer les modifications pour la copie
-            sim_type = detect_simulateur_type(content, file.name)
-            title = extract_page_title(content)
-            canonical_url = extract_canonical_url(content)
-            
-            # Appliquer les modifications
-            if not has_howto(content):
-                howto_schema = generate_howto(sim_type, title)
-                content = re.sub(r'(</head>)', howto_schema + r'\n\1', content, flags=re.IGNORECASE)
-            
-            if not has_breadcrumb(content):
-                breadcrumb_schema = generate_breadcrumb(sim_type, canonical_url)
-                content = re.sub(r'(</head>)', breadcrumb_schema + r'\n\1', content, flags=re.IGNORECASE)
-            
-            links_html = generate_internal_links(sim_type)
-            if '</body>' in content.lower():
-                content = re.sub(r'(</body>)', links_html + r'\n\1', content, flags=re.IGNORECASE)
-            elif '</main>' in content.lower():
-                content = re.sub(r'(</main>)', links_html + r'\n\1', content, flags=re.IGNORECASE)
-            else:
-                content = content.rstrip() + '\n' + links_html + '\n'
-            
-            # Créer le chemin de sortie en conservant la structure
-            out_file = OUT_DIR / file.relative_to(SRC_DIR)
-            out_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Renommer avec suffixe
-            new_name = out_file.stem + "_SIMULATEURS_PLUS.html"
-            out_file = out_file.parent / new_name
-            
-            out_file.write_text(content, encoding='utf-8')
-            print(f"   ✅ Écrit: {out_file}")
-            
-        except Exception as e:
-            print(f"   ❌ Erreur copie: {e}")
-            status = 'ERROR'
-            message = str(e)
+        print(f"\n🔍 Traitement: {row['fichier']}")
+        if status == 'ERROR':
+            print(f"   ❌ Erreur: {row['message']}")
+        elif dry_run:
+            print(f"   📝 Simulation (non écrit): {row['out_file']}")
+        else:
+            print(f"   ✅ Écrit: {row['out_file']}")
+        if row['diff']:
+            print(row['diff'])
         
         # Mettre à jour les stats
         if status == 'OK':
             stats['ok'] += 1
-            if howto == 'OUI':
+            if row['howto_added'] == 'OUI':
                 stats['howto_added'] += 1
-            if breadcrumb == 'OUI':
+            if row['breadcrumb_added'] == 'OUI':
                 stats['breadcrumb_added'] += 1
-            if links == 'OUI':
+            if row['internal_links_added'] == 'OUI':
                 stats['links_added'] += 1
         elif status == 'ERROR':
             stats['error'] += 1
         else:
             stats['no_change'] += 1
-        
-        # Ajouter au CSV
-        csv_rows.append({
-            'fichier': rel_path,
-            'howto_added': howto if status != 'ERROR' else 'NON',
-            'breadcrumb_added': breadcrumb if status != 'ERROR' else 'NON',
-            'internal_links_added': links if status != 'ERROR' else 'NON',
-            'status': status,
-            'message': message
-        })
     
     # Générer le rapport CSV
-    with REPORT_CSV.open('w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'fichier', 'howto_added', 'breadcrumb_added', 
-            'internal_links_added', 'status', 'message'
-        ])
-        writer.writeheader()
-        writer.writerows(csv_rows)
+    fieldnames = ['fichier', 'howto_added', 'breadcrumb_added', 'internal_links_added', 'status', 'message']
+    if not dry_run:
+        with stage('rapport csv'), REPORT_CSV.open('w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(csv_rows)
     
     # Récapitulatif
     print("\n" + "=" * 60)
-    print("📊 RÉCAPITULATIF")
+    print("📊 RÉCAPITULATIF" + (" (simulation, aucun fichier écrit)" if dry_run else ""))
     print("=" * 60)
     print(f"Pages analysées : {stats['total']}")
     print(f"Pages corrigées : {stats['ok']}")
@@ -454,8 +507,18 @@ def main():
     if len(csv_rows) > 3:
         print(f"... et {len(csv_rows) - 3} autres lignes")
     
-    print(f"\n✅ Fichiers générés dans : {OUT_DIR.absolute()}")
-    print(f"✅ Rapport CSV : {REPORT_CSV.absolute()}")
+    if not dry_run:
+        print(f"\n✅ Fichiers générés dans : {OUT_DIR.absolute()}")
+        print(f"✅ Rapport CSV : {REPORT_CSV.absolute()}")
+    
+    # Classement des règles regex les plus coûteuses
+    runners = [SIMULATEUR_RULES, FORM_RULES, TYPE_RULES]
+    costs = cost_report(runners)
+    if costs:
+        print("\n" + costs)
+    if args.rule_costs:
+        write_cost_report(args.rule_costs, runners)
+        print(f"Coût des règles : {args.rule_costs}")
 
 
 if __name__ == '__main__':
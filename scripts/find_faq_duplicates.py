@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 import os
-import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from lib.cache import AuditCache, rules_fingerprint
+from lib.page_index import FAQ_JSONLD_RE, FAQ_MICRODATA_RE
 
 root = '.'
 report = []
 
-jsonld_re = re.compile(r'<script[^>]*type=["\']application\/ld\+json["\'][^>]*>[\s\S]*?"@type"\s*:\s*"FAQPage"[\s\S]*?<\/script>', re.I)
-microdata_re = re.compile(r'itemscope[^>]*itemtype=["\']https?:\/\/schema\.org\/FAQPage["\']|itemtype=["\']https?:\/\/schema\.org\/FAQPage["\']', re.I)
+# Motifs partagés avec tools/watch_pages.py
+jsonld_re = FAQ_JSONLD_RE
+microdata_re = FAQ_MICRODATA_RE
+
+cache = AuditCache('find_faq_duplicates', rules_fingerprint(1, jsonld_re.pattern, microdata_re.pattern))
 
 for dirpath, dirnames, filenames in os.walk(root):
     # skip node_modules and .git and some build folders
@@ -16,20 +23,28 @@ for dirpath, dirnames, filenames in os.walk(root):
         if not f.lower().endswith('.html'):
             continue
         path = os.path.join(dirpath, f)
-        try:
-            with open(path, 'r', encoding='utf-8') as fh:
-                text = fh.read()
-        except Exception:
+        # Réutiliser le résultat précédent si le fichier n'a pas changé
+        cached = cache.get(path)
+        if cached is not None:
+            has_jsonld, has_micro = cached
+        else:
             try:
-                with open(path, 'r', encoding='latin-1') as fh:
+                with open(path, 'r', encoding='utf-8') as fh:
                     text = fh.read()
             except Exception:
-                continue
-        has_jsonld = bool(jsonld_re.search(text))
-        has_micro = bool(microdata_re.search(text))
+                try:
+                    with open(path, 'r', encoding='latin-1') as fh:
+                        text = fh.read()
+                except Exception:
+                    continue
+            has_jsonld = bool(jsonld_re.search(text))
+            has_micro = bool(microdata_re.search(text))
+            cache.put(path, [has_jsonld, has_micro])
         if has_jsonld or has_micro:
             report.append((path.replace('\\', '/'), 'OUI' if has_jsonld else 'NON', 'OUI' if has_micro else 'NON'))
 
+cache.save()
+
 # write CSV
 out = 'faq_duplicates_report.csv'
 with open(out, 'w', encoding='utf-8') as fo:
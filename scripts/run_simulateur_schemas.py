@@ -3,8 +3,13 @@ import os
 import re
 import csv
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from lib.page_index import PageIndex
+from lib.profiling import count, enabled, stage
+
 SRC_DIR = Path('pages_YMYL_FINAL_V2')
 OUT_DIR = Path('pages_SIMULATEURS_PLUS')
 REPORT_CSV = Path('SIMULATEURS_PLUS_REPORT.csv')
@@ -128,19 +133,20 @@ def is_simulateur(file):
     except:
         return False
 
-def extract_canonical(content):
-    m = re.search(r'<link[^>]*canonical[^>]*href="([^"]+)"', content, re.I)
-    if m: return m.group(1)
-    m = re.search(r'<meta[^>]*og:url[^>]*content="([^"]+)"', content, re.I)
-    if m: return m.group(1)
-    return ''
+def extract_canonical(page):
+    return page['canonical'] or page['og_url'] or ''
 
 print('Scanning...')
 OUT_DIR.mkdir(exist_ok=True)
 all_files = list(SRC_DIR.rglob('*.html'))
-sim_files = [f for f in all_files if is_simulateur(f)]
+with stage('détection'):
+    sim_files = [f for f in all_files if is_simulateur(f)]
 print(f'Found {len(sim_files)} simulateurs')
 
+index = PageIndex()
+with stage('index'):
+    index.refresh([SRC_DIR])
+
 csv_rows = []
 stats = {'total': 0, 'howto': 0, 'breadcrumb': 0, 'links': 0}
 
@@ -148,9 +154,11 @@ for file in sim_files:
     stats['total'] += 1
     rel_path = str(file.relative_to(SRC_DIR))
     content = file.read_text(encoding='utf-8')
+    if enabled():
+        count(files=1, bytes=len(content.encode('utf-8')))
     
     sim_type = detect_type(content, file.name)
-    canonical = extract_canonical(content)
+    canonical = extract_canonical(index.get(file))
     
     howto_added = 'NON'
     breadcrumb_added = 'NON'
@@ -192,10 +200,13 @@ for file in sim_files:
         'status': 'OK'
     })
 
-with REPORT_CSV.open('w', newline='', encoding='utf-8') as f:
-    writer = csv.DictWriter(f, fieldnames=['fichier', 'howto_added', 'breadcrumb_added', 'internal_links_added', 'status'])
-    writer.writeheader()
-    writer.writerows(csv_rows)
+index.close()
+
+with stage('rapport csv'):
+    with REPORT_CSV.open('w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['fichier', 'howto_added', 'breadcrumb_added', 'internal_links_added', 'status'])
+        writer.writeheader()
+        writer.writerows(csv_rows)
 
 print('\n=== RECAPITULATIF ===')
 print(f'Pages corrigées: {stats["total"]}')
@@ -1,58 +1,42 @@
-import csv
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from lib.analytics_store import AnalyticsStore
+
+ADSENSE_DAILY = 'seach-console-perf/report (1).csv'
+ADSENSE_PAGES = 'seach-console-perf/report (2).csv'
+SC_DAILY = 'seach-console-perf/www.lescalculateurs.fr_SearchPerformanceOverview_All_6_6_2026.csv'
+ADSENSE_COLUMNS = ['earnings', 'page_views', 'page_rpm', 'impressions', 'impression_rpm', 'active_view', 'clicks']
+COUNT_COLUMNS = {'page_views', 'impressions', 'clicks'}
+
+store = AnalyticsStore.ensure([ADSENSE_DAILY, ADSENSE_PAGES, SC_DAILY])
+
+
+def load(path, key, columns):
+    """Lignes d'un export dans l'ordre du fichier (les compteurs restent entiers)"""
+    rows = store.records([key] + columns, store.mask(source=path))
+    for row in rows:
+        for name in COUNT_COLUMNS.intersection(row):
+            row[name] = int(row[name])
+    return rows
+
+
 # ============================================================
 # 1. CHARGEMENT ADSENSE QUOTIDIEN (report 1)
 # ============================================================
-adsense_daily = []
-with open(r'seach-console-perf/report (1).csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        adsense_daily.append({
-            'date': row['Date'],
-            'earnings': float(row['Estimated earnings (EUR)']),
-            'page_views': int(row['Page views']),
-            'page_rpm': float(row['Page RPM (EUR)']),
-            'impressions': int(row['Impressions']),
-            'impression_rpm': float(row['Impression RPM (EUR)']),
-            'active_view': float(row['Active View Viewable']),
-            'clicks': int(row['Clicks'])
-        })
+adsense_daily = load(ADSENSE_DAILY, 'date', ADSENSE_COLUMNS)
 
 # ============================================================
 # 2. CHARGEMENT ADSENSE PAR PAGE (report 2)
 # ============================================================
-adsense_pages = []
-with open(r'seach-console-perf/report (2).csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        adsense_pages.append({
-            'url': row['Page URL'],
-            'earnings': float(row['Estimated earnings (EUR)']),
-            'page_views': int(row['Page views']),
-            'page_rpm': float(row['Page RPM (EUR)']),
-            'impressions': int(row['Impressions']),
-            'impression_rpm': float(row['Impression RPM (EUR)']),
-            'active_view': float(row['Active View Viewable']),
-            'clicks': int(row['Clicks'])
-        })
+adsense_pages = [dict(r, url=r.pop('page')) for r in load(ADSENSE_PAGES, 'page', ADSENSE_COLUMNS)]
 
 # ============================================================
 # 3. CHARGEMENT SEARCH CONSOLE
 # ============================================================
-sc_daily = []
-with open(r'seach-console-perf/www.lescalculateurs.fr_SearchPerformanceOverview_All_6_6_2026.csv', 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        dt_str = row['Date'].replace(' 12:00:00 AM', '')
-        parts = dt_str.split('/')
-        dt = datetime(int(parts[2]), int(parts[0]), int(parts[1]))
-        sc_daily.append({
-            'date': dt.strftime('%Y-%m-%d'),
-            'clicks': int(row['Clicks']),
-            'impressions': int(row['Impressions']),
-            'avg_ctr': float(row['Avg. CTR'])
-        })
+sc_daily = [dict(r, avg_ctr=r.pop('ctr') * 100) for r in load(SC_DAILY, 'date', ['clicks', 'impressions', 'ctr'])]
 
 print('=== DONNEES CHARGEES ===')
 print(f'AdSense jours: {len(adsense_daily)}')
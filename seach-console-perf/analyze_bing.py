@@ -1,29 +1,40 @@
-import csv
+import os
+import sys
 
-def safe_int(val, default=0):
-    try:
-        return int(val)
-    except (ValueError, TypeError):
-        return default
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from lib.analytics_store import AnalyticsStore
 
-def safe_float(val, default=0.0):
-    try:
-        return float(val)
-    except (ValueError, TypeError):
-        return default
+COLUMNS = ['clicks', 'impressions', 'ctr', 'position']
 
-def clean_ctr(val):
-    if val is None:
-        return 0.0
-    return safe_float(str(val).replace('%', ''))
+def bing_lines(store, source, key):
+    """Lignes d'un export Bing : compteurs entiers, CTR en pourcentage"""
+    rows = store.records([key] + COLUMNS, store.mask(source=source))
+    for row in rows:
+        row['clicks'] = int(row['clicks'])
+        row['impressions'] = int(row['impressions'])
+        row['ctr'] = row['ctr'] * 100
+    return rows
+
+def by(metric):
+    return lambda r: r[metric]
+
+def page_name(page, default):
+    """Nom lisible d'une page (/pages/apl/x -> apl/x)"""
+    name = page.split('/')[-1] if '/' in page else default
+    if 'pages/' in page:
+        parts = page.split('pages/')[-1].split('/')
+        name = parts[0] if parts[0] else 'index'
+        if len(parts) > 1:
+            name += '/' + parts[1]
+    return name
 
 # ============================================================
 # 1. KEYWORD REPORT
 # ============================================================
-kw_file = r'seach-console-perf\www.lescalculateurs.fr_KeywordReport_6_6_2026.csv'
-with open(kw_file, 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-    kw_lines = list(reader)
+kw_file = 'seach-console-perf/www.lescalculateurs.fr_KeywordReport_6_6_2026.csv'
+page_file = 'seach-console-perf/www.lescalculateurs.fr_PageTrafficReport_6_6_2026.csv'
+store = AnalyticsStore.ensure([kw_file, page_file])
+kw_lines = bing_lines(store, kw_file, 'query')
 
 print('=' * 60)
 print('BING WEBMASTER TOOLS - ANALYSE MOTS-CLES')
@@ -32,26 +43,18 @@ print('Nombre de mots-cles: {}'.format(len(kw_lines)))
 print()
 
 # Trier par clics
-sorted_kw_clicks = sorted(kw_lines, key=lambda r: safe_int(r.get('Clicks', 0)), reverse=True)
+sorted_kw_clicks = sorted(kw_lines, key=by('clicks'), reverse=True)
 print('=== TOP 20 MOTS-CLES BING (par clics) ===')
 for i, row in enumerate(sorted_kw_clicks[:20]):
-    kw = row.get('Keyword', '?')
-    clicks = safe_int(row.get('Clicks', 0))
-    impr = safe_int(row.get('Impressions', 0))
-    ctr = clean_ctr(row.get('CTR'))
-    pos = safe_float(row.get('Avg. Position', 99))
+    kw, clicks, impr, ctr, pos = row['query'], row['clicks'], row['impressions'], row['ctr'], row['position']
     print('{:2d}. [{}] Clics:{} Impr:{} CTR:{:.1f}% Pos:{:.1f}'.format(i+1, kw[:75], clicks, impr, ctr, pos))
 
 print()
 # Trier par impressions
-sorted_kw_impr = sorted(kw_lines, key=lambda r: safe_int(r.get('Impressions', 0)), reverse=True)
+sorted_kw_impr = sorted(kw_lines, key=by('impressions'), reverse=True)
 print('=== TOP 20 MOTS-CLES BING (par impressions) ===')
 for i, row in enumerate(sorted_kw_impr[:20]):
-    kw = row.get('Keyword', '?')
-    clicks = safe_int(row.get('Clicks', 0))
-    impr = safe_int(row.get('Impressions', 0))
-    ctr = clean_ctr(row.get('CTR'))
-    pos = safe_float(row.get('Avg. Position', 99))
+    kw, clicks, impr, ctr, pos = row['query'], row['clicks'], row['impressions'], row['ctr'], row['position']
     print('{:2d}. [{}] Clics:{} Impr:{} CTR:{:.1f}% Pos:{:.1f}'.format(i+1, kw[:75], clicks, impr, ctr, pos))
 
 print()
@@ -59,24 +62,19 @@ print()
 print('=== OPPORTUNITES BING (Impr > 500, Pos 5-20) ===')
 opps_bing = []
 for r in kw_lines:
-    impr = safe_int(r.get('Impressions', 0))
-    pos = safe_float(r.get('Avg. Position', 30))
+    impr, pos = r['impressions'], r['position']
     if impr > 500 and 5 <= pos <= 20:
         opps_bing.append(r)
-opps_bing.sort(key=lambda r: safe_int(r.get('Impressions', 0)), reverse=True)
+opps_bing.sort(key=by('impressions'), reverse=True)
 for i, row in enumerate(opps_bing[:20]):
-    kw = row.get('Keyword', '?')
-    clicks = safe_int(row.get('Clicks', 0))
-    impr = safe_int(row.get('Impressions', 0))
-    ctr = clean_ctr(row.get('CTR'))
-    pos = safe_float(row.get('Avg. Position', 99))
+    kw, clicks, impr, ctr, pos = row['query'], row['clicks'], row['impressions'], row['ctr'], row['position']
     print('{:2d}. [{}] Clics:{} Impr:{} CTR:{:.1f}% Pos:{:.1f}'.format(i+1, kw[:75], clicks, impr, ctr, pos))
 
 # Stats globales
-total_kw_clicks = sum(safe_int(r.get('Clicks', 0)) for r in kw_lines)
-total_kw_impr = sum(safe_int(r.get('Impressions', 0)) for r in kw_lines)
+total_kw_clicks = sum(r['clicks'] for r in kw_lines)
+total_kw_impr = sum(r['impressions'] for r in kw_lines)
 avg_kw_ctr = total_kw_clicks / total_kw_impr * 100 if total_kw_impr > 0 else 0
-positions = [safe_float(r.get('Avg. Position', 0)) for r in kw_lines]
+positions = [r['position'] for r in kw_lines]
 positions = [p for p in positions if p > 0]
 avg_kw_pos = sum(positions) / len(positions) if positions else 0
 
@@ -90,10 +88,7 @@ print('Position moyenne: {:.1f}'.format(avg_kw_pos))
 # ============================================================
 # 2. PAGE TRAFFIC REPORT
 # ============================================================
-page_file = r'seach-console-perf\www.lescalculateurs.fr_PageTrafficReport_6_6_2026.csv'
-with open(page_file, 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-    page_lines = list(reader)
+page_lines = bing_lines(store, page_file, 'page')
 
 print()
 print('=' * 60)
@@ -102,26 +97,16 @@ print('=' * 60)
 print('Nombre de pages: {}'.format(len(page_lines)))
 print()
 
-sorted_pages_clicks = sorted(page_lines, key=lambda r: safe_int(r.get('Clicks', 0)), reverse=True)
+sorted_pages_clicks = sorted(page_lines, key=by('clicks'), reverse=True)
 print('=== TOP 20 PAGES BING (par clics) ===')
 for i, row in enumerate(sorted_pages_clicks[:20]):
-    page = row.get('Page', '?')
-    name = page.split('/')[-1] if '/' in page else page
-    # Nom plus lisible
-    if 'pages/' in page:
-        parts = page.split('pages/')[-1].split('/')
-        name = parts[0] if parts[0] else 'index'
-        if len(parts) > 1:
-            name += '/' + parts[1]
-    clicks = safe_int(row.get('Clicks', 0))
-    impr = safe_int(row.get('Impressions', 0))
-    ctr = clean_ctr(row.get('CTR'))
-    pos = safe_float(row.get('Avg. Position', 99))
+    name = page_name(row['page'], row['page'])
+    clicks, impr, ctr, pos = row['clicks'], row['impressions'], row['ctr'], row['position']
     print('{:2d}. [{:30s}] Clics:{:5d} Impr:{:7d} CTR:{:5.2f}% Pos:{:.1f}'.format(i+1, name, clicks, impr, ctr, pos))
 
 # Stats globales pages
-total_page_clicks = sum(safe_int(r.get('Clicks', 0)) for r in page_lines)
-total_page_impr = sum(safe_int(r.get('Impressions', 0)) for r in page_lines)
+total_page_clicks = sum(r['clicks'] for r in page_lines)
+total_page_impr = sum(r['impressions'] for r in page_lines)
 avg_page_ctr = total_page_clicks / total_page_impr * 100 if total_page_impr > 0 else 0
 
 print()
@@ -160,15 +145,8 @@ print('-' * 55)
 # For a rough comparison, we use the overall CTR
 google_avg_ctr = 1.55  # from earlier SC analysis
 for i, row in enumerate(sorted_pages_clicks[:15]):
-    page = row.get('Page', '?')
-    name = page.split('/')[-1] if '/' in page else 'index'
-    if 'pages/' in page:
-        parts = page.split('pages/')[-1].split('/')
-        name = parts[0] if parts[0] else 'index'
-        if len(parts) > 1:
-            name += '/' + parts[1]
-    ctr_bing = clean_ctr(row.get('CTR'))
-    pos_bing = safe_float(row.get('Avg. Position', 99))
+    name = page_name(row['page'], 'index')
+    ctr_bing, pos_bing = row['ctr'], row['position']
     # Rough Google CTR based on position
     google_ctr_est = 0
     if pos_bing <= 3:
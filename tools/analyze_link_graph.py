@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Graphe des liens internes : PageRank, pages orphelines, profondeur de clic.
+
+Usage : python tools/analyze_link_graph.py [-j N] [--prefix /pages/rsa] [--limit 20]
+
+Les <a href> de src/index.html et de src/pages/ (récursif) sont extraits en
+parallèle (résultats mis en cache par empreinte de fichier, .cache/audit/),
+résolus en URL servies puis assemblés en matrice creuse (voir lib.link_graph).
+Le rapport JSON (reports/link-graph-report.json) liste pour chaque page son
+PageRank, ses degrés et sa profondeur depuis l'accueil ; la console résume
+orphelines, pages inaccessibles, histogramme des profondeurs, pages les plus
+et les moins liées et liens internes sans page.
+
+--prefix limite le classement des pages les plus faibles à une section (par
+exemple les pages pSEO générées), pour repérer celles que le maillage oublie.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from lib import REPO_ROOT
+from lib.cache import AuditCache, rules_fingerprint
+from lib.link_graph import LinkGraph, load_redirects, resolve_href
+from lib.page_index import LINK_RE, derived_path
+from lib.scan import read_page, scan_files
+
+REPORT_PATH = REPO_ROOT / 'reports' / 'link-graph-report.json'
+PAGES_DIR = REPO_ROOT / 'src' / 'pages'
+HOME_PAGE = REPO_ROOT / 'src' / 'index.html'
+CACHE_VERSION = 1
+
+
+def extract_links(path: str) -> List[str]:
+    """href bruts des <a> d'une page, dans l'ordre du document"""
+    _, content = read_page(path)
+    return LINK_RE.findall(content)
+
+
+def list_nodes() -> List[tuple]:
+    """[(url, chemin)] : l'accueil puis src/pages/**/*.html ; x.html l'emporte sur x/index.html"""
+    nodes = {}
+    if HOME_PAGE.exists():
+        nodes['/'] = HOME_PAGE
+    for path in sorted(PAGES_DIR.rglob('*.html'), key=lambda p: p.as_posix()):
+        nodes.setdefault(derived_path(path, PAGES_DIR, '/pages'), path)
+    return list(nodes.items())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='PageRank, orphelines et profondeur de clic du maillage interne')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='nombre de processus (0 = tous les cœurs, défaut : 1)')
+    parser.add_argument('--prefix', default='/pages/', help='section pour le classement des pages faibles')
+    parser.add_argument('--limit', type=int, default=15, help='longueur des classements affichés')
+    parser.add_argument('--output', default=str(REPORT_PATH), help='chemin du rapport JSON')
+    parser.add_argument('--no-cache', action='store_true', help='ignore le cache des liens extraits')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    nodes = list_nodes()
+    urls = [url for url, _ in nodes]
+    paths = [str(path) for _, path in nodes]
+
+    cache = AuditCache('analyze_link_graph', rules_fingerprint(CACHE_VERSION, LINK_RE.pattern),
+                       enabled=not args.no_cache)
+    hrefs = [cache.get(path) for path in paths]
+    dirty = [i for i, result in enumerate(hrefs) if result is None]
+    for i, result in zip(dirty, scan_files([paths[i] for i in dirty], extract_links, args.jobs)):
+        hrefs[i] = result
+        cache.put(paths[i], result)
+    cache.save()
+    extracted = time.perf_counter() - start
+
+    redirects = load_redirects()
+    links = []
+    for url, page_hrefs in zip(urls, hrefs):
+        targets = (resolve_href(href, url, redirects) for href in page_hrefs)
+        links.append([target for target in targets if target is not None])
+    graph = LinkGraph.build(urls, links)
+    rank = graph.pagerank()
+    in_degree = graph.in_degree()
+    out_degree = graph.out_degree()
+    depth = graph.click_depth('/')
+    orphans = graph.orphans('/')
+    elapsed = time.perf_counter() - start
+
+    unreachable = np.flatnonzero(depth < 0)
+    levels, counts = np.unique(depth[depth >= 0], return_counts=True)
+    by_rank = np.argsort(-rank, kind='stable')
+    in_prefix = np.asarray([url.startswith(args.prefix) for url in urls], dtype=bool)
+    weakest = [i for i in np.argsort(rank, kind='stable') if in_prefix[i]]
+    broken = sorted(graph.unresolved.items(), key=lambda item: (-item[1], item[0]))
+
+    report = {
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        'nodes': graph.n,
+        'edges': graph.edges,
+        'orphans': [urls[i] for i in orphans],
+        'unreachable': [urls[i] for i in unreachable],
+        'depthHistogram': {str(int(level)): int(count) for level, count in zip(levels, counts)},
+        'unresolved': dict(broken),
+        'pages': [{
+            'url': urls[i],
+            'file': str(Path(paths[i]).relative_to(REPO_ROOT).as_posix()),
+            'pagerank': round(float(rank[i]), 8),
+            'inDegree': int(in_degree[i]),
+            'outDegree': int(out_degree[i]),
+            'depth': int(depth[i]) if depth[i] >= 0 else None,
+        } for i in by_rank],
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"🔗 {graph.n} pages, {graph.edges} liens internes distincts "
+          f"({len(dirty)} pages analysées, {len(paths) - len(dirty)} depuis le cache)")
+    print(f"   extraction {extracted:.2f} s, total {elapsed:.2f} s")
+    print(f"\nPages orphelines (aucun lien entrant) : {len(orphans)}")
+    for i in orphans[:args.limit]:
+        print(f"  {urls[i]}")
+    if len(orphans) > args.limit:
+        print(f"  ... et {len(orphans) - args.limit} autres")
+    print(f"Pages inaccessibles depuis l'accueil : {len(unreachable)}")
+    print("\nProfondeur de clic depuis l'accueil :")
+    for level, count in zip(levels, counts):
+        print(f"  {int(level):2d} clic(s) : {int(count)}")
+
+    print(f"\nPageRank le plus élevé :")
+    for i in by_rank[:args.limit]:
+        print(f"  {rank[i] * 100:6.3f} %  in={int(in_degree[i]):4d}  {urls[i]}")
+    if weakest:
+        print(f"\nPageRank le plus faible ({args.prefix}) :")
+        for i in weakest[:args.limit]:
+            shown = int(depth[i]) if depth[i] >= 0 else '-'
+            print(f"  {rank[i] * 100:6.3f} %  in={int(in_degree[i]):4d}  profondeur={shown}  {urls[i]}")
+    if broken:
+        print(f"\nLiens internes sans page ({len(broken)} cibles) :")
+        for target, count in broken[:args.limit]:
+            print(f"  {count:4d} × {target}")
+    print(f"\n✅ Rapport : {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Benchmarks des scripts Python sur un corpus de pages synthétique.
+
+Usage : python tools/benchmark.py [--pages 1000] [--seed 1] [-j 1] [--stages verify_all,scan_encoding]
+        python tools/benchmark.py --pages 50000 --repeat 3
+
+Le corpus (voir lib.synthetic_corpus) est généré une fois dans
+.cache/bench/<pages>-<graine>/ puis réutilisé. Chaque étape est lancée dans un
+processus à part avec LESCALCULATEURS_ROOT pointant sur le corpus, caches
+vidés (mesure à froid) ; on relève le temps écoulé, le temps CPU, la mémoire
+résidente maximale (wait4) et le débit en pages et Mo par seconde.
+
+Chaque passage est ajouté à reports/benchmark-history.json. Une étape est en
+régression si son temps ou sa mémoire dépasse de plus de --tolerance la
+médiane des derniers passages comparables (même corpus, même -j, même nombre
+de cœurs) ; le code de retour est alors 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from lib.synthetic_corpus import GENERATOR_VERSION, MIRROR_DIR, generate
+
+# Code du dépôt (indépendant de LESCALCULATEURS_ROOT)
+CODE_ROOT = Path(__file__).resolve().parents[1]
+BENCH_DIR = CODE_ROOT / '.cache' / 'bench'
+HISTORY_PATH = CODE_ROOT / 'reports' / 'benchmark-history.json'
+HISTORY_WINDOW = 5
+
+# nom -> (script, arguments, entrées [(dossier, récursif)], sorties à effacer avant l'étape)
+STAGES = {
+    'verify_all': ('verify_all.py', ['--no-cache'], [('src/pages', False), (MIRROR_DIR, False)], []),
+    'scan_encoding': ('tools/scan_encoding.py', ['--no-cache'], [('src/pages', True), (MIRROR_DIR, True)], []),
+    'add_simulateur_schemas': ('scripts/add_simulateur_schemas.py', [], [(MIRROR_DIR, True)],
+                               ['pages_SIMULATEURS_PLUS', 'SIMULATEURS_PLUS_REPORT.csv']),
+    'find_near_duplicates': ('tools/find_near_duplicates.py', ['--no-cache'],
+                             [('src/pages', True), (MIRROR_DIR, True)], ['reports']),
+    'generate_sitemap': ('tools/generate_sitemap.py', [], [('src/pages', True)], ['public', 'data']),
+}
+JOBS_STAGES = ('verify_all', 'scan_encoding', 'add_simulateur_schemas', 'find_near_duplicates')
+
+
+def stage_inputs(root: Path, inputs) -> tuple:
+    """(nombre de pages, octets) lus par une étape"""
+    files = []
+    for directory, recursive in inputs:
+        base = root / directory
+        if base.is_dir():
+            files.extend(base.rglob('*.html') if recursive else base.glob('*.html'))
+    return len(files), sum(f.stat().st_size for f in files)
+
+
+def run_stage(name: str, root: Path, jobs: int) -> Dict:
+    script, arguments, inputs, outputs = STAGES[name]
+    shutil.rmtree(root / '.cache', ignore_errors=True)
+    for output in outputs:
+        path = root / output
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink(missing_ok=True)
+    for directory in ('public', 'data', 'reports'):
+        (root / directory).mkdir(exist_ok=True)
+
+    command = [sys.executable, str(CODE_ROOT / script)] + arguments
+    if name in JOBS_STAGES:
+        command += ['-j', str(jobs)]
+    env = dict(os.environ, LESCALCULATEURS_ROOT=str(root), PYTHONDONTWRITEBYTECODE='1')
+    log_path = root / 'logs' / f'{name}.log'
+    log_path.parent.mkdir(exist_ok=True)
+    with open(log_path, 'wb') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=root, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 donne l'usage des ressources de ce seul processus (et de ses fils)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    pages, size = stage_inputs(root, inputs)
+    return {
+        'wall': round(wall, 4),
+        'cpu': round(usage.ru_utime + usage.ru_stime, 4),
+        # ru_maxrss : Ko sous Linux, octets sous macOS
+        'peak_rss_mb': round(usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+        'pages': pages,
+        'mb': round(size / 1e6, 2),
+        'pages_per_s': round(pages / wall, 1) if wall else None,
+        'mb_per_s': round(size / 1e6 / wall, 2) if wall else None,
+        'exit_code': process.returncode,
+        'log': str(log_path),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=CODE_ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=CODE_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('+' if dirty else '')
+
+
+def load_history(path: Path) -> List[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('runs', [])
+    except (OSError, ValueError):
+        return []
+
+
+def comparable(run: Dict, other: Dict) -> bool:
+    keys = ('pages', 'seed', 'generator', 'jobs')
+    return (all(run['corpus'].get(k) == other['corpus'].get(k) for k in keys if k in run['corpus'])
+            and run['jobs'] == other['jobs'] and run['host']['cpus'] == other['host']['cpus'])
+
+
+def regressions(run: Dict, history: List[Dict], tolerance: float) -> List[str]:
+    """Étapes plus lentes ou plus gourmandes que la médiane des passages comparables"""
+    previous = [r for r in history if comparable(run, r)][-HISTORY_WINDOW:]
+    found = []
+    for name, stage in run['stages'].items():
+        for metric, label in (('wall', 'temps'), ('peak_rss_mb', 'mémoire')):
+            values = [r['stages'][name][metric] for r in previous if name in r['stages']]
+            if not values:
+                continue
+            reference = statistics.median(values)
+            if reference and stage[metric] > reference * (1 + tolerance):
+                found.append(f"{name} : {label} {stage[metric]} contre {reference:.2f} "
+                             f"(médiane de {len(values)} passages, +{(stage[metric] / reference - 1) * 100:.0f} %)")
+    return found
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmarks des scripts Python sur un corpus synthétique')
+    parser.add_argument('--pages', type=int, default=1000, help='pages du corpus (défaut : 1000)')
+    parser.add_argument('--seed', type=int, default=1, help='graine du corpus (défaut : 1)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='processus passés aux scripts parallèles (défaut : 1)')
+    parser.add_argument('--stages', default=','.join(STAGES), help='étapes, séparées par des virgules')
+    parser.add_argument('--repeat', type=int, default=1, help='passages par étape, le plus rapide est retenu')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='écart toléré par rapport à la médiane (défaut : 0.25 = 25 %%)')
+    parser.add_argument('--history', default=str(HISTORY_PATH), help='historique JSON des passages')
+    parser.add_argument('--no-record', action='store_true', help="n'ajoute pas ce passage à l'historique")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    names = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        sys.exit(f"❌ Étapes inconnues : {', '.join(unknown)} (disponibles : {', '.join(STAGES)})")
+
+    root = BENCH_DIR / f'{args.pages}-{args.seed}'
+    start = time.perf_counter()
+    corpus = generate(root, args.pages, args.seed)
+    print(f"📦 Corpus {root} : {corpus['files']} fichiers, {corpus['bytes'] / 1e6:.1f} Mo "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    run = {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+        'revision': git_revision(),
+        'jobs': args.jobs,
+        'host': {'cpus': os.cpu_count(), 'python': platform.python_version(), 'platform': platform.platform()},
+        'corpus': {'pages': args.pages, 'seed': args.seed, 'generator': GENERATOR_VERSION,
+                   'files': corpus['files'], 'bytes': corpus['bytes']},
+        'stages': {},
+    }
+    print(f"\n{'étape':24s} {'temps':>8s} {'CPU':>8s} {'RSS max':>9s} {'pages/s':>9s} {'Mo/s':>7s}  code")
+    for name in names:
+        results = [run_stage(name, root, args.jobs) for _ in range(max(args.repeat, 1))]
+        best = min(results, key=lambda result: result['wall'])
+        best['peak_rss_mb'] = max(result['peak_rss_mb'] for result in results)
+        run['stages'][name] = best
+        print(f"{name:24s} {best['wall']:7.2f}s {best['cpu']:7.2f}s {best['peak_rss_mb']:7.1f}Mo "
+              f"{best['pages_per_s'] or 0:9.1f} {best['mb_per_s'] or 0:7.2f}  {best['exit_code']}")
+
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    found = regressions(run, history, args.tolerance)
+    if not args.no_record:
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, 'w', encoding='utf-8') as f:
+            json.dump({'runs': history + [run]}, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 Passage ajouté à {history_path} ({len(history) + 1} au total)")
+
+    # Un script qui plante fausse la mesure ; verify_all et scan_encoding
+    # sortent en 1 quand ils trouvent les défauts semés dans le corpus
+    crashed = [name for name, stage in run['stages'].items() if stage['exit_code'] not in (0, 1)]
+    for name in crashed:
+        print(f"❌ {name} a échoué (code {run['stages'][name]['exit_code']}), voir {run['stages'][name]['log']}")
+    if found:
+        print("\n❌ Régressions :")
+        for line in found:
+            print(f"  {line}")
+    elif not crashed:
+        print("\n✅ Aucune régression")
+    if found or crashed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
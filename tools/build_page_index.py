@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Construit / met à jour l'index des pages (.cache/page-index.sqlite).
+
+Usage : python tools/build_page_index.py [dossier ...]   (défaut : src/pages)
+Seules les pages modifiées depuis le dernier passage sont réanalysées.
+"""
+import sys
+import time
+
+from lib.page_index import INDEX_PATH, PageIndex
+
+
+def main():
+    dirs = sys.argv[1:] or None
+    start = time.perf_counter()
+    with PageIndex() as index:
+        parsed = index.refresh(dirs)
+        total = index.conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+    elapsed = time.perf_counter() - start
+    print(f"Index : {INDEX_PATH}")
+    print(f"Pages indexées : {total} | réanalysées : {parsed} | {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Construction des grilles de résultats du scenario-engine.
+
+Usage : python tools/build_result_grids.py [--output-dir DIR]
+
+Pour chaque calculateur de scenario-engine/data/scenarios.json disposant d'un
+moteur de référence, toutes les combinaisons situation × enfants × revenu ×
+logement sont évaluées en un seul passage vectorisé et enregistrées dans
+.cache/grids/ (voir lib.result_grid). generate-pages.cjs lit ensuite les
+montants dans la grille au lieu de les recalculer page par page ; il revient
+au calcul direct si la grille est absente ou périmée.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from lib.reference_engines import prime_activite
+from lib.result_grid import (AXES, GRID_DIR, SCENARIOS_JSON, engine_digest, fixed_fields, grid_axes, mesh,
+                             write_grid)
+
+# calculateur -> (moteur vectorisé, champs stockés)
+ENGINES = {
+    'prime-activite': (prime_activite, ('montantEstime', 'montantBase', 'bonification')),
+}
+
+
+def build(name: str, aide: dict, output_dir) -> dict:
+    engine, fields = ENGINES[name]
+    start = time.perf_counter()
+    axes = grid_axes(aide)
+    situation, enfants, revenus, logement = mesh(axes)
+    fixed = fixed_fields(aide)
+    results = engine(aide['barèmes'], situation, enfants, revenus, logement,
+                     autres_revenus=fixed.get('autresRevenus') or 0)
+    shape = tuple(len(axes[axis]) for axis in AXES)
+    values = np.stack([np.broadcast_to(results[field], shape) for field in fields], axis=-1)
+    header = {
+        'calculator': name,
+        'axes': axes,
+        'fields': list(fields),
+        'fixed': fixed,
+        'baremes': aide['barèmes'],
+        'engine': engine_digest(name),
+    }
+    json_path, bin_path = write_grid(name, header, values, output_dir)
+    return {
+        'calculator': name,
+        'cells': int(np.prod(shape)),
+        'shape': 'x'.join(str(n) for n in shape),
+        'seconds': time.perf_counter() - start,
+        'bytes': json_path.stat().st_size + bin_path.stat().st_size,
+        'bin_bytes': bin_path.stat().st_size,
+        'path': bin_path,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Précalcule les grilles de résultats du scenario-engine')
+    parser.add_argument('--output-dir', default=str(GRID_DIR), help=f'dossier de sortie (défaut : {GRID_DIR})')
+    args = parser.parse_args()
+
+    with open(SCENARIOS_JSON, encoding='utf-8') as f:
+        data = json.load(f)
+
+    for name, aide in data.items():
+        if name not in ENGINES:
+            print(f"⚠️ {name} : pas de moteur de référence, grille non construite")
+            continue
+        stats = build(name, aide, args.output_dir)
+        print(f"✅ {name} : {stats['cells']} combinaisons ({stats['shape']}) en {stats['seconds'] * 1000:.1f} ms")
+        print(f"   {stats['path']} : {stats['bin_bytes']} octets (binaire), {stats['bytes']} octets avec l'en-tête")
+
+
+if __name__ == '__main__':
+    main()
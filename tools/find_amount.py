@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Recherche d'un montant dans tout le corpus (index inversé des montants).
+
+Usage : python tools/find_amount.py 652,02 "1 304,04" [--euro] [--prefix src/pages/rsa]
+        python tools/find_amount.py --stats
+
+L'index (.cache/amount-index.sqlite) couvre src/pages et les dossiers miroirs ;
+il est mis à jour avant chaque recherche, seules les pages modifiées depuis le
+dernier passage sont relues.
+"""
+import argparse
+import json
+import sys
+import time
+
+from lib.amount_index import INDEX_PATH, AmountIndex, format_cents, parse_amount
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Recherche de montants dans les pages et les miroirs')
+    parser.add_argument('amounts', nargs='*', help='montants à rechercher (« 652,02 », « 1 173,04 », « 978 € »)')
+    parser.add_argument('--dirs', nargs='+', help='dossiers à indexer (défaut : src/pages et les miroirs)')
+    parser.add_argument('--prefix', default='', help='limite aux pages dont le chemin commence par ce préfixe')
+    parser.add_argument('--euro', action='store_true', help='seulement les montants suivis de € / EUR')
+    parser.add_argument('--limit', type=int, default=20, help='occurrences affichées par montant (défaut : 20)')
+    parser.add_argument('--json', action='store_true', help='sortie JSON')
+    parser.add_argument('--stats', action='store_true', help="affiche la taille de l'index")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        wanted = [(text, parse_amount(text)) for text in args.amounts]
+    except ValueError as e:
+        sys.exit(f'❌ {e}')
+
+    start = time.perf_counter()
+    with AmountIndex() as index:
+        reindexed = index.refresh(args.dirs)
+        refreshed = time.perf_counter() - start
+        results = {text: index.lookup(cents, args.euro, args.prefix) for text, cents in wanted}
+        files, hits, distinct = index.stats()
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    if args.stats or not wanted:
+        print(f"Index : {INDEX_PATH}")
+        print(f"Fichiers : {files} | occurrences : {hits} | montants distincts : {distinct}")
+    print(f"Réindexés : {reindexed} fichier(s) en {refreshed:.2f}s")
+    for text, cents in wanted:
+        rows = results[text]
+        pages = len({row['path'] for row in rows})
+        print(f"\n{format_cents(cents)} € : {len(rows)} occurrence(s) dans {pages} page(s)")
+        for row in rows[:args.limit]:
+            print(f"  {row['path']}:{row['line']}  …{row['context']}…")
+        if len(rows) > args.limit:
+            print(f"  ... {len(rows) - args.limit} autre(s)")
+
+
+if __name__ == '__main__':
+    main()
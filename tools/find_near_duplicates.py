@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Détection des pages quasi identiques (MinHash + LSH).
+
+Usage : python tools/find_near_duplicates.py [dossier ...] [-j N] [--threshold 0.8]
+        (défaut : src/pages et les dossiers miroirs pages_*)
+
+Le texte visible de chaque page (hors nav/header/footer/aside, nombres
+neutralisés) est découpé en shingles de 5 mots puis réduit à une signature
+MinHash ; le LSH propose les paires candidates en temps quasi linéaire. Les
+signatures sont mises en cache par empreinte de fichier (.cache/audit/), un
+nouveau passage ne relit que les pages modifiées.
+
+Par défaut les pages ne sont comparées qu'au sein de leur dossier (un miroir
+est par construction une copie de src/pages) ; --cross compare tout. Les
+jumeaux de build (x.html et x/index.html avec la même URL canonique) ne
+comptent que pour une page : le premier est comparé, les autres sont listés
+dans `twins`. Une page qui n'est pas en UTF-8 valide est lue avec des
+caractères de remplacement plutôt que d'interrompre l'analyse.
+
+Le rapport (reports/near-duplicates-report.json) reprend la forme de
+reports/duplication-fuzzy-report.json : un cluster par groupe de pages,
+`items` = {file, code, orig (titre), norm (titre normalisé), twins éventuels}.
+"""
+import argparse
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from lib import REPO_ROOT
+from lib.cache import AuditCache, rules_fingerprint
+from lib.minhash import (MinHasher, band_threshold, lsh_clusters, normalize_text,
+                         shingle_hashes, signatures_matrix)
+from lib.page_index import CANONICAL_RE, TITLE_RE, visible_text
+from lib.scan import CORPUS_DIRS, scan_files
+from lib.stage_diff import page_key
+
+REPORT_PATH = REPO_ROOT / 'reports' / 'near-duplicates-report.json'
+CACHE_VERSION = 2
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+SEED = 1
+
+# Blocs communs à toutes les pages, qui gonfleraient artificiellement la similarité
+BOILERPLATE_RE = re.compile(r'<(nav|header|footer|aside)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+DEPARTMENT_RE = re.compile(r'frais-notaire-([0-9]{1,3}|2A|2B)', re.IGNORECASE)
+
+HASHER = MinHasher(NUM_PERM, SEED)
+
+
+def page_code(path: str) -> str:
+    """Code département (frais-notaire-XX) ou nom du fichier, comme check_duplication_fuzzy.cjs"""
+    match = DEPARTMENT_RE.search(path)
+    return match.group(1) if match else os.path.basename(path)
+
+
+def analyse_page(path: str) -> Tuple[str, Optional[str], Optional[List[int]]]:
+    """(titre, URL canonique, signature MinHash) d'une page ; signature None si la page n'a pas de texte"""
+    with open(path, 'rb') as f:
+        content = f.read().decode('utf-8', errors='replace')
+    title_match = TITLE_RE.search(content)
+    title = ' '.join(title_match.group(1).split()) if title_match else ''
+    canonical_match = CANONICAL_RE.search(content)
+    canonical = next((g for g in canonical_match.groups() if g), None) if canonical_match else None
+    text = visible_text(BOILERPLATE_RE.sub(' ', content))
+    signature = HASHER.signature(shingle_hashes(text, SHINGLE_SIZE))
+    return title, canonical.strip().rstrip('/') if canonical else None, \
+        signature.tolist() if signature is not None else None
+
+
+def twin_stem(path: str) -> str:
+    """x.html, x/index.html (et leurs variantes à suffixe d'étape) -> x"""
+    stem = os.path.splitext(page_key(path))[0]
+    return stem[:-len('/index')] if stem.endswith('/index') else stem
+
+
+def list_pages(dirs: List[str]) -> List[Tuple[str, str]]:
+    """[(chemin relatif, dossier racine)] des .html (récursif), triés par chemin"""
+    pages = []
+    for directory in dirs:
+        root = Path(directory)
+        if not root.is_absolute():
+            root = REPO_ROOT / root
+        if not root.is_dir():
+            continue
+        for path in sorted(root.rglob('*.html'), key=lambda p: p.as_posix()):
+            pages.append((os.path.relpath(path, REPO_ROOT), directory))
+    return pages
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Détection des pages quasi identiques (MinHash + LSH)')
+    parser.add_argument('dirs', nargs='*', help='dossiers à analyser (défaut : src/pages et les miroirs)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='nombre de processus (0 = tous les cœurs, défaut : 1)')
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help='similarité de Jaccard minimale (défaut : 0.8)')
+    parser.add_argument('--cross', action='store_true',
+                        help='compare aussi les pages de dossiers différents')
+    parser.add_argument('--output', default=str(REPORT_PATH), help='chemin du rapport JSON')
+    parser.add_argument('--no-cache', action='store_true', help='ignore le cache des signatures')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    pages = list_pages(args.dirs or CORPUS_DIRS)
+    paths = [str(REPO_ROOT / path) for path, _ in pages]
+
+    cache = AuditCache('find_near_duplicates',
+                       rules_fingerprint(CACHE_VERSION, SHINGLE_SIZE, NUM_PERM, SEED,
+                                         BOILERPLATE_RE.pattern),
+                       enabled=not args.no_cache)
+    results = [cache.get(path) for path in paths]
+    dirty = [i for i, result in enumerate(results) if result is None]
+    for i, result in zip(dirty, scan_files([paths[i] for i in dirty], analyse_page, args.jobs)):
+        results[i] = result
+        cache.put(paths[i], list(result))
+    cache.save()
+
+    # Jumeaux de build : même canonique et même chemin au /index près
+    twins: Dict[int, List[str]] = {}
+    first: Dict[Tuple, int] = {}
+    kept = []
+    for i, (_, canonical, signature) in enumerate(results):
+        if signature is None:
+            continue
+        if canonical:
+            key = (twin_stem(pages[i][0]), canonical)
+            if key in first:
+                twins[first[key]].append(pages[i][0])
+                continue
+            first[key] = i
+            twins[i] = []
+        kept.append(i)
+    collapsed = sum(len(paths) for paths in twins.values())
+    signatures = signatures_matrix((np.asarray(results[i][2]) for i in kept), NUM_PERM)
+    groups = None if args.cross else [pages[i][1] for i in kept]
+    found = lsh_clusters(signatures, args.threshold, BANDS, groups)
+
+    clusters = []
+    for members, score in found:
+        items = []
+        for k in members:
+            path = pages[kept[k]][0]
+            title = results[kept[k]][0]
+            item = {'file': path, 'code': page_code(path), 'orig': title, 'norm': normalize_text(title)}
+            if twins.get(kept[k]):
+                item['twins'] = twins[kept[k]]
+            items.append(item)
+        clusters.append({
+            'items': items,
+            'departments': list(dict.fromkeys(item['code'] for item in items)),
+            'similarity': round(score, 3),
+        })
+
+    report = {
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        'totalPages': len(pages),
+        'twinsCollapsed': collapsed,
+        'clustersFound': len(clusters),
+        'clusters': clusters,
+        'meta': {
+            'normalization': 'visible text without nav/header/footer/aside, numbers->#num#, lowercased',
+            'method': f'MinHash ({NUM_PERM} permutations, {SHINGLE_SIZE}-word shingles) + LSH '
+                      f'({BANDS} bands), estimated Jaccard >= {args.threshold}',
+            'scope': 'all directories' if args.cross else 'within each directory',
+        },
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    elapsed = time.perf_counter() - start
+    duplicated = sum(len(c['items']) for c in clusters)
+    print(f"Pages : {len(pages)} ({len(pages) - len(kept) - collapsed} sans texte, "
+          f"{collapsed} jumeaux de même canonique) | cache : {cache.hits} réutilisées, {cache.misses} analysées")
+    print(f"Seuil : {args.threshold} (candidats LSH dès ~{band_threshold(NUM_PERM, BANDS):.2f})")
+    print(f"Clusters : {len(clusters)} | pages concernées : {duplicated} | {elapsed:.2f}s")
+    for cluster in clusters[:10]:
+        files = [item['file'] for item in cluster['items']]
+        print(f"  {len(files):4d} pages | sim {cluster['similarity']:.2f} | {files[0]}, {files[1]}"
+              + (', ...' if len(files) > 2 else ''))
+    print(f"Rapport : {output}")
+
+
+if __name__ == '__main__':
+    main()
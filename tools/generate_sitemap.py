@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Génère les sitemaps des pages à partir de l'arborescence (remplace
+seach-console-perf/gen_sitemap.py et sa liste d'URL codée en dur).
+
+Usage : python tools/generate_sitemap.py [--gzip] [--dry-run]
+
+- Pages : src/index.html, src/pages/**/*.html, public/scenarios/**/*.html.
+  L'URL est la canonique de la page (à défaut, dérivée du chemin) ; les
+  pages noindex et celles dont la canonique sort de /, /pages et /scenarios
+  (guides, catégories : sitemaps dédiés) sont exclues.
+- lastmod : registre data/sitemap-lastmod.json (empreinte du contenu ->
+  date). La date ne change que si le contenu de la page change ; à la
+  première apparition elle reprend celle de public/sitemap.xml si l'URL y
+  figure, sinon la date du jour.
+- Découpage : une section de src/pages/ d'au moins MIN_SECTION pages a son
+  propre fichier (sitemap-pages-apl.xml, ...), le reste va dans
+  sitemap-pages.xml. public/sitemap-index.xml référence ces fichiers ainsi
+  que sitemap-guides/actualites/categories.xml.
+- Seuls les fichiers dont le contenu change sont réécrits.
+
+public/sitemap.xml n'est pas modifié : les scripts Node (ajout des
+satellites, publication d'indexation, ...) continuent de le lire. Il n'est
+plus déclaré dans robots.txt, qui ne référence que sitemap-index.xml (sinon
+chaque page serait soumise deux fois).
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import re
+import sys
+from collections import Counter, OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lib import REPO_ROOT
+from lib.page_index import PageIndex, derived_path
+
+DOMAIN = 'https://www.lescalculateurs.fr'
+PUBLIC_DIR = REPO_ROOT / 'public'
+LEDGER_PATH = REPO_ROOT / 'data' / 'sitemap-lastmod.json'
+LEGACY_SITEMAP = PUBLIC_DIR / 'sitemap.xml'
+INDEX_NAME = 'sitemap-index.xml'
+HOME_PAGE = REPO_ROOT / 'src' / 'index.html'
+# (dossier, préfixe d'URL)
+SOURCES = [
+    (REPO_ROOT / 'src' / 'pages', '/pages'),
+    (REPO_ROOT / 'public' / 'scenarios', '/scenarios'),
+]
+# Sitemaps maintenus par d'autres scripts, référencés tels quels dans l'index
+STATIC_SITEMAPS = ['sitemap-guides.xml', 'sitemap-actualites.xml', 'sitemap-categories.xml']
+MIN_SECTION = 20
+MAX_URLS = 50000
+LEDGER_VERSION = 1
+
+_SITE_RE = re.compile(r'^https?://(?:www\.)?lescalculateurs\.fr', re.IGNORECASE)
+_ENTRY_RE = re.compile(
+    r'<loc>([^<]+)</loc>\s*<lastmod>([^<]+)</lastmod>\s*'
+    r'<changefreq>([^<]+)</changefreq>\s*<priority>([^<]+)</priority>')
+_LASTMOD_RE = re.compile(r'<lastmod>([^<]+)</lastmod>')
+
+
+# ============================================================
+# DÉCOUVERTE DES PAGES
+# ============================================================
+def page_url(record: Dict, fallback: str) -> str:
+    """URL absolue : la canonique si elle pointe sur le site, sinon le chemin dérivé"""
+    canonical = (record.get('canonical') or '').strip()
+    path = fallback
+    if _SITE_RE.match(canonical):
+        path = _SITE_RE.sub('', canonical).split('#')[0].split('?')[0] or '/'
+    return DOMAIN + path
+
+
+def is_noindex(record: Dict) -> bool:
+    return 'noindex' in (record.get('robots') or '').lower()
+
+
+def in_scope(url: str) -> bool:
+    """Les canoniques hors des préfixes gérés (/guides, /categorie, ...) relèvent des autres sitemaps"""
+    path = url[len(DOMAIN):]
+    return path == '/' or any(path == prefix or path.startswith(prefix + '/') for _, prefix in SOURCES)
+
+
+def discover_pages(index: PageIndex) -> Tuple[Dict[str, str], int, int]:
+    """
+    {url: empreinte du contenu} des pages indexables, triées par chemin de
+    fichier. Quand plusieurs fichiers partagent une canonique (x.html et
+    x/index.html), l'empreinte les couvre tous. Retourne aussi le nombre de
+    pages écartées (noindex ou canonique hors périmètre) et de doublons.
+    """
+    candidates = [(HOME_PAGE, DOMAIN + '/')]
+    for root, prefix in SOURCES:
+        if root.is_dir():
+            candidates.extend((path, DOMAIN + derived_path(path, root, prefix))
+                              for path in sorted(root.rglob('*.html'), key=lambda p: p.as_posix()))
+
+    digests: Dict[str, List[str]] = OrderedDict()
+    skipped = 0
+    for path, fallback in candidates:
+        record = index.get(path)
+        if record is None:
+            continue
+        url = page_url(record, fallback[len(DOMAIN):])
+        if is_noindex(record) or not in_scope(url):
+            skipped += 1
+            continue
+        digests.setdefault(url, []).append(record['sha256'])
+
+    pages = OrderedDict(
+        (url, shas[0] if len(shas) == 1 else hashlib.sha256(''.join(shas).encode('ascii')).hexdigest())
+        for url, shas in digests.items())
+    duplicates = sum(len(shas) - 1 for shas in digests.values())
+    return pages, skipped, duplicates
+
+
+# ============================================================
+# REGISTRE lastmod
+# ============================================================
+def load_ledger() -> Dict:
+    try:
+        with open(LEDGER_PATH, 'r', encoding='utf-8') as f:
+            ledger = json.load(f)
+    except (OSError, ValueError):
+        return {'version': LEDGER_VERSION, 'shards': [], 'urls': {}}
+    if ledger.get('version') != LEDGER_VERSION:
+        return {'version': LEDGER_VERSION, 'shards': [], 'urls': {}}
+    return ledger
+
+
+def read_legacy_entries() -> Dict[str, Tuple[str, str, str]]:
+    """
+    {url: (lastmod, changefreq, priority)} de public/sitemap.xml ; les <loc>
+    y finissent souvent par « / », les canoniques jamais (sauf la racine)
+    """
+    try:
+        xml = LEGACY_SITEMAP.read_text(encoding='utf-8')
+    except OSError:
+        return {}
+    entries = {}
+    for loc, lastmod, changefreq, priority in _ENTRY_RE.findall(xml):
+        loc = loc.strip()
+        if loc != DOMAIN + '/':
+            loc = loc.rstrip('/')
+        entries.setdefault(loc, (lastmod, changefreq, priority))
+    return entries
+
+
+def update_ledger(ledger: Dict, pages: Dict[str, str], legacy: Dict, today: str) -> int:
+    """Met à jour les empreintes et lastmod ; retourne le nombre d'URL modifiées"""
+    previous = ledger['urls']
+    urls = {}
+    changed = 0
+    for url, digest in pages.items():
+        entry = previous.get(url)
+        if entry is None:
+            entry = {'sha256': digest, 'lastmod': legacy.get(url, (today,))[0]}
+            changed += 1
+        elif entry['sha256'] != digest:
+            entry = {'sha256': digest, 'lastmod': today}
+            changed += 1
+        urls[url] = entry
+    changed += len(set(previous) - set(urls))
+    ledger['urls'] = urls
+    return changed
+
+
+# ============================================================
+# DÉCOUPAGE ET RENDU
+# ============================================================
+def default_attributes(path: str) -> Tuple[str, str]:
+    """(changefreq, priority) d'une URL absente de public/sitemap.xml"""
+    parts = path.strip('/').split('/')
+    if parts == ['']:
+        return 'weekly', '1.0'
+    if parts[0] == 'scenarios':
+        return 'weekly', '0.85'
+    if len(parts) <= 2:
+        return 'monthly', '0.9'
+    if len(parts) == 3:
+        return 'monthly', '0.7'
+    return 'monthly', '0.5'
+
+
+def shard_pages(urls: List[str]) -> Dict[str, List[str]]:
+    """{nom du fichier: [url, ...]} ; les grosses sections de src/pages/ ont leur fichier"""
+    def section(url: str) -> Optional[str]:
+        parts = url[len(DOMAIN):].strip('/').split('/')
+        return parts[1] if parts[0] == 'pages' and len(parts) > 2 else None
+
+    sizes = Counter(section(url) for url in urls)
+    shards: Dict[str, List[str]] = OrderedDict()
+    for url in urls:
+        parts = url[len(DOMAIN):].strip('/').split('/')
+        name = section(url)
+        if name is not None and sizes[name] >= MIN_SECTION:
+            base = f'sitemap-pages-{name}'
+        elif parts[0] in ('', 'pages'):
+            base = 'sitemap-pages'
+        else:
+            base = f'sitemap-{parts[0]}'
+        shards.setdefault(base, []).append(url)
+
+    # Limite du protocole : 50 000 URL par fichier
+    result: Dict[str, List[str]] = OrderedDict()
+    for base, members in sorted(shards.items()):
+        for i in range(0, len(members), MAX_URLS):
+            suffix = f'-{i // MAX_URLS + 1}' if i else ''
+            result[f'{base}{suffix}.xml'] = members[i:i + MAX_URLS]
+    return result
+
+
+def render_urlset(urls: List[str], ledger: Dict, legacy: Dict) -> str:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for url in sorted(urls):
+        changefreq, priority = legacy.get(url, (None,) + default_attributes(url[len(DOMAIN):]))[1:]
+        lines += ['  <url>',
+                  f'    <loc>{url}</loc>',
+                  f"    <lastmod>{ledger['urls'][url]['lastmod']}</lastmod>",
+                  f'    <changefreq>{changefreq}</changefreq>',
+                  f'    <priority>{priority}</priority>',
+                  '  </url>']
+    lines.append('</urlset>')
+    return '\n'.join(lines)
+
+
+def render_index(entries: List[Tuple[str, str]]) -> str:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for name, lastmod in entries:
+        lines += ['  <sitemap>',
+                  f'    <loc>{DOMAIN}/{name}</loc>',
+                  f'    <lastmod>{lastmod}</lastmod>',
+                  '  </sitemap>']
+    lines.append('</sitemapindex>')
+    return '\n'.join(lines)
+
+
+def encode(xml: str, compress: bool) -> bytes:
+    data = xml.encode('utf-8')
+    if not compress:
+        return data
+    # mtime=0 : même contenu -> mêmes octets, le fichier n'est pas réécrit
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as f:
+        f.write(data)
+    return buffer.getvalue()
+
+
+def write_if_changed(path: Path, data: bytes, dry_run: bool) -> bool:
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    if not dry_run:
+        path.write_bytes(data)
+    return True
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description="Génère les sitemaps des pages et l'index")
+    parser.add_argument('--gzip', action='store_true',
+                        help='écrit les fichiers des pages en .xml.gz (référencés tels quels dans l\'index)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help="affiche les fichiers qui changeraient sans rien écrire")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    today = date.today().isoformat()
+
+    with PageIndex() as index:
+        pages, skipped, duplicates = discover_pages(index)
+
+    ledger = load_ledger()
+    legacy = read_legacy_entries()
+    changed_urls = update_ledger(ledger, pages, legacy, today)
+
+    shards = shard_pages(list(pages))
+    suffix = '.gz' if args.gzip else ''
+    written, unchanged = [], []
+    entries = []
+    for name, urls in shards.items():
+        filename = name + suffix
+        xml = render_urlset(urls, ledger, legacy)
+        if write_if_changed(PUBLIC_DIR / filename, encode(xml, args.gzip), args.dry_run):
+            written.append(filename)
+        else:
+            unchanged.append(filename)
+        entries.append((filename, max(ledger['urls'][url]['lastmod'] for url in urls)))
+
+    for name in STATIC_SITEMAPS:
+        path = PUBLIC_DIR / name
+        if path.exists():
+            lastmods = _LASTMOD_RE.findall(path.read_text(encoding='utf-8'))
+            entries.append((name, max(lastmods) if lastmods else today))
+
+    if write_if_changed(PUBLIC_DIR / INDEX_NAME, render_index(entries).encode('utf-8'), args.dry_run):
+        written.append(INDEX_NAME)
+
+    # Fichiers générés lors d'un passage précédent et qui n'existent plus
+    produced = [filename for filename, _ in entries if filename not in STATIC_SITEMAPS]
+    removed = [name for name in ledger.get('shards', []) if name not in produced]
+    ledger['shards'] = produced
+    if not args.dry_run:
+        for name in removed:
+            (PUBLIC_DIR / name).unlink(missing_ok=True)
+        LEDGER_PATH.write_text(json.dumps(ledger, indent=2, sort_keys=True, ensure_ascii=False) + '\n',
+                               encoding='utf-8')
+
+    prefix = '[dry-run] ' if args.dry_run else ''
+    print(f"{prefix}{len(pages)} URL ({skipped} pages noindex ou hors périmètre, {duplicates} doublons de canonique)")
+    print(f"{prefix}URL nouvelles ou modifiées : {changed_urls}")
+    print(f"{prefix}Fichiers réécrits : {len(written)} | inchangés : {len(unchanged)} | supprimés : {len(removed)}")
+    for name in written:
+        print(f"  ~ {name}")
+    for name in removed:
+        print(f"  - {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Ingère les exports analytiques dans l'entrepôt en colonnes (.cache/analytics).
+
+Usage : python tools/ingest_analytics.py [fichier|dossier ...]   (défaut : seach-console-perf/)
+Exports reconnus : Search Console (.xlsx), Bing Webmaster Tools, Vercel
+Analytics et AdSense (.csv). Seuls les exports modifiés sont relus.
+"""
+import sys
+import time
+from pathlib import Path
+
+from lib.analytics_store import STORE_DIR, AnalyticsStore, find_exports, ingest
+
+
+def main():
+    paths = []
+    for arg in sys.argv[1:] or [None]:
+        if arg is None or Path(arg).is_dir():
+            paths.extend(find_exports(arg))
+        else:
+            paths.append(Path(arg))
+    start = time.perf_counter()
+    stats = ingest(paths)
+    elapsed = time.perf_counter() - start
+
+    store = AnalyticsStore.open()
+    print(f"Entrepôt : {STORE_DIR}")
+    for name in stats['parsed']:
+        print(f"  + {name}")
+    engines, clicks = store.group_sum('engine', 'clicks')
+    for engine, total in zip(engines, clicks):
+        rows = int(store.mask(engine=engine).sum())
+        print(f"  {engine:8s} {rows:7d} lignes | {total:9.0f} clics")
+    print(f"Lignes : {stats['rows']} | exports relus : {len(stats['parsed'])} | conservés : {len(stats['kept'])} | {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+"""
+Utilitaires partagés par les scripts Python d'audit et d'analyse
+(verify_all.py, tools/audit_baremes.py, scripts/add_simulateur_schemas.py, ...).
+
+Les scripts ajoutent le dossier tools/ à sys.path puis importent
+`from lib.<module> import ...`.
+
+La variable d'environnement LESCALCULATEURS_ROOT remplace la racine du dépôt
+(pages, caches .cache/, rapports) par une autre arborescence : c'est ainsi que
+tools/benchmark.py fait tourner les scripts sur un corpus synthétique.
+"""
+import os
+from pathlib import Path
+
+REPO_ROOT = Path(os.environ.get('LESCALCULATEURS_ROOT') or Path(__file__).resolve().parents[2]).resolve()
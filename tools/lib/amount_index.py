@@ -0,0 +1,203 @@
+"""
+Index inversé des montants du corpus (.cache/amount-index.sqlite).
+
+Chaque montant relevé dans les pages (src/pages et dossiers miroirs) est
+normalisé en centimes entiers puis rangé avec sa page, son offset en octets,
+sa ligne et un extrait de contexte. « Où 652,02 apparaît-il encore ? » devient
+une lecture d'index au lieu d'un balayage regex de tout le corpus.
+
+Sont reconnus : les nombres à deux décimales (« 1173,04 », « 1 173,04 »,
+« 1 173,04 » avec espace insécable ou fine, &nbsp;, « 1173.04 »), les
+nombres à une décimale suivis d'une devise (« 1,5 € ») et les entiers suivis
+d'une devise (« 978 € », « 978 &euro; »). Le texte est parcouru
+en octets (UTF-8), sans décodage. Comme pour l'index des pages, seuls les
+fichiers dont la taille ou la date a changé sont relus.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import REPO_ROOT
+from .page_index import page_key
+from .scan import CORPUS_DIRS
+
+INDEX_PATH = REPO_ROOT / '.cache' / 'amount-index.sqlite'
+
+# À incrémenter quand l'extraction change : l'index est alors reconstruit
+SCHEMA_VERSION = 2
+
+CONTEXT_BYTES = 48
+
+_SEP = rb'(?: |\xc2\xa0|\xe2\x80\xaf|\xe2\x80\x89|&nbsp;|&#160;|&#8239;|&thinsp;)'
+_CURRENCY = rb'(?:\s|\xc2\xa0|\xe2\x80\xaf|&nbsp;)*(?:\xe2\x82\xac|&euro;|EUR\b|euros?\b)'
+# Fin d'un montant : dernier chiffre de la partie entière suivi de deux
+# décimales et/ou d'une devise, ou d'une décimale et d'une devise. La plupart
+# des chiffres d'une page (classes CSS, dates, attributs) n'ont rien de tout
+# cela : les chercher d'abord évite d'analyser chaque suite de chiffres.
+_TAIL_RE = re.compile(rb'\d(?:[,.](\d{2})(?!\d)(' + _CURRENCY + rb')?|[,.](\d)(?=' + _CURRENCY + rb')|('
+                      + _CURRENCY + rb'))')
+# Partie entière (milliers éventuellement groupés) se terminant à la fin de la fenêtre
+_INTEGER_RE = re.compile(rb'(?<![\d.,])(?:\d{1,3}(?:' + _SEP + rb'\d{3})+|\d+)\Z')
+_SEP_RE = re.compile(_SEP)
+_WINDOW = 64
+_PARSE_RE = re.compile(r'^\s*(\d+)(?:[,.](\d{1,2}))?\s*(?:€|EUR|euros?)?\s*$', re.IGNORECASE)
+
+
+def iter_amounts(data: bytes) -> Iterator[Tuple[int, int, int, bool]]:
+    """(centimes, début, fin, suivi d'une devise) pour chaque montant du texte UTF-8"""
+    for tail in _TAIL_RE.finditer(data):
+        decimals, decimal_currency, tenths, currency = tail.groups()
+        integer_end = tail.start() + 1
+        integer = _INTEGER_RE.search(data, max(0, integer_end - _WINDOW), integer_end)
+        if integer is None:
+            continue
+        cents = int(_SEP_RE.sub(b'', integer.group())) * 100
+        if decimals is not None:
+            cents, end = cents + int(decimals), tail.end(1)
+        elif tenths is not None:
+            cents, end = cents + int(tenths) * 10, tail.end(3)
+        else:
+            end = integer_end
+        yield cents, integer.start(), end, decimals is None or decimal_currency is not None
+
+
+def parse_amount(text: str) -> int:
+    """« 1 173,04 », « 1173.04 », « 978 € » -> centimes ; ValueError si illisible"""
+    compact = re.sub(r'[\s\u00a0\u202f\u2009]|&nbsp;|&#160;|&#8239;|&thinsp;', '', text)
+    match = _PARSE_RE.match(compact)
+    if not match:
+        raise ValueError(f'Montant illisible : {text!r}')
+    decimals = (match.group(2) or '0').ljust(2, '0')
+    return int(match.group(1)) * 100 + int(decimals)
+
+
+def format_cents(cents: int) -> str:
+    """117304 -> « 1 173,04 »"""
+    return f'{cents // 100:,}'.replace(',', ' ') + f',{cents % 100:02d}'
+
+
+def _context(data: bytes, start: int, end: int) -> str:
+    snippet = data[max(0, start - CONTEXT_BYTES):end + CONTEXT_BYTES]
+    return ' '.join(snippet.decode('utf-8', errors='ignore').split())
+
+
+def extract_amounts(data: bytes) -> List[Tuple[int, int, int, bool, str]]:
+    """[(centimes, offset, ligne, devise, contexte)] d'un fichier"""
+    newlines = None
+    rows = []
+    for cents, start, end, euro in iter_amounts(data):
+        if newlines is None:
+            newlines = [m.start() for m in re.finditer(b'\n', data)]
+        rows.append((cents, start, bisect_right(newlines, start) + 1, euro, _context(data, start, end)))
+    return rows
+
+
+class AmountIndex:
+    """
+    Accès à l'index des montants.
+
+        with AmountIndex() as index:
+            index.refresh()                          # src/pages et miroirs
+            for hit in index.lookup(parse_amount('652,02')):
+                hit['path'], hit['line'], hit['context']
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or INDEX_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.parsed = 0
+        self._init_schema()
+
+    def _init_schema(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.conn.executescript('DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS amounts;')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, sha256 TEXT, size INTEGER, mtime_ns INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS amounts (
+                cents INTEGER, path TEXT, offset INTEGER, line INTEGER, euro INTEGER, context TEXT
+            );
+            CREATE INDEX IF NOT EXISTS amounts_cents ON amounts (cents);
+            CREATE INDEX IF NOT EXISTS amounts_path ON amounts (path);
+        ''')
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _forget(self, key: str):
+        self.conn.execute('DELETE FROM files WHERE path = ?', (key,))
+        self.conn.execute('DELETE FROM amounts WHERE path = ?', (key,))
+
+    def _store(self, key: str, path: Path, st: os.stat_result):
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        row = self.conn.execute('SELECT sha256 FROM files WHERE path = ?', (key,)).fetchone()
+        if row and row['sha256'] == digest:
+            self.conn.execute('UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?',
+                              (st.st_size, st.st_mtime_ns, key))
+            return
+        self._forget(key)
+        self.conn.execute('INSERT INTO files (path, sha256, size, mtime_ns) VALUES (?, ?, ?, ?)',
+                          (key, digest, st.st_size, st.st_mtime_ns))
+        self.conn.executemany(
+            'INSERT INTO amounts (cents, path, offset, line, euro, context) VALUES (?, ?, ?, ?, ?, ?)',
+            [(cents, key, offset, line, int(euro), context)
+             for cents, offset, line, euro, context in extract_amounts(data)])
+        self.parsed += 1
+
+    def refresh(self, dirs: Optional[Iterable] = None) -> int:
+        """
+        Met à jour l'index pour tous les .html des dossiers (récursif, défaut :
+        CORPUS_DIRS) et retire les fichiers supprimés. Retourne le nombre de
+        fichiers réindexés.
+        """
+        before = self.parsed
+        known = {row['path']: (row['size'], row['mtime_ns'])
+                 for row in self.conn.execute('SELECT path, size, mtime_ns FROM files')}
+        for directory in (dirs or CORPUS_DIRS):
+            directory = Path(directory)
+            if not directory.is_absolute():
+                directory = REPO_ROOT / directory
+            seen = set()
+            for path in directory.rglob('*.html'):
+                key = page_key(path)
+                seen.add(key)
+                st = path.stat()
+                if known.get(key) != (st.st_size, st.st_mtime_ns):
+                    self._store(key, path, st)
+            prefix = page_key(directory).rstrip('/') + '/'
+            for key in known:
+                if key.startswith(prefix) and key not in seen:
+                    self._forget(key)
+        self.conn.commit()
+        return self.parsed - before
+
+    def lookup(self, cents: int, euro_only: bool = False, prefix: str = '') -> List[Dict]:
+        """Occurrences d'un montant (centimes), triées par page puis offset"""
+        query = 'SELECT * FROM amounts WHERE cents = ? AND substr(path, 1, ?) = ?'
+        if euro_only:
+            query += ' AND euro = 1'
+        rows = self.conn.execute(query + ' ORDER BY path, offset', (cents, len(prefix), prefix))
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Tuple[int, int, int]:
+        """(fichiers, occurrences, montants distincts)"""
+        files = self.conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        hits, distinct = self.conn.execute('SELECT COUNT(*), COUNT(DISTINCT cents) FROM amounts').fetchone()
+        return files, hits, distinct
@@ -0,0 +1,395 @@
+"""
+Entrepôt analytique en colonnes (numpy) pour les exports Search Console,
+Bing Webmaster Tools, Vercel Analytics et AdSense.
+
+Chaque export est normalisé en lignes (engine, source, dimension, date, page,
+query, segment) + métriques, puis stocké colonne par colonne dans
+.cache/analytics/*.npy (chargées en mémoire mappée). Les colonnes texte sont
+encodées par dictionnaire (codes int32 + vocabulaire), ce qui rend filtres,
+tris et agrégats vectorisés.
+
+Conventions :
+- `page` est un chemin (/pages/apl), le domaine lescalculateurs.fr est retiré ;
+- `ctr` est une fraction (0.05 = 5 %) quelle que soit la source ;
+- `dimension` vaut 'date', 'page', 'query', 'device', 'country' ou 'appearance'
+  (ces trois dernières portent leur valeur dans `segment`) ;
+- `source` identifie le fichier d'export : son chemin absolu (source_id), qui
+  est aussi la clé du manifeste ; mask(source=...) accepte un chemin.
+"""
+import csv
+import hashlib
+import json
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import REPO_ROOT
+from .profiling import count, stage
+from .workbook import load_sheet, sheet_names
+
+STORE_DIR = REPO_ROOT / '.cache' / 'analytics'
+EXPORTS_DIR = REPO_ROOT / 'seach-console-perf'
+STORE_VERSION = 2
+
+KEY_COLUMNS = ('engine', 'source', 'dimension', 'page', 'query', 'segment')
+METRIC_COLUMNS = ('clicks', 'impressions', 'ctr', 'position', 'page_views', 'visitors',
+                  'earnings', 'page_rpm', 'impression_rpm', 'active_view')
+
+# Feuilles d'un export Search Console (.xlsx) : nom -> (dimension, colonne clé)
+SEARCH_CONSOLE_SHEETS = {
+    'Graphique': ('date', 'date'),
+    'Requêtes': ('query', 'query'),
+    'Pages': ('page', 'page'),
+    'Pays': ('country', 'segment'),
+    'Appareils': ('device', 'segment'),
+    'Apparence dans les résultats de': ('appearance', 'segment'),
+}
+
+# En-têtes CSV reconnus -> colonne normalisée
+CSV_ALIASES = {
+    'Date': 'date',
+    'Keyword': 'query', 'Query': 'query',
+    'Page': 'page', 'Page URL': 'page', 'URL': 'page',
+    'Clicks': 'clicks', 'Clics': 'clicks',
+    'Impressions': 'impressions',
+    'CTR': 'ctr', 'Avg. CTR': 'ctr',
+    'Avg. Position': 'position', 'Avg. position': 'position', 'Position': 'position',
+    'Visitors': 'visitors', 'Total': 'page_views', 'Page views': 'page_views',
+    'Estimated earnings (EUR)': 'earnings',
+    'Page RPM (EUR)': 'page_rpm',
+    'Impression RPM (EUR)': 'impression_rpm',
+    'Active View Viewable': 'active_view',
+}
+
+_SITE_RE = re.compile(r'^(?:https?://)?(?:www\.)?lescalculateurs\.fr', re.IGNORECASE)
+
+
+# ============================================================
+# NORMALISATION
+# ============================================================
+def normalize_page(url) -> str:
+    """URL complète ou chemin -> chemin commençant par /"""
+    path = _SITE_RE.sub('', str(url or '').strip())
+    if path and not path.startswith(('/', 'http')):
+        path = '/' + path
+    return path or '/'
+
+
+def parse_number(value) -> float:
+    """Nombre tolérant ('1 234', '12,5', '5.2%') ; NaN si vide ou invalide"""
+    if value is None or value == '':
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace(' ', '').replace('\xa0', '').replace(' ', '').rstrip('%')
+    if ',' in text and '.' in text:
+        text = text.replace(',', '')
+    else:
+        text = text.replace(',', '.')
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def parse_date(value) -> Optional[str]:
+    """Date ISO (AAAA-MM-JJ) depuis une date Excel, ISO ou M/J/AAAA (Bing)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip().split(' ')[0]
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+# ============================================================
+# LECTURE DES EXPORTS
+# ============================================================
+def _read_search_console(path: Path) -> Iterator[dict]:
+    names = sheet_names(path)
+    for sheet, (dimension, key) in SEARCH_CONSOLE_SHEETS.items():
+        if sheet not in names:
+            continue
+        for row in load_sheet(path, sheet):
+            record = {'engine': 'google', 'dimension': dimension,
+                      'clicks': row[1], 'impressions': row[2], 'ctr': row[3], 'position': row[4]}
+            if key == 'date':
+                record['date'] = parse_date(row[0])
+            elif key == 'page':
+                record['page'] = normalize_page(row[0])
+            else:
+                record[key] = str(row[0])
+            yield record
+
+
+def _read_csv(path: Path) -> Iterator[dict]:
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        columns = {h: CSV_ALIASES[h] for h in (reader.fieldnames or []) if h in CSV_ALIASES}
+        names = set(columns.values())
+        if 'earnings' in names:
+            engine = 'adsense'
+        elif 'visitors' in names:
+            engine = 'vercel'
+        else:
+            engine = 'bing'
+        dimension = next((d for d in ('query', 'page', 'date') if d in names), 'segment')
+        for row in reader:
+            record = {'engine': engine, 'dimension': dimension}
+            for header, column in columns.items():
+                value = row.get(header)
+                if column == 'date':
+                    record['date'] = parse_date(value)
+                elif column == 'page':
+                    record['page'] = normalize_page(value)
+                elif column == 'query':
+                    record['query'] = (value or '').strip()
+                else:
+                    record[column] = parse_number(value)
+            # Bing exprime le CTR en pourcentage
+            if engine == 'bing' and 'ctr' in record:
+                record['ctr'] = record['ctr'] / 100
+            yield record
+
+
+def read_export(path) -> List[dict]:
+    """Lignes normalisées d'un export (.xlsx Search Console ou .csv)"""
+    path = Path(path)
+    with stage(f'lecture {path.suffix.lower().lstrip(".")}'):
+        if path.suffix.lower() == '.xlsx':
+            rows = list(_read_search_console(path))
+        elif path.suffix.lower() == '.csv':
+            rows = list(_read_csv(path))
+        else:
+            raise ValueError(f"Format d'export non reconnu : {path}")
+        count(files=1, bytes=path.stat().st_size)
+    for row in rows:
+        row['source'] = source_id(path)
+    return rows
+
+
+def source_id(path) -> str:
+    """Identifiant d'un export (colonne `source`, clé du manifeste) : chemin absolu"""
+    return str(Path(path).resolve())
+
+
+# ============================================================
+# ENTREPÔT
+# ============================================================
+def _encode(values: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    vocab, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return vocab.tolist(), codes.astype(np.int32)
+
+
+def _file_state(path: Path) -> dict:
+    st = path.stat()
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class AnalyticsStore:
+    """
+    Lecture de l'entrepôt.
+
+        store = AnalyticsStore.ensure([xlsx_path])          # ingère si besoin
+        mask = store.mask(source=xlsx_path, dimension='page')
+        top = store.table(['page', 'clicks', 'ctr'], mask, sort_by='clicks', limit=50)
+    """
+
+    def __init__(self, store_dir=None):
+        self.store_dir = Path(store_dir or STORE_DIR)
+        self.manifest = self._read_manifest(self.store_dir)
+        self.vocab: Dict[str, List[str]] = {}
+        self._vocab_index: Dict[str, Dict[str, int]] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        if self.manifest:
+            with open(self.store_dir / 'vocab.json', 'r', encoding='utf-8') as f:
+                self.vocab = json.load(f)
+            # np.load ne sait pas mapper un fichier vide
+            mmap_mode = 'r' if len(self) else None
+            for name in ('date',) + KEY_COLUMNS + METRIC_COLUMNS:
+                self._columns[name] = np.load(self.store_dir / f'{name}.npy', mmap_mode=mmap_mode)
+
+    @staticmethod
+    def _read_manifest(store_dir: Path) -> dict:
+        try:
+            with open(store_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get('version') == STORE_VERSION else {}
+
+    @classmethod
+    def open(cls, store_dir=None) -> 'AnalyticsStore':
+        return cls(store_dir)
+
+    @classmethod
+    def ensure(cls, paths: Iterable, store_dir=None) -> 'AnalyticsStore':
+        """Ouvre l'entrepôt après avoir (ré)ingéré les exports absents ou modifiés"""
+        paths = [Path(p) for p in paths]
+        manifest = cls._read_manifest(Path(store_dir or STORE_DIR))
+        sources = manifest.get('sources', {})
+        stale = [p for p in paths if p.exists() and
+                 sources.get(source_id(p), {}).get('state') != _file_state(p)]
+        if stale or not manifest:
+            with stage('ingestion'):
+                ingest(paths, store_dir)
+        with stage('chargement'):
+            return cls(store_dir)
+
+    def __len__(self) -> int:
+        return int(self.manifest.get('rows', 0))
+
+    def sources(self) -> List[str]:
+        return sorted(entry['name'] for entry in self.manifest.get('sources', {}).values())
+
+    def mask(self, **filters) -> np.ndarray:
+        """Masque booléen ; chaque filtre vaut une valeur ou une liste de valeurs (colonnes clés)"""
+        mask = np.ones(len(self), dtype=bool)
+        for name, wanted in filters.items():
+            values = [wanted] if isinstance(wanted, (str, Path)) else list(wanted)
+            if name == 'source':
+                values = [source_id(v) for v in values]
+            index = self._vocab_index.setdefault(name, {v: i for i, v in enumerate(self.vocab.get(name, []))})
+            codes = [index[v] for v in values if v in index]
+            mask &= np.isin(self._columns[name], codes)
+        return mask
+
+    def codes(self, name: str, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Valeurs brutes (codes pour les colonnes clés)"""
+        column = self._columns[name]
+        return np.asarray(column if mask is None else column[mask])
+
+    def _decode(self, name: str, values: np.ndarray) -> np.ndarray:
+        if name in KEY_COLUMNS:
+            return np.asarray(self.vocab[name], dtype=object)[values]
+        return values
+
+    def column(self, name: str, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Colonne (filtrée) ; les colonnes clés sont décodées en chaînes"""
+        return self._decode(name, self.codes(name, mask))
+
+    def table(self, columns: Sequence[str], mask: Optional[np.ndarray] = None,
+              sort_by: Optional[str] = None, descending: bool = True,
+              limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Colonnes filtrées, triées (tri stable, NaN en dernier) et tronquées"""
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        if sort_by is not None:
+            key = np.asarray(self._columns[sort_by][rows], dtype=float)
+            key = np.where(np.isnan(key), np.inf, -key if descending else key)
+            rows = rows[np.argsort(key, kind='stable')]
+        if limit is not None:
+            rows = rows[:limit]
+        return {name: self._decode(name, np.asarray(self._columns[name][rows])) for name in columns}
+
+    def records(self, columns: Sequence[str], mask: Optional[np.ndarray] = None, **kwargs) -> List[dict]:
+        """Comme table(), sous forme de liste de dicts (NaN -> 0) pour les boucles d'affichage"""
+        data = self.table(columns, mask, **kwargs)
+        n = len(next(iter(data.values()))) if data else 0
+        result = []
+        for i in range(n):
+            row = {}
+            for name in columns:
+                value = data[name][i]
+                if name == 'date':
+                    value = None if np.isnat(value) else str(value)
+                elif name not in KEY_COLUMNS:
+                    value = 0 if np.isnan(value) else value.item()
+                row[name] = value
+            result.append(row)
+        return result
+
+    def group_sum(self, by: str, metric: str, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Somme d'une métrique par valeur d'une colonne clé : (libellés, sommes)"""
+        codes = self.codes(by, mask)
+        values = np.nan_to_num(self.codes(metric, mask).astype(float))
+        present, inverse = np.unique(codes, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(present))
+        return np.asarray(self.vocab[by], dtype=object)[present], sums
+
+
+def _write_manifest(store_dir: Path, rows: int, sources: dict) -> None:
+    with open(store_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump({'version': STORE_VERSION, 'rows': rows, 'sources': sources}, f, ensure_ascii=False, indent=2)
+
+
+def ingest(paths: Iterable, store_dir=None) -> dict:
+    """
+    (Ré)ingère les exports donnés dans l'entrepôt. Les lignes des exports déjà
+    ingérés et inchangés (même empreinte) sont conservées sans être relues.
+    Retourne {'parsed': [...], 'kept': [...], 'rows': n}.
+    """
+    store_dir = Path(store_dir or STORE_DIR)
+    previous = AnalyticsStore(store_dir)
+    sources = dict(previous.manifest.get('sources', {}))
+
+    new_rows: List[dict] = []
+    parsed, replaced = [], set()
+    for path in (Path(p) for p in paths):
+        if not path.exists():
+            continue
+        key = source_id(path)
+        state = _file_state(path)
+        entry = sources.get(key)
+        if entry and entry['state'] == state:
+            continue
+        digest = _sha256(path)
+        if entry and entry['sha256'] == digest:
+            entry['state'] = state
+            continue
+        new_rows.extend(read_export(path))
+        sources[key] = {'name': path.name, 'sha256': digest, 'state': state}
+        replaced.add(key)
+        parsed.append(path.name)
+
+    if not replaced and previous.manifest:
+        # Rien à relire : seules les dates de modification ont pu changer
+        _write_manifest(store_dir, len(previous), sources)
+        return {'parsed': [], 'kept': [e['name'] for e in sources.values()], 'rows': len(previous)}
+
+    # Colonnes conservées depuis l'entrepôt existant (exports inchangés)
+    keep = ~previous.mask(source=sorted(replaced)) if len(previous) else np.zeros(0, dtype=bool)
+    columns: Dict[str, np.ndarray] = {}
+    for name in KEY_COLUMNS:
+        kept = previous.column(name, keep) if len(previous) else np.zeros(0, dtype=object)
+        fresh = np.asarray([row.get(name) or '' for row in new_rows], dtype=object)
+        columns[name] = np.concatenate([kept.astype(object), fresh])
+    kept_dates = previous.codes('date', keep) if len(previous) else np.zeros(0, dtype='datetime64[D]')
+    fresh_dates = np.asarray([row.get('date') or 'NaT' for row in new_rows], dtype='datetime64[D]')
+    columns['date'] = np.concatenate([kept_dates, fresh_dates])
+    for name in METRIC_COLUMNS:
+        kept = previous.codes(name, keep) if len(previous) else np.zeros(0)
+        fresh = np.asarray([parse_number(row.get(name)) for row in new_rows], dtype=np.float64)
+        columns[name] = np.concatenate([kept, fresh])
+    del previous
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    vocab = {}
+    for name in KEY_COLUMNS:
+        vocab[name], columns[name] = _encode(columns[name]) if len(columns[name]) else ([], np.zeros(0, np.int32))
+    for name, values in columns.items():
+        np.save(store_dir / f'{name}.npy', values)
+    with open(store_dir / 'vocab.json', 'w', encoding='utf-8') as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    rows = len(columns['date'])
+    _write_manifest(store_dir, rows, sources)
+    return {'parsed': parsed, 'kept': [e['name'] for key, e in sources.items() if key not in replaced], 'rows': rows}
+
+
+def find_exports(directory=None) -> List[Path]:
+    """Exports reconnus (.xlsx, .csv) d'un dossier, triés par nom"""
+    directory = Path(directory or EXPORTS_DIR)
+    return sorted(p for p in directory.iterdir() if p.suffix.lower() in ('.xlsx', '.csv'))
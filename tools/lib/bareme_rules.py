@@ -0,0 +1,214 @@
+"""
+Règles déclaratives de vérification des barèmes dans les pages.
+
+Une règle décrit une valeur officielle (montant, entier ou taux), la page de
+référence où elle doit figurer, le périmètre de pages où elle s'applique, les
+valeurs fautives connues (CRITICAL) et les formulations approximatives à
+signaler (WARNING). Les variantes d'écriture françaises (« 1173,04 »,
+« 1 173,04 » avec espace, espace insécable, &nbsp;, ...) sont générées
+automatiquement.
+
+Toutes les règles sont compilées une seule fois en un LiteralMatcher : chaque
+page est lue en entier et parcourue une seule fois, quel que soit le nombre
+de règles. Une occurrence n'est retenue que si elle n'est pas collée à
+d'autres chiffres (« 57 » ne correspond pas à « 1 257 » ni à « 0,57 »).
+"""
+import fnmatch
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+from .matcher import LiteralMatcher
+
+# Séparateurs de milliers rencontrés dans les pages
+GROUP_SEPARATORS = (' ', '\u00a0', '\u202f', '&nbsp;', '&#160;', '&#8239;', '&thinsp;')
+
+KINDS = ('amount', 'integer', 'percent')
+
+
+def format_value(value: float, kind: str = 'amount') -> str:
+    """Écriture de référence : « 1 173,04 » (montant), « 11 294 » (entier), « 40,4 » (taux)"""
+    if kind == 'amount':
+        integer, decimals = f'{value:.2f}'.split('.')
+        return f'{int(integer):,}'.replace(',', ' ') + ',' + decimals
+    if kind == 'integer':
+        return f'{int(round(value)):,}'.replace(',', ' ')
+    if kind == 'percent':
+        return f'{round(value, 4):g}'.replace('.', ',')
+    raise ValueError(f'Type de valeur inconnu : {kind}')
+
+
+def value_variants(value: float, kind: str = 'amount') -> List[str]:
+    """Écritures acceptées d'une valeur (virgule ou point décimal, milliers groupés ou non)"""
+    reference = format_value(value, kind)
+    if kind == 'percent':
+        return [reference, reference.replace(',', '.')] if ',' in reference else [reference]
+    plain = reference.replace(' ', '')
+    variants = [plain]
+    if kind == 'amount':
+        variants.append(plain.replace(',', '.'))
+    if ' ' in reference:
+        variants.extend(reference.replace(' ', sep) for sep in GROUP_SEPARATORS)
+    return list(dict.fromkeys(variants))
+
+
+def text_variants(text: str) -> List[str]:
+    """Écritures équivalentes d'un texte (espaces insécables, &nbsp;, &euro;)"""
+    variants = []
+    for sep in GROUP_SEPARATORS:
+        spaced = text.replace(' ', sep)
+        variants.extend((spaced, spaced.replace('€', '&euro;')))
+    return list(dict.fromkeys(variants))
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Valeur officielle à vérifier.
+
+    `page` est la page de référence (présence exigée si `required`), `scope`
+    les motifs glob (relatifs au dossier des pages) où les valeurs fautives et
+    approximations sont recherchées ; la page de référence en fait toujours
+    partie. `hint` nomme un inventaire à afficher si la valeur manque.
+    """
+    id: str
+    section: str
+    label: str
+    value: float
+    kind: str = 'amount'
+    page: str = ''
+    scope: Tuple[str, ...] = ()
+    variants: Tuple[str, ...] = ()
+    wrong: Tuple[float, ...] = ()
+    approximations: Tuple[str, ...] = ()
+    required: bool = True
+    hint: str = ''
+
+    @property
+    def display(self) -> str:
+        return format_value(self.value, self.kind)
+
+    @property
+    def title(self) -> str:
+        """« 651,69 € (personne seule) »"""
+        unit = '%' if self.kind == 'percent' else '€'
+        return f'{self.display} {unit} ({self.label})'
+
+    def in_scope(self, relpath: str) -> bool:
+        return relpath == self.page or any(fnmatch.fnmatch(relpath, p) for p in self.scope)
+
+
+@dataclass(frozen=True)
+class TextFlag:
+    """Texte à signaler tel quel dans un périmètre de pages"""
+    id: str
+    text: str
+    scope: Tuple[str, ...]
+    severity: str
+    description: str
+
+    def in_scope(self, relpath: str) -> bool:
+        return any(fnmatch.fnmatch(relpath, p) for p in self.scope)
+
+
+@dataclass(frozen=True)
+class Inventory:
+    """
+    Relevé des valeurs d'une expression régulière (premier groupe) sur les
+    pages `pages`, ainsi que sur la page des règles qui le citent en `hint`
+    """
+    id: str
+    pattern: Pattern
+    pages: Tuple[str, ...] = ()
+
+
+# Séparateurs de milliers (« 1 257,00 ») : espace, insécable, fine insécable et leurs entités
+_GROUP_SEPARATORS = (' ', '\u00a0', '\u202f', '&nbsp;', '&#160;', '&#8239;')
+
+
+def _digit_bounded(text: str, start: int, end: int, pattern: str) -> bool:
+    """
+    Vrai si l'occurrence n'est pas le fragment d'un nombre plus long : ni
+    chiffre accolé, ni décimales (« 1,257 »), ni milliers groupés (« 1 257 »)
+    """
+    if pattern[0].isdigit() and start > 0:
+        before = text[start - 1]
+        if before.isdigit() or (before in ',.' and start > 1 and text[start - 2].isdigit()):
+            return False
+        for separator in _GROUP_SEPARATORS:
+            if text.endswith(separator, 0, start) and start > len(separator) \
+                    and text[start - len(separator) - 1].isdigit():
+                return False
+    if pattern[-1].isdigit() and end < len(text) and text[end].isdigit():
+        return False
+    return True
+
+
+class RuleSet:
+    """
+    Jeu de règles compilé. `evaluate(text)` retourne, pour chaque vérification
+    présente dans le texte, les numéros de ligne (1-based) des occurrences :
+    clés `<id>` (valeur attendue), `<id>:wrong:<i>`, `<id>:approx:<i>` et
+    `flag:<id>`. Le résultat ne dépend que du texte (pas du chemin), il peut
+    donc être mis en cache par empreinte de fichier.
+    """
+
+    def __init__(self, rules: Sequence[Rule], flags: Sequence[TextFlag] = (),
+                 inventories: Sequence[Inventory] = ()):
+        self.rules = list(rules)
+        self.flags = list(flags)
+        self.inventories = {inv.id: inv for inv in inventories}
+        self._inventory_pages: Dict[str, List[str]] = {}
+        for inv in self.inventories.values():
+            for page in inv.pages:
+                self._inventory_pages.setdefault(page, []).append(inv.id)
+        for rule in self.rules:
+            if rule.kind not in KINDS:
+                raise ValueError(f'{rule.id} : type de valeur inconnu {rule.kind}')
+            if rule.hint:
+                if rule.hint not in self.inventories:
+                    raise ValueError(f'{rule.id} : inventaire inconnu {rule.hint}')
+                ids = self._inventory_pages.setdefault(rule.page, [])
+                if rule.hint not in ids:
+                    ids.append(rule.hint)
+        patterns: List[str] = []
+        self._keys: List[str] = []
+        for rule in self.rules:
+            self._add(patterns, rule.id, value_variants(rule.value, rule.kind) + list(rule.variants))
+            for i, wrong in enumerate(rule.wrong):
+                self._add(patterns, f'{rule.id}:wrong:{i}', value_variants(wrong, rule.kind))
+            for i, text in enumerate(rule.approximations):
+                self._add(patterns, f'{rule.id}:approx:{i}', text_variants(text))
+        for flag in self.flags:
+            self._add(patterns, f'flag:{flag.id}', text_variants(flag.text))
+        self.patterns = patterns
+        self.matcher = LiteralMatcher(patterns)
+
+    def _add(self, patterns: List[str], key: str, variants: Sequence[str]):
+        for variant in dict.fromkeys(variants):
+            patterns.append(variant)
+            self._keys.append(key)
+
+    def fingerprint(self) -> tuple:
+        """Éléments qui déterminent le résultat de evaluate() (pour l'invalidation du cache)"""
+        return (tuple(zip(self._keys, self.patterns)),
+                tuple(sorted((page, tuple(ids)) for page, ids in self._inventory_pages.items())),
+                tuple((inv.id, inv.pattern.pattern) for inv in self.inventories.values()))
+
+    def evaluate(self, text: str) -> Dict[str, List[int]]:
+        hits: Dict[str, set] = {}
+        newlines: Optional[List[int]] = None
+        for index, start in self.matcher.finditer(text):
+            pattern = self.patterns[index]
+            if not _digit_bounded(text, start, start + len(pattern), pattern):
+                continue
+            if newlines is None:
+                newlines = [m.start() for m in re.finditer('\n', text)]
+            hits.setdefault(self._keys[index], set()).add(bisect_right(newlines, start) + 1)
+        return {key: sorted(lines) for key, lines in hits.items()}
+
+    def inventory(self, relpath: str, text: str) -> Dict[str, List[str]]:
+        """Relevés des inventaires qui portent sur la page `relpath`"""
+        return {inv_id: self.inventories[inv_id].pattern.findall(text)
+                for inv_id in self._inventory_pages.get(relpath, ())}
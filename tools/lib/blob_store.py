@@ -0,0 +1,326 @@
+"""
+Stockage adressé par contenu des dossiers miroirs du pipeline (pages_*).
+
+Chaque fichier est rangé une seule fois sous .cache/blobs/objects/<sha256>
+et chaque « étape » (src/pages, pages_YMYL_FINAL_V2, pages_SIMULATEURS_PLUS,
+...) est décrite par un manifeste .cache/blobs/stages/<nom>.json :
+{chemin relatif: sha256, taille, date de modification}. Une étape peut être
+reconstruite depuis le stockage en n'écrivant que les pages qui diffèrent.
+
+Les fichiers des dossiers ne sont jamais des liens physiques vers les blobs :
+la plupart des scripts du dépôt (scripts JS, fix_*.py, prep_prod.py...)
+réécrivent les pages sur place, ce qui modifierait alors toutes les étapes
+qui partagent ce contenu. Une page est matérialisée par une copie à la
+demande (reflink, FICLONE sous Linux : btrfs, XFS...) qui partage les blocs
+du blob sans partager le fichier, ou à défaut par une copie ordinaire. Seule
+la copie à la demande économise de la place : sans elle (ext4, NTFS...),
+dedupe ne touche pas aux dossiers et les blobs s'ajoutent à leur taille (voir
+supports_reflink).
+"""
+import hashlib
+import json
+import os
+import sys
+import shutil
+import stat
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import REPO_ROOT
+
+STORE_DIR = REPO_ROOT / '.cache' / 'blobs'
+MANIFEST_VERSION = 1
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+# ioctl FICLONE (linux/fs.h) : copie à la demande d'un fichier entier
+FICLONE = 0x40049409
+
+
+def stage_name(directory) -> str:
+    """Nom d'étape d'un dossier : chemin relatif à la racine du dépôt (« src/pages »)"""
+    path = Path(directory).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _manifest_file(name: str) -> str:
+    return name.strip('/').replace('/', '__') + '.json'
+
+
+class BlobStore:
+    def __init__(self, root=None):
+        self.root = Path(root or STORE_DIR)
+        self.objects = self.root / 'objects'
+        self.stages = self.root / 'stages'
+        # Octets des nouveaux blobs écrits par cette instance
+        self.bytes_written = 0
+
+    # ---------- blobs ----------
+    def blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def has(self, digest: str) -> bool:
+        return self.blob_path(digest).exists()
+
+    def _store(self, digest: str, write) -> Path:
+        target = self.blob_path(digest)
+        if target.exists():
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            if os.name != 'nt':
+                # Sous Windows un fichier en lecture seule bloquerait git et l'explorateur
+                os.chmod(tmp, READ_ONLY)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.bytes_written += target.stat().st_size
+        return target
+
+    def put_bytes(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        self._store(digest, lambda f: f.write(data))
+        return digest
+
+    def put_file(self, path) -> str:
+        with open(path, 'rb') as f:
+            data = f.read()
+        return self.put_bytes(data)
+
+    def materialize(self, digest: str, target) -> bool:
+        """
+        Écrit le blob à `target` (copie à la demande si possible, sinon copie),
+        via un fichier temporaire et os.replace(). Retourne False si `target`
+        a déjà ce contenu.
+        """
+        blob = self.blob_path(digest)
+        target = Path(target)
+        if target.exists() and target.stat().st_size == blob.stat().st_size and _digest(target) == digest:
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.parent / f'.{target.name}.tmp'
+        try:
+            _clone(blob, tmp)
+            os.replace(tmp, target)
+        except BaseException:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+        return True
+
+    def supports_reflink(self, directory) -> bool:
+        """Vrai si les copies vers `directory` peuvent partager les blocs des blobs"""
+        if not sys.platform.startswith('linux') or not self.objects.is_dir():
+            return False
+        blob = next((p for p in self.objects.rglob('*') if p.is_file()), None)
+        if blob is None:
+            return False
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.reflink-')
+        try:
+            with open(blob, 'rb') as src:
+                return _reflink(src.fileno(), fd)
+        finally:
+            os.close(fd)
+            os.unlink(tmp)
+
+    # ---------- manifestes ----------
+    def manifest_path(self, name: str) -> Path:
+        return self.stages / _manifest_file(name)
+
+    def read_manifest(self, name: str) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path(name), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+    def write_manifest(self, manifest: Dict):
+        self.stages.mkdir(parents=True, exist_ok=True)
+        path = self.manifest_path(manifest['name'])
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    def manifests(self) -> List[Dict]:
+        found = []
+        for path in sorted(self.stages.glob('*.json')) if self.stages.is_dir() else []:
+            with open(path, 'r', encoding='utf-8') as f:
+                found.append(json.load(f))
+        return found
+
+    @staticmethod
+    def new_manifest(name: str, directory, parent: Optional[str] = None) -> Dict:
+        return {
+            'version': MANIFEST_VERSION,
+            'name': name,
+            'directory': stage_name(directory),
+            'parent': parent,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+            'files': {},
+        }
+
+    @staticmethod
+    def add_entry(manifest: Dict, relpath: str, digest: str, path) -> None:
+        st = os.stat(path)
+        manifest['files'][relpath] = {'sha256': digest, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    # ---------- étapes ----------
+    def snapshot(self, directory, name: Optional[str] = None, parent: Optional[str] = None,
+                 suffixes: Tuple[str, ...] = ('.html',)) -> Tuple[Dict, int]:
+        """
+        Range tous les fichiers du dossier (récursif) et écrit le manifeste de
+        l'étape. Les fichiers dont taille et date n'ont pas changé depuis le
+        manifeste précédent ne sont pas relus. Retourne (manifeste, fichiers relus).
+        """
+        directory = Path(directory)
+        name = name or stage_name(directory)
+        previous_manifest = self.read_manifest(name) or {}
+        previous = previous_manifest.get('files', {})
+        manifest = self.new_manifest(name, directory, parent or previous_manifest.get('parent'))
+        hashed = 0
+        for path in sorted(p for p in directory.rglob('*') if p.is_file() and p.name.endswith(suffixes)):
+            relpath = path.relative_to(directory).as_posix()
+            st = path.stat()
+            entry = previous.get(relpath)
+            if (entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns
+                    and self.has(entry['sha256'])):
+                manifest['files'][relpath] = entry
+                continue
+            digest = self.put_file(path)
+            hashed += 1
+            self.add_entry(manifest, relpath, digest, path)
+        self.write_manifest(manifest)
+        return manifest, hashed
+
+    def checkout(self, name: str, directory=None, prune: bool = False) -> Dict[str, int]:
+        """
+        Matérialise une étape dans un dossier (par défaut le sien) : seuls les
+        fichiers absents ou différents sont écrits (voir materialize). `prune`
+        retire les fichiers de même suffixe absents du manifeste.
+        """
+        manifest = self.read_manifest(name)
+        if manifest is None:
+            raise KeyError(f'Étape inconnue : {name}')
+        directory = Path(directory or REPO_ROOT / manifest['directory'])
+        counts = {'written': 0, 'unchanged': 0, 'removed': 0}
+        for relpath, entry in manifest['files'].items():
+            target = directory / relpath
+            if self.materialize(entry['sha256'], target):
+                counts['written'] += 1
+            else:
+                counts['unchanged'] += 1
+            st = target.stat()
+            entry['size'], entry['mtime_ns'] = st.st_size, st.st_mtime_ns
+        if prune:
+            suffixes = tuple({Path(p).suffix for p in manifest['files']}) or ('.html',)
+            for path in directory.rglob('*'):
+                if path.is_file() and path.suffix in suffixes and \
+                        path.relative_to(directory).as_posix() not in manifest['files']:
+                    path.unlink()
+                    counts['removed'] += 1
+        if Path(directory).resolve() == (REPO_ROOT / manifest['directory']).resolve():
+            self.write_manifest(manifest)
+        return counts
+
+    def verify(self, name: str) -> Dict[str, List[str]]:
+        """Fichiers de la vue modifiés, manquants ou en trop par rapport au manifeste"""
+        manifest = self.read_manifest(name)
+        if manifest is None:
+            raise KeyError(f'Étape inconnue : {name}')
+        directory = REPO_ROOT / manifest['directory']
+        report = {'modified': [], 'missing': [], 'extra': [], 'missing_blobs': []}
+        for relpath, entry in manifest['files'].items():
+            path = directory / relpath
+            if not self.has(entry['sha256']):
+                report['missing_blobs'].append(relpath)
+            if not path.exists():
+                report['missing'].append(relpath)
+            elif _digest(path) != entry['sha256']:
+                report['modified'].append(relpath)
+        suffixes = tuple({Path(p).suffix for p in manifest['files']}) or ('.html',)
+        if directory.is_dir():
+            for path in directory.rglob('*'):
+                relpath = path.relative_to(directory).as_posix()
+                if path.is_file() and path.suffix in suffixes and relpath not in manifest['files']:
+                    report['extra'].append(relpath)
+        return report
+
+    def usage(self) -> Dict:
+        """Taille logique des étapes et taille réelle du stockage"""
+        stages = []
+        referenced: Dict[str, int] = {}
+        for manifest in self.manifests():
+            files = manifest['files'].values()
+            digests = {entry['sha256']: entry['size'] for entry in files}
+            referenced.update(digests)
+            stages.append({'name': manifest['name'], 'files': len(manifest['files']),
+                           'bytes': sum(entry['size'] for entry in files),
+                           'unique_bytes': sum(digests.values()), 'parent': manifest.get('parent')})
+        stored = sum(p.stat().st_size for p in self.objects.rglob('*') if p.is_file()) if self.objects.is_dir() else 0
+        return {'stages': stages, 'logical_bytes': sum(s['bytes'] for s in stages),
+                'referenced_bytes': sum(referenced.values()), 'stored_bytes': stored,
+                'blobs': len(referenced)}
+
+    def gc(self) -> Tuple[int, int]:
+        """Supprime les blobs qu'aucun manifeste ne référence ; retourne (blobs, octets)"""
+        referenced = {entry['sha256'] for manifest in self.manifests() for entry in manifest['files'].values()}
+        removed = size = 0
+        for path in self.objects.rglob('*') if self.objects.is_dir() else []:
+            if path.is_file() and path.parent.name + path.name not in referenced:
+                size += path.stat().st_size
+                path.unlink()
+                removed += 1
+        return removed, size
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def _clone(src: Path, dst: Path):
+    """Copie `src` vers `dst` : blocs partagés si le système de fichiers le permet"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if sys.platform.startswith('linux') and _reflink(fsrc.fileno(), fdst.fileno()):
+            return
+        shutil.copyfileobj(fsrc, fdst, 1 << 20)
+
+
+def _digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def diff_manifests(old: Dict, new: Dict) -> Dict[str, List[str]]:
+    """Chemins ajoutés, supprimés, modifiés et identiques entre deux manifestes"""
+    before, after = old['files'], new['files']
+    return {
+        'added': sorted(p for p in after if p not in before),
+        'removed': sorted(p for p in before if p not in after),
+        'changed': sorted(p for p in after if p in before and after[p]['sha256'] != before[p]['sha256']),
+        'unchanged': sorted(p for p in after if p in before and after[p]['sha256'] == before[p]['sha256']),
+    }
+
+
+def stage_files(manifest: Dict) -> Iterable[Tuple[str, str]]:
+    """(chemin relatif à la racine du dépôt, sha256) des fichiers d'une étape"""
+    for relpath, entry in manifest['files'].items():
+        yield f"{manifest['directory']}/{relpath}", entry['sha256']
@@ -0,0 +1,166 @@
+"""
+Cache disque des résultats d'audit, indexé par empreinte du fichier et version
+des règles.
+
+Un fichier dont la taille et la date de modification n'ont pas changé est
+considéré comme propre sans être relu ; sinon son contenu est haché et le
+résultat précédent est réutilisé si l'empreinte est identique. Changer les
+règles (tables, version du script) invalide tout le cache.
+
+Pour une analyse qui ne dépend que du contenu (by_content=True), le résultat
+d'une page est aussi repris pour toute autre page de même empreinte : les
+dossiers miroirs (pages_*), en grande partie identiques à src/pages, ne sont
+analysés qu'une fois par contenu distinct (voir group_pending).
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import REPO_ROOT
+
+CACHE_DIR = REPO_ROOT / '.cache' / 'audit'
+
+
+def file_digest(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def rules_fingerprint(*parts: Any) -> str:
+    """Empreinte courte d'un jeu de règles (tables, constantes, numéro de version)"""
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class AuditCache:
+    """
+    Résultats d'audit par fichier, persistés en JSON dans .cache/audit/<name>.json.
+
+    Les résultats doivent être sérialisables en JSON (les tuples reviennent
+    sous forme de listes).
+    """
+
+    def __init__(self, name: str, rules_version: str, enabled: bool = True, cache_dir=None,
+                 by_content: bool = False):
+        self.path = os.path.join(str(cache_dir or CACHE_DIR), f'{name}.json')
+        self.rules_version = rules_version
+        self.enabled = enabled
+        self.by_content = by_content
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries: Dict[str, dict] = {}
+        self._by_digest: Dict[str, Any] = {}
+        self._pending: Dict[str, Tuple[str, int, int]] = {}
+        self._dirty = False
+        if enabled:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('rules_version') == self.rules_version:
+            self._entries = data.get('entries', {})
+            if self.by_content:
+                self._by_digest = {entry['sha256']: entry['result'] for entry in self._entries.values()}
+        else:
+            self._dirty = True
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(str(path)).replace('\\', '/')
+
+    def get(self, path: str) -> Optional[Any]:
+        """Résultat mis en cache si le fichier n'a pas changé, sinon None"""
+        if not self.enabled:
+            return None
+        key = self._key(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        entry = self._entries.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            self.hits += 1
+            return entry['result']
+        try:
+            digest = file_digest(path)
+        except OSError:
+            # Illisible ou supprimé entre-temps : l'appelant signale l'erreur en lisant la page
+            return None
+        if entry and entry['sha256'] == digest:
+            # Fichier touché mais contenu identique : on rafraîchit la date
+            entry['size'], entry['mtime_ns'] = st.st_size, st.st_mtime_ns
+            self._dirty = True
+            self.hits += 1
+            return entry['result']
+        if digest in self._by_digest:
+            # Même contenu qu'une page déjà analysée (autre dossier miroir)
+            result = self._by_digest[digest]
+            self._entries[key] = {'sha256': digest, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                                  'result': result}
+            self._dirty = True
+            self.hits += 1
+            self.shared += 1
+            return result
+        self._pending[key] = (digest, st.st_size, st.st_mtime_ns)
+        self.misses += 1
+        return None
+
+    def put(self, path: str, result: Any):
+        """Enregistre le résultat d'un fichier qui vient d'être analysé"""
+        if not self.enabled:
+            return
+        key = self._key(path)
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            try:
+                st = os.stat(path)
+                pending = (file_digest(path), st.st_size, st.st_mtime_ns)
+            except OSError:
+                return
+        digest, size, mtime_ns = pending
+        self._entries[key] = {'sha256': digest, 'size': size, 'mtime_ns': mtime_ns, 'result': result}
+        if self.by_content:
+            self._by_digest[digest] = result
+        self._dirty = True
+
+    def group_pending(self, paths: Sequence[str]) -> List[List[int]]:
+        """
+        Regroupe par contenu les fichiers que get() vient de manquer : retourne
+        des listes d'indices de `paths`, le premier de chaque liste étant le
+        fichier à analyser (by_content=True), sinon un groupe par fichier.
+        """
+        if not (self.enabled and self.by_content):
+            return [[i] for i in range(len(paths))]
+        groups: Dict[str, List[int]] = {}
+        for i, path in enumerate(paths):
+            pending = self._pending.get(self._key(path))
+            groups.setdefault(pending[0] if pending else f'#{i}', []).append(i)
+        self.shared += len(paths) - len(groups)
+        self.misses -= len(paths) - len(groups)
+        self.hits += len(paths) - len(groups)
+        return list(groups.values())
+
+    def save(self):
+        """Écrit le cache (atomiquement) en retirant les fichiers disparus"""
+        if not self.enabled:
+            return
+        for key in [k for k in self._entries if not os.path.exists(k)]:
+            del self._entries[key]
+            self._dirty = True
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rules_version': self.rules_version, 'entries': self._entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,224 @@
+"""
+Détection des problèmes d'encodage au niveau des octets (numpy).
+
+Le fichier est mappé en mémoire et vu comme un tableau d'octets. Une seule
+passe vectorisée sur tout le tampon repère les octets non ASCII et les
+contrôles C0 ; chaque classe de défaut est ensuite un masque calculé sur ces
+seules positions candidates par lectures décalées (b[i-1], b[i+1], ...), sans
+décodage ni boucle Python par caractère :
+
+- utf8_invalide   : octets interdits, séquence tronquée, continuation orpheline,
+                    formes trop longues et surrogates (ED A0..BF) ;
+- remplacement    : U+FFFD (EF BF BD), trace d'un décodage déjà perdu ;
+- double_encodage : UTF-8 relu en Windows-1252 puis réencodé (« Ã© », « Ã¨ »,
+                    « Â  », « â€™ », « ðŸ », « ï¿½ ») ;
+- controle        : caractères de contrôle C1 (C2 80..9F) et C0 hors tabulation
+                    et fins de ligne ;
+- bom             : BOM UTF-8 en tête de fichier ;
+- euro_accent     : « € » collé à une lettre à la place d'un accent (« mari€ ») ;
+- euro_a          : « € » en début de mot hors montant (« € partir ») ;
+- euro_puce       : « € » en tête de ligne ou d'élément à la place d'une puce ;
+- e_euro          : « é » à la place de « € » après un montant (« 610 é »)
+                    ou collé à un chiffre.
+
+Les positions sont des décalages en octets depuis le début du fichier.
+"""
+import mmap
+from typing import Dict, List
+
+import numpy as np
+
+CLASSES = ('utf8_invalide', 'remplacement', 'double_encodage', 'controle', 'bom',
+           'euro_accent', 'euro_a', 'euro_puce', 'e_euro')
+CRITICAL = ('utf8_invalide', 'remplacement', 'double_encodage', 'controle')
+
+# Nombre maximal de positions détaillées par classe et par fichier (les
+# compteurs restent exacts)
+MAX_FINDINGS = 50
+SNIPPET = 24
+
+# Longueur de séquence annoncée par chaque octet : 1 ASCII, 0 continuation,
+# 2 à 4 octet de tête, 255 octet interdit en UTF-8
+_LENGTH = np.ones(256, dtype=np.uint8)
+_LENGTH[0x80:0xC0] = 0
+_LENGTH[0xC0:0xC2] = 255
+_LENGTH[0xC2:0xE0] = 2
+_LENGTH[0xE0:0xF0] = 3
+_LENGTH[0xF0:0xF5] = 4
+_LENGTH[0xF5:] = 255
+
+# Premier octet d'un caractère Windows-1252 réencodé en UTF-8 (hors C2, traité à part)
+_CP1252_LEADS = (0xC5, 0xC6, 0xCB, 0xE2)
+
+
+def _between(values: np.ndarray, low: int, high: int) -> np.ndarray:
+    return (values >= low) & (values <= high)
+
+
+def _digit(values: np.ndarray) -> np.ndarray:
+    return _between(values, 0x30, 0x39)
+
+
+def _lower(values: np.ndarray) -> np.ndarray:
+    return _between(values, 0x61, 0x7A)
+
+
+def _upper(values: np.ndarray) -> np.ndarray:
+    return _between(values, 0x41, 0x5A)
+
+
+class _Window:
+    """Lectures décalées b[i + k] aux seules positions candidates (0 hors du tampon)"""
+
+    def __init__(self, b: np.ndarray, positions: np.ndarray):
+        self.b = b
+        self.positions = positions
+        self._cache: Dict[int, np.ndarray] = {}
+
+    def __getitem__(self, k: int) -> np.ndarray:
+        if k not in self._cache:
+            j = self.positions + k
+            valid = (j >= 0) & (j < len(self.b))
+            values = np.zeros(len(j), dtype=np.uint8)
+            values[valid] = self.b[j[valid]]
+            self._cache[k] = values
+        return self._cache[k]
+
+    def sequence(self, seq, start: int = 0) -> np.ndarray:
+        """Masque des positions où `seq` commence au décalage `start`"""
+        mask = np.ones(len(self.positions), dtype=bool)
+        for k, value in enumerate(seq, start):
+            mask &= self[k] == value
+        return mask
+
+    def after_amount(self) -> np.ndarray:
+        """Précédé d'un montant : chiffre, éventuellement suivi d'une espace (fine) insécable ou d'une entité"""
+        p1, p2, p3, p4 = self[-1], self[-2], self[-3], self[-4]
+        return (_digit(p1) | (p1 == ord(';'))
+                | ((p1 == 0x20) & _digit(p2))
+                | ((p1 == 0xA0) & (p2 == 0xC2) & _digit(p3))
+                | ((p1 == 0xAF) & (p2 == 0x80) & (p3 == 0xE2) & _digit(p4)))
+
+
+def _invalid_utf8(high: _Window) -> np.ndarray:
+    """Début de chaque séquence invalide parmi les octets non ASCII"""
+    length = _LENGTH[high[0]]
+    errors = length == 255
+    # Octet de tête : les suivants doivent être des continuations
+    for k in (1, 2, 3):
+        errors |= (length > k) & (length != 255) & (_LENGTH[high[k]] != 0)
+    n1 = high[1]
+    t = high[0]
+    errors |= (((t == 0xE0) & (n1 < 0xA0)) | ((t == 0xED) & (n1 >= 0xA0))
+               | ((t == 0xF0) & (n1 < 0x90)) | ((t == 0xF4) & (n1 >= 0x90)))
+    # Continuation : une tête doit la précéder à bonne distance
+    expected = np.zeros(len(t), dtype=bool)
+    for k in (1, 2, 3):
+        before = _LENGTH[high[-k]]
+        expected |= (before > k) & (before != 255)
+    errors |= (length == 0) & ~expected
+    offsets = high.positions[errors]
+    # Une suite d'octets invalides (texte Latin-1) compte pour un seul défaut
+    return offsets[np.diff(offsets, prepend=-2) != 1]
+
+
+def scan_bytes(b: np.ndarray) -> Dict[str, np.ndarray]:
+    """Positions (octets) de chaque classe de défaut dans le tampon `b` (uint8)"""
+    found = {name: np.zeros(0, dtype=np.int64) for name in CLASSES}
+    if not len(b):
+        return found
+    # Seule passe sur tout le tampon : les octets non ASCII et les contrôles C0
+    high = _Window(b, np.flatnonzero(b >= 0x80))
+    low = np.flatnonzero(b < 0x20)
+    found['controle'] = low[(b[low] != 0x09) & (b[low] != 0x0A) & (b[low] != 0x0D) & (b[low] != 0x0C)]
+    if len(b) >= 3 and bytes(b[:3]) == b'\xef\xbb\xbf':
+        found['bom'] = np.zeros(1, dtype=np.int64)
+    if not len(high.positions):
+        return found
+
+    t, n1, n2, n3 = high[0], high[1], high[2], high[3]
+    p1 = high[-1]
+    found['utf8_invalide'] = _invalid_utf8(high)
+    found['remplacement'] = high.positions[high.sequence((0xEF, 0xBF, 0xBD))]
+
+    # « Ã » / « Â » (lettre de 2 octets) ou « â », « ï », « ð » (tête de 3 et
+    # 4 octets) suivis d'un caractère Windows-1252 réencodé
+    cp1252 = np.isin(n2, _CP1252_LEADS) | ((n2 == 0xC2) & _between(n3, 0x80, 0xBF))
+    double = (t == 0xC3) & ((((n1 == 0x83) | (n1 == 0x82)) & ((n2 == 0xC2) | np.isin(n2, _CP1252_LEADS)))
+                            | (np.isin(n1, (0xA2, 0xAF, 0xB0)) & cp1252))
+    found['double_encodage'] = high.positions[double]
+    # Contrôles C1 isolés ; dans une suite mojibake ils suivent un autre octet
+    # non ASCII et la suite est déjà comptée
+    c1 = (t == 0xC2) & _between(n1, 0x80, 0x9F) & (p1 < 0x80)
+    found['controle'] = np.union1d(found['controle'], high.positions[c1])
+
+    euro = high.sequence((0xE2, 0x82, 0xAC))
+    # « k€ » (milliers d'euros) est légitime
+    euro_accent = euro & _lower(p1) & (p1 != ord('k'))
+    p2, n4 = high[-2], high[4]
+    line_start = ((p1 == 0x0A) | (p1 == ord('>')) | (high.positions == 0)
+                  | ((p1 == 0x20) & ((p2 == 0x0A) | (p2 == ord('>')) | (p2 == 0x20))))
+    # « € par mois » est une unité
+    euro_word = (euro & (n3 == 0x20) & ~_lower(p1) & ~_upper(p1) & ~high.after_amount()
+                 & ~high.sequence(b'par ', 4))
+    found['euro_accent'] = high.positions[euro_accent]
+    found['euro_a'] = high.positions[euro_word & _lower(n4)]
+    found['euro_puce'] = high.positions[euro_word & _upper(n4) & line_start]
+
+    # Après é : ni lettre ASCII ni octet de tête (lettre accentuée)
+    e_acute = (t == 0xC3) & (n1 == 0xA9)
+    word_end = ~(_lower(n2) | _upper(n2) | (n2 >= 0xC0))
+    found['e_euro'] = high.positions[e_acute & ((high.after_amount() & word_end) | _digit(n2))]
+    return found
+
+
+def scan_file(path: str) -> Dict:
+    """
+    Analyse un fichier mappé en mémoire.
+
+    Retourne {'size', 'counts': {classe: n}, 'findings': [[classe, octet, ligne, extrait], ...]}
+    (sérialisable en JSON pour le cache d'audit), trié par position.
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return {'size': 0, 'counts': {}, 'findings': []}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            b = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                return _result(b)
+            finally:
+                # La vue numpy doit disparaître avant la fermeture du mapping
+                del b
+
+
+def scan_content(content_bytes: bytes) -> Dict:
+    """Comme scan_file, sur le contenu d'une page déjà lue"""
+    if not content_bytes:
+        return {'size': 0, 'counts': {}, 'findings': []}
+    return _result(np.frombuffer(content_bytes, dtype=np.uint8))
+
+
+def _result(b: np.ndarray) -> Dict:
+    found = scan_bytes(b)
+    counts = {name: len(offsets) for name, offsets in found.items() if len(offsets)}
+    return {'size': len(b), 'counts': counts, 'findings': _describe(b, found)}
+
+
+def _printable(text: str) -> str:
+    """Échappe les caractères invisibles (contrôles, BOM) pour l'affichage"""
+    return ''.join(c if c.isprintable() or c.isspace() else f'\\u{ord(c):04x}' for c in text)
+
+
+def _describe(b: np.ndarray, found: Dict[str, np.ndarray]) -> List[list]:
+    newlines = np.flatnonzero(b == 0x0A)
+    findings = []
+    for name, offsets in found.items():
+        offsets = offsets[:MAX_FINDINGS]
+        lines = np.searchsorted(newlines, offsets, side='right') + 1
+        for offset, line in zip(offsets.tolist(), lines.tolist()):
+            context = bytes(b[max(offset - SNIPPET, 0):offset + SNIPPET])
+            snippet = ' '.join(_printable(context.decode('utf-8', errors='replace')).split())
+            findings.append([name, offset, line, snippet])
+    findings.sort(key=lambda finding: (finding[1], CLASSES.index(finding[0])))
+    return findings
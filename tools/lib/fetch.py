@@ -0,0 +1,145 @@
+"""
+Couche de téléchargement concurrente (asyncio) pour les scripts de vérification.
+
+- concurrence bornée globalement et par hôte ;
+- nouvelles tentatives avec attente exponentielle (erreurs réseau, 429, 5xx) ;
+- cache disque des réponses (.cache/http) revalidé par ETag / Last-Modified.
+
+Les appels urllib bloquants sont exécutés dans des threads ; les résultats
+reprennent la convention (statut, texte) des scripts existants.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import ssl
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from . import REPO_ROOT
+
+HTTP_CACHE_DIR = REPO_ROOT / '.cache' / 'http'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (compatible; lescalculateurs-verifier)'
+
+
+class FetchResult(NamedTuple):
+    status: int
+    text: str
+    from_cache: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def decode_body(content: bytes) -> str:
+    """UTF-8 d'abord, sinon latin-1"""
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('latin-1', errors='replace')
+
+
+class ResponseCache:
+    """Dernière réponse 200 de chaque URL, avec ses validateurs HTTP"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = str(cache_dir or HTTP_CACHE_DIR)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest()[:32] + '.json')
+
+    def get(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, result: FetchResult):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = {'url': url, 'status': result.status, 'text': result.text, 'etag': result.etag,
+                 'last_modified': result.last_modified, 'fetched_at': time.time()}
+        tmp_path = self._path(url) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(url))
+
+
+def _open(url: str, headers: Dict[str, str], timeout: float, context: Optional[ssl.SSLContext]):
+    req = urllib.request.Request(url, headers=headers)
+    with urllib.request.urlopen(req, timeout=timeout, context=context) as resp:
+        return resp.status, resp.read(), resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+
+
+class Fetcher:
+    """
+    Télécharge un lot d'URLs en parallèle.
+
+        results = Fetcher(per_host=2).fetch_all_sync(urls)
+        status, text = results[url][:2]
+    """
+
+    def __init__(self, per_host: int = 2, max_concurrency: int = 8, timeout: float = 15,
+                 retries: int = 2, backoff: float = 0.5, cache: Optional[ResponseCache] = None,
+                 user_agent: str = DEFAULT_USER_AGENT, ssl_context: Optional[ssl.SSLContext] = None,
+                 resolve: Optional[Callable[[str], str]] = None):
+        self.per_host = per_host
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.user_agent = user_agent
+        self.ssl_context = ssl_context
+        # Permet de rediriger les requêtes (ex. serveur de fixtures local)
+        self.resolve = resolve or (lambda url: url)
+
+    async def _fetch(self, url: str, host_limits: Dict[str, asyncio.Semaphore],
+                     global_limit: asyncio.Semaphore) -> FetchResult:
+        target = self.resolve(url)
+        cached = self.cache.get(url) if self.cache else None
+        headers = {'User-Agent': self.user_agent}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        host = urlsplit(target).netloc
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+        for attempt in range(self.retries + 1):
+            retry = attempt < self.retries
+            async with host_limit, global_limit:
+                try:
+                    status, body, etag, last_modified = await asyncio.to_thread(
+                        _open, target, headers, self.timeout, self.ssl_context)
+                    result = FetchResult(status, decode_body(body), False, etag, last_modified)
+                    if self.cache and status == 200:
+                        self.cache.put(url, result)
+                    return result
+                except urllib.error.HTTPError as e:
+                    if e.code == 304 and cached:
+                        return FetchResult(cached['status'], cached['text'], True,
+                                           cached.get('etag'), cached.get('last_modified'))
+                    if not (retry and e.code in RETRY_STATUSES):
+                        return FetchResult(e.code, f"HTTP {e.code}")
+                except urllib.error.URLError as e:
+                    if not retry:
+                        return FetchResult(0, f"URL Error: {e.reason}")
+                except Exception as e:
+                    if not retry:
+                        return FetchResult(0, f"ERROR: {type(e).__name__}: {e}")
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def fetch_all(self, urls: Iterable[str]) -> Dict[str, FetchResult]:
+        """Télécharge chaque URL distincte une seule fois ; résultats dans l'ordre d'entrée"""
+        unique = list(dict.fromkeys(urls))
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self._fetch(url, host_limits, global_limit) for url in unique))
+        return dict(zip(unique, results))
+
+    def fetch_all_sync(self, urls: Iterable[str]) -> Dict[str, FetchResult]:
+        return asyncio.run(self.fetch_all(urls))
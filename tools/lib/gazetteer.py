@@ -0,0 +1,263 @@
+"""
+Gazetteer des lieux français pour étiqueter les requêtes Search Console.
+
+Sources : src/data/departements.json (codes et noms des départements),
+src/data/taxe-fonciere-departements.json (région de chaque département), une
+liste de grandes villes et, si l'export VDF est présent (vdf/, voir
+lib.vdf_store), toutes les communes de France.
+
+Chaque nom est normalisé (minuscules, sans accents, ponctuation -> espace,
+« st » -> « saint ») puis découpé en mots et inséré dans un trie de mots.
+Une requête est parcourue une seule fois, mot par mot, avec la correspondance
+la plus longue à chaque position : « nice » ne correspond jamais à l'intérieur
+de « service », et « saint etienne » l'emporte sur « saint ». Les noms qui
+sont aussi des mots courants (« cher », « lot », « sens », ...) ne sont
+reconnus qu'après « département » (« departement du cher »).
+
+Le trie compilé est mis en cache (.cache/gazetteer.json) tant que les sources
+ne changent pas.
+"""
+import hashlib
+import json
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from . import REPO_ROOT
+from .vdf_store import VdfStore, find_vdf_csv
+
+DEPARTEMENTS_JSON = REPO_ROOT / 'src' / 'data' / 'departements.json'
+REGIONS_JSON = REPO_ROOT / 'src' / 'data' / 'taxe-fonciere-departements.json'
+CACHE_PATH = REPO_ROOT / '.cache' / 'gazetteer.json'
+
+# À incrémenter quand la construction change : le cache est alors reconstruit
+GAZETTEER_VERSION = 1
+
+# Grandes villes -> code département (disponibles même sans l'export VDF)
+GRANDES_VILLES = {
+    'Paris': '75', 'Marseille': '13', 'Lyon': '69', 'Toulouse': '31', 'Nice': '06',
+    'Nantes': '44', 'Montpellier': '34', 'Strasbourg': '67', 'Bordeaux': '33', 'Lille': '59',
+    'Rennes': '35', 'Reims': '51', 'Toulon': '83', 'Saint-Étienne': '42', 'Le Havre': '76',
+    'Grenoble': '38', 'Dijon': '21', 'Angers': '49', 'Nîmes': '30', 'Villeurbanne': '69',
+    'Clermont-Ferrand': '63', 'Clermont': '63', 'Le Mans': '72', 'Aix-en-Provence': '13',
+    'Brest': '29', 'Tours': '37', 'Amiens': '80', 'Limoges': '87', 'Annecy': '74',
+    'Perpignan': '66', 'Metz': '57', 'Besançon': '25', 'Orléans': '45', 'Rouen': '76',
+    'Mulhouse': '68', 'Caen': '14', 'Nancy': '54', 'Argenteuil': '95', 'Montreuil': '93',
+    'Roubaix': '59', 'Tourcoing': '59', 'Avignon': '84', 'Poitiers': '86', 'Pau': '64',
+    'La Rochelle': '17', 'Calais': '62', 'Lens': '62', 'Ajaccio': '2A', 'Bastia': '2B',
+}
+
+# Anciennes régions et abréviations -> région actuelle
+REGION_ALIASES = {
+    'idf': 'Île-de-France', 'ile de france': 'Île-de-France', 'region parisienne': 'Île-de-France',
+    'paca': "Provence-Alpes-Côte d'Azur", 'provence': "Provence-Alpes-Côte d'Azur",
+    'cote d azur': "Provence-Alpes-Côte d'Azur",
+    'rhone alpes': 'Auvergne-Rhône-Alpes', 'auvergne': 'Auvergne-Rhône-Alpes',
+    'alsace': 'Grand Est', 'lorraine': 'Grand Est', 'champagne ardenne': 'Grand Est',
+    'aquitaine': 'Nouvelle-Aquitaine', 'limousin': 'Nouvelle-Aquitaine', 'poitou charentes': 'Nouvelle-Aquitaine',
+    'languedoc roussillon': 'Occitanie', 'midi pyrenees': 'Occitanie',
+    'nord pas de calais': 'Hauts-de-France', 'picardie': 'Hauts-de-France',
+    'bourgogne': 'Bourgogne-Franche-Comté', 'franche comte': 'Bourgogne-Franche-Comté',
+    'basse normandie': 'Normandie', 'haute normandie': 'Normandie',
+}
+
+# Noms de lieux qui sont aussi des mots courants des requêtes : reconnus
+# seulement après « departement » (départements) ou jamais (communes)
+MOTS_COURANTS = {
+    'cher', 'lot', 'nord', 'sens', 'eu', 'y', 'bar', 'vic', 'plan', 'pont', 'mont', 'port',
+    'prix', 'aide', 'aides', 'taxe', 'frais', 'vente', 'bonus', 'brut', 'net', 'charge',
+    'salaire', 'revenu', 'impot', 'loyer', 'notaire', 'calcul', 'simulation', 'simulateur',
+    'montant', 'france', 'centre', 'est', 'ouest', 'sud', 'la', 'le', 'les', 'val', 'bois',
+    'moyen', 'moyenne', 'prime', 'rsa', 'apl', 'caf', 'smic', 'retraite', 'chomage',
+    'somme', 'plus', 'moins', 'combien', 'mois', 'an', 'ans', 'euro', 'euros',
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_ABBREVIATIONS = {'st': 'saint', 'ste': 'sainte'}
+_END = ''  # clé terminale du trie (jamais un mot)
+
+
+def normalize(text: str) -> List[str]:
+    """« Saint-Étienne » -> ['saint', 'etienne'] ; « St Ouen » -> ['saint', 'ouen']"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [_ABBREVIATIONS.get(t, t) for t in _TOKEN_RE.findall(text)]
+
+
+@dataclass(frozen=True)
+class Place:
+    """Lieu reconnu dans une requête (`start`/`end` : indices de mots)"""
+    kind: str            # 'region', 'departement' ou 'commune'
+    name: str
+    departement: str     # code, vide pour une région
+    region: str
+    start: int = 0
+    end: int = 0
+
+
+def _sha256(path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ''
+
+
+class Gazetteer:
+    """
+    Trie de mots compilé.
+
+        gaz = Gazetteer.load()
+        gaz.tag('salaire moyen a saint etienne')   # [Place(commune, Saint-Étienne, 42, ...)]
+        gaz.region('notaire lyon')                  # 'Auvergne-Rhône-Alpes'
+    """
+
+    def __init__(self, entries: List[list], trie: dict):
+        self.entries = entries   # [kind, name, departement, region]
+        self.trie = trie
+
+    # -- Construction ------------------------------------------------------
+    @staticmethod
+    def _vdf() -> Optional[VdfStore]:
+        if find_vdf_csv() is None:
+            return None
+        vdf = VdfStore.ensure()
+        return vdf if vdf.has('code') and vdf.has('nom') else None
+
+    @classmethod
+    def _sources(cls, vdf: Optional[VdfStore]) -> Tuple[Dict[str, str], Dict[str, str], List[Tuple[str, str]]]:
+        """(code -> nom, code -> région, [(commune, code département)])"""
+        with open(DEPARTEMENTS_JSON, 'r', encoding='utf-8') as f:
+            departements = {code: d['nom'] for code, d in json.load(f).items() if code != 'default'}
+        with open(REGIONS_JSON, 'r', encoding='utf-8') as f:
+            regions = {code: d['region'] for code, d in json.load(f)['departements'].items()}
+        # Ancien code unique de la Corse
+        regions.setdefault('20', regions.get('2A', ''))
+        communes: List[Tuple[str, str]] = []
+        if vdf is not None:
+            for code, nom in zip(vdf.column('code'), vdf.column('nom')):
+                code = str(code).strip()
+                communes.append((str(nom).strip(), code[:3] if code.startswith('97') else code[:2]))
+        return departements, regions, communes
+
+    @classmethod
+    def build(cls) -> 'Gazetteer':
+        return cls._compile(*cls._sources(cls._vdf()))
+
+    @classmethod
+    def _compile(cls, departements, regions, communes) -> 'Gazetteer':
+        entries: List[list] = []
+        trie: dict = {}
+
+        def insert(tokens: List[str], entry_id: int):
+            if not tokens:
+                return
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            ids = node.setdefault(_END, [])
+            if entry_id not in ids:
+                ids.append(entry_id)
+
+        def add(kind, name, code, region, names) -> int:
+            entries.append([kind, name, code, region])
+            for variant in names:
+                insert(variant, len(entries) - 1)
+            return len(entries) - 1
+
+        # Ordre d'insertion = priorité à portée égale : région, département, commune
+        region_ids = {region: add('region', region, '', region, [normalize(region)])
+                      for region in sorted(set(regions.values()))}
+        for alias, region in REGION_ALIASES.items():
+            if region in region_ids:
+                insert(alias.split(), region_ids[region])
+        for code, nom in sorted(departements.items()):
+            tokens = normalize(nom)
+            cued = [['departement'] + tokens, ['departement', 'du'] + tokens, ['departement', 'de'] + tokens,
+                    ['departement', code], ['dept', code], ['dep', code]]
+            names = cued if len(tokens) == 1 and tokens[0] in MOTS_COURANTS else [tokens] + cued
+            add('departement', nom, code, regions.get(code, ''), names)
+        seen = set()
+        for nom, code in list(GRANDES_VILLES.items()) + communes:
+            tokens = normalize(nom)
+            key = (tuple(tokens), code)
+            if not tokens or key in seen or code not in departements:
+                continue
+            seen.add(key)
+            if len(tokens) == 1 and (tokens[0] in MOTS_COURANTS or len(tokens[0]) < 3):
+                continue
+            add('commune', nom, code, regions.get(code, ''), [tokens])
+        return cls(entries, trie)
+
+    @classmethod
+    def load(cls, use_cache: bool = True) -> 'Gazetteer':
+        """Gazetteer compilé, depuis le cache si les sources n'ont pas changé"""
+        vdf = cls._vdf()
+        fingerprint = hashlib.sha256(json.dumps([
+            GAZETTEER_VERSION, _sha256(DEPARTEMENTS_JSON), _sha256(REGIONS_JSON),
+            vdf.manifest['source']['sha256'] if vdf is not None else '',
+            GRANDES_VILLES, REGION_ALIASES, sorted(MOTS_COURANTS),
+        ], ensure_ascii=False).encode('utf-8')).hexdigest()
+        if use_cache:
+            try:
+                with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('fingerprint') == fingerprint:
+                    return cls(cached['entries'], cached['trie'])
+            except (OSError, ValueError):
+                pass
+        gazetteer = cls._compile(*cls._sources(vdf))
+        if use_cache:
+            CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': fingerprint, 'entries': gazetteer.entries, 'trie': gazetteer.trie},
+                          f, ensure_ascii=False, separators=(',', ':'))
+        return gazetteer
+
+    # -- Étiquetage --------------------------------------------------------
+    def tag(self, query: str) -> List[Place]:
+        """
+        Lieux de la requête, de gauche à droite, correspondance la plus longue
+        à chaque position. Un nom porté par plusieurs communes donne une Place
+        par commune (même portée).
+        """
+        tokens = normalize(query)
+        places: List[Place] = []
+        i = 0
+        while i < len(tokens):
+            node = self.trie
+            best: Optional[Tuple[int, list]] = None
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if _END in node:
+                    best = (j, node[_END])
+            if best is None:
+                i += 1
+                continue
+            end, ids = best
+            candidates = [self.entries[k] for k in ids]
+            # À portée égale, seul le type le plus prioritaire est retenu
+            kind = candidates[0][0]
+            for entry_kind, name, code, region in candidates:
+                if entry_kind == kind:
+                    places.append(Place(entry_kind, name, code, region, i, end))
+            i = end
+        return places
+
+    def region(self, query: str) -> Optional[str]:
+        """Région du premier lieu non ambigu de la requête"""
+        return self.first_region(self.tag(query))
+
+    @staticmethod
+    def first_region(places: List[Place]) -> Optional[str]:
+        """Région du premier lieu non ambigu d'un résultat de tag()"""
+        by_start: Dict[int, set] = {}
+        for place in places:
+            by_start.setdefault(place.start, set()).add(place.region)
+        for start in sorted(by_start):
+            regions = by_start[start] - {''}
+            if len(regions) == 1:
+                return regions.pop()
+        return None
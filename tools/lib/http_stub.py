@@ -0,0 +1,176 @@
+"""
+Serveur HTTP local rejouant des réponses enregistrées (fixtures), pour
+exécuter les vérifications d'URLs hors ligne.
+
+Format d'un dossier de fixtures :
+    manifest.json   {url: {"id", "status", "etag", "last_modified", "fail_first", "error"}}
+    <id>.body       corps de la réponse (UTF-8)
+
+Le serveur gère If-None-Match / If-Modified-Since (réponse 304) ; une URL
+absente du manifeste répond 404. `fail_first` (facultatif) : nombre de
+réponses 503 renvoyées avant la réponse enregistrée, pour rejouer une panne
+passagère. `error` : erreur réseau enregistrée (statut 0, sans corps), rejouée
+en fermant la connexion sans réponse. tools/fixtures/urls contient un jeu
+synthétique (écrit à la main, voir son README) couvrant 200, 304, 404, 5xx,
+erreur réseau et nouvelle tentative, vérifié par self_check()
+(python tools/verify_urls_and_values.py --self-check).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+from . import REPO_ROOT
+from .fetch import FetchResult, Fetcher, ResponseCache
+
+FIXTURES_DIR = REPO_ROOT / 'tools' / 'fixtures' / 'urls'
+
+MANIFEST = 'manifest.json'
+
+
+def fixture_id(url: str) -> str:
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+
+
+def load_manifest(fixtures_dir: str) -> dict:
+    try:
+        with open(os.path.join(fixtures_dir, MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_fixture(fixtures_dir: str, url: str, result: FetchResult):
+    """
+    Ajoute (ou remplace) la réponse d'une URL dans le dossier de fixtures ;
+    une erreur réseau (statut 0) devient une entrée `error` sans corps
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    manifest = load_manifest(fixtures_dir)
+    entry_id = fixture_id(url)
+    if result.status == 0:
+        manifest[url] = {'id': entry_id, 'status': 0, 'error': result.text}
+    else:
+        with open(os.path.join(fixtures_dir, f'{entry_id}.body'), 'w', encoding='utf-8') as f:
+            f.write(result.text)
+        manifest[url] = {'id': entry_id, 'status': result.status,
+                         'etag': result.etag, 'last_modified': result.last_modified}
+    with open(os.path.join(fixtures_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+class FixtureServer:
+    """
+    Serveur de fixtures sur 127.0.0.1 (port libre choisi par le système).
+
+        with FixtureServer('tools/fixtures/urls') as server:
+            Fetcher(resolve=server.url_for).fetch_all_sync(urls)
+    """
+
+    def __init__(self, fixtures_dir: str):
+        self.fixtures_dir = fixtures_dir
+        self.manifest = load_manifest(fixtures_dir)
+        self._by_id = {entry['id']: entry for entry in self.manifest.values()}
+        # Requêtes reçues par URL d'origine
+        self.requests: Counter = Counter()
+        self._server = None
+        self._thread = None
+
+    def url_for(self, url: str) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/{fixture_id(url)}'
+
+    def _handler(self):
+        fixtures_dir, by_id, requests = self.fixtures_dir, self._by_id, self.requests
+        urls = {entry['id']: url for url, entry in self.manifest.items()}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                entry_id = self.path.lstrip('/')
+                requests[urls.get(entry_id, entry_id)] += 1
+                entry = by_id.get(entry_id)
+                if entry is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if requests[urls[entry_id]] <= entry.get('fail_first', 0):
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if entry.get('error'):
+                    # Erreur réseau : connexion fermée sans réponse
+                    self.close_connection = True
+                    return
+                etag, last_modified = entry.get('etag'), entry.get('last_modified')
+                if (etag and self.headers.get('If-None-Match') == etag) or \
+                        (last_modified and self.headers.get('If-Modified-Since') == last_modified):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                with open(os.path.join(fixtures_dir, f"{entry['id']}.body"), 'rb') as f:
+                    body = f.read()
+                self.send_response(entry.get('status', 200))
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                if etag:
+                    self.send_header('ETag', etag)
+                if last_modified:
+                    self.send_header('Last-Modified', last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def self_check(fixtures_dir=None, retries: int = 2) -> List[Tuple[str, bool, str]]:
+    """
+    Rejoue un dossier de fixtures avec Fetcher et vérifie, pour chaque URL, le
+    statut attendu, le nombre de tentatives (fail_first, 5xx, erreur réseau)
+    et, au second passage, la revalidation 304 depuis le cache. Ajoute une URL
+    absente du manifeste (404). Retourne [(vérification, réussie, détail)].
+    """
+    fixtures_dir = str(fixtures_dir or FIXTURES_DIR)
+    manifest = load_manifest(fixtures_dir)
+    missing = 'https://fixtures.invalid/absente'
+    checks = []
+    with tempfile.TemporaryDirectory() as cache_dir, FixtureServer(fixtures_dir) as server:
+        fetcher = Fetcher(resolve=server.url_for, cache=ResponseCache(cache_dir), retries=retries, backoff=0.01)
+        urls = list(manifest) + [missing]
+        first = fetcher.fetch_all_sync(urls)
+        hits = dict(server.requests)
+        second = fetcher.fetch_all_sync(urls)
+
+    for url in urls:
+        entry = manifest.get(url, {'status': 404})
+        status = entry.get('status', 200)
+        fail_first = entry.get('fail_first', 0)
+        if fail_first > retries:
+            status = 503
+        result = first[url]
+        checks.append((f'{status} {url}', result.status == status, f'statut {result.status}'))
+        if status in (0, 500, 502, 503, 504) or fail_first:
+            expected = retries + 1 if status != 200 else fail_first + 1
+            checks.append((f'tentatives {url}', hits.get(url, 0) == expected,
+                           f'{hits.get(url, 0)} requêtes, {expected} attendues'))
+        if status == 200 and (entry.get('etag') or entry.get('last_modified')):
+            again = second[url]
+            checks.append((f'304 {url}', again.from_cache and again.text == result.text,
+                           'servie depuis le cache' if again.from_cache else f'statut {again.status}, sans cache'))
+    return checks
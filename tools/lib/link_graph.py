@@ -0,0 +1,188 @@
+"""
+Graphe des liens internes du site (matrice d'adjacence creuse, numpy).
+
+Les nœuds sont les URL servies (cleanUrls : src/pages/apl.html -> /pages/apl,
+src/index.html -> /). Chaque <a href> est résolu comme le ferait le
+navigateur depuis l'URL de la page (liens relatifs, absolus vers
+lescalculateurs.fr), débarrassé de la requête, de l'ancre et de « .html »,
+puis suivi à travers les redirections permanentes de vercel.json. Les liens
+externes, mailto:, tel: et javascript: sont ignorés ; les liens internes sans
+page correspondante sont comptés à part.
+
+Les arêtes (dédupliquées, sans boucles) forment une matrice CSR : indptr,
+indices. Dessus : PageRank par itération de puissance, degrés entrant et
+sortant, pages orphelines et profondeur de clic depuis l'accueil (parcours en
+largeur).
+"""
+import html
+import json
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import numpy as np
+
+from . import REPO_ROOT
+
+VERCEL_JSON = REPO_ROOT / 'vercel.json'
+
+_SITE_RE = re.compile(r'^https?://(?:www\.)?lescalculateurs\.fr(?=/|$)', re.IGNORECASE)
+_SKIPPED_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'sms:')
+_MAX_REDIRECTS = 5
+
+
+def load_redirects(path=None) -> List[Tuple[re.Pattern, str]]:
+    """
+    Redirections de vercel.json sans condition d'hôte, compilées :
+    « :path* » devient un groupe nommé, les sources avec parenthèses sont des
+    expressions régulières (groupes repris par $1, $2, ...).
+    """
+    try:
+        with open(path or VERCEL_JSON, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return []
+    redirects = []
+    for rule in config.get('redirects', []):
+        if rule.get('has') or rule.get('missing'):
+            continue
+        source = rule['source']
+        pattern = re.sub(r':(\w+)\*', r'(?P<\1>.*)', source)
+        pattern = re.sub(r':(\w+)(?![\w*])', r'(?P<\1>[^/]+)', pattern)
+        try:
+            redirects.append((re.compile(f'^{pattern}$'), rule['destination']))
+        except re.error:
+            continue
+    return redirects
+
+
+def _apply_redirect(path: str, redirects: Sequence[Tuple[re.Pattern, str]]) -> str:
+    for _ in range(_MAX_REDIRECTS):
+        for pattern, destination in redirects:
+            match = pattern.match(path)
+            if not match:
+                continue
+            target = destination
+            for name, value in match.groupdict().items():
+                target = target.replace(f':{name}*', value or '').replace(f':{name}', value or '')
+            target = re.sub(r'\$(\d+)', lambda m: match.group(int(m.group(1))) or '', target)
+            target = _SITE_RE.sub('', target) or '/'
+            if target == path or '://' in target:
+                return path
+            path = normalize_path(target)
+            break
+        else:
+            return path
+    return path
+
+
+def normalize_path(path: str) -> str:
+    """/pages/apl.html, /pages/apl/, /pages/apl/index.html -> /pages/apl"""
+    if path.endswith('.html'):
+        path = path[:-len('.html')]
+    if path.endswith('/index') or path == '/index':
+        path = path[:-len('index')]
+    path = re.sub(r'/{2,}', '/', path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return path or '/'
+
+
+def resolve_href(href: str, base: str, redirects: Sequence[Tuple[re.Pattern, str]] = ()) -> Optional[str]:
+    """Chemin interne visé par un lien depuis la page d'URL `base` ; None pour un lien externe ou ignoré"""
+    href = html.unescape(href).strip()
+    if not href or href.startswith('#') or href.lower().startswith(_SKIPPED_SCHEMES):
+        return None
+    if _SITE_RE.match(href):
+        href = _SITE_RE.sub('', href) or '/'
+    elif href.startswith('//') or re.match(r'^[a-z][a-z0-9+.-]*:', href, re.IGNORECASE):
+        return None
+    path = urlsplit(urljoin('https://www.lescalculateurs.fr' + base, href)).path
+    return _apply_redirect(normalize_path(path), redirects)
+
+
+class LinkGraph:
+    """
+    Graphe orienté des pages.
+
+        graph = LinkGraph.build(urls, links)        # links[i] = chemins visés par urls[i]
+        graph.pagerank(), graph.in_degree(), graph.click_depth('/')
+    """
+
+    def __init__(self, urls: List[str], src: np.ndarray, dst: np.ndarray, unresolved: Dict[str, int]):
+        self.urls = urls
+        self.n = len(urls)
+        order = np.lexsort((dst, src))
+        self.src, self.dst = src[order], dst[order]
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(self.src, minlength=self.n)))).astype(np.int64)
+        self.unresolved = unresolved
+
+    @classmethod
+    def build(cls, urls: Sequence[str], links: Sequence[Sequence[str]]) -> 'LinkGraph':
+        urls = list(urls)
+        position = {url: i for i, url in enumerate(urls)}
+        edges = set()
+        unresolved: Dict[str, int] = {}
+        for i, targets in enumerate(links):
+            for target in targets:
+                j = position.get(target)
+                if j is None:
+                    unresolved[target] = unresolved.get(target, 0) + 1
+                elif j != i:
+                    edges.add((i, j))
+        pairs = np.asarray(sorted(edges), dtype=np.int64).reshape(-1, 2)
+        return cls(urls, pairs[:, 0], pairs[:, 1], unresolved)
+
+    @property
+    def edges(self) -> int:
+        return len(self.src)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.dst, minlength=self.n)
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-10, max_iter: int = 200) -> np.ndarray:
+        """PageRank (somme 1) ; la masse des pages sans lien sortant est répartie uniformément"""
+        if self.n == 0:
+            return np.zeros(0)
+        out = self.out_degree().astype(np.float64)
+        dangling = out == 0
+        weights = np.zeros(self.n)
+        np.divide(1.0, out, out=weights, where=~dangling)
+        rank = np.full(self.n, 1.0 / self.n)
+        for _ in range(max_iter):
+            flow = np.bincount(self.dst, weights=(rank * weights)[self.src], minlength=self.n)
+            updated = (1 - damping) / self.n + damping * (flow + rank[dangling].sum() / self.n)
+            delta = np.abs(updated - rank).sum()
+            rank = updated
+            if delta < tol:
+                break
+        return rank
+
+    def click_depth(self, root: str = '/') -> np.ndarray:
+        """Nombre minimal de clics depuis `root` (-1 si inaccessible)"""
+        depth = np.full(self.n, -1, dtype=np.int64)
+        if root not in self.urls:
+            return depth
+        frontier = np.asarray([self.urls.index(root)])
+        depth[frontier] = 0
+        level = 0
+        while len(frontier):
+            level += 1
+            starts, ends = self.indptr[frontier], self.indptr[frontier + 1]
+            # Indices des arêtes sortantes de toute la frontière, sans boucle Python par page
+            lengths = ends - starts
+            offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+            neighbours = self.dst[np.arange(lengths.sum()) + offsets]
+            frontier = np.unique(neighbours[depth[neighbours] < 0])
+            depth[frontier] = level
+        return depth
+
+    def orphans(self, root: str = '/') -> np.ndarray:
+        """Pages sans aucun lien entrant (hors accueil)"""
+        mask = self.in_degree() == 0
+        if root in self.urls:
+            mask[self.urls.index(root)] = False
+        return np.flatnonzero(mask)
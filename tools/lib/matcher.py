@@ -0,0 +1,100 @@
+"""
+Recherche simultanée de motifs littéraux (tables de corrections françaises).
+
+Les motifs sont rangés dans un trie, lui-même compilé en une seule expression
+régulière à préfixes factorisés : le texte est parcouru une seule fois, quel
+que soit le nombre de motifs, puis le trie est parcouru uniquement aux
+positions candidates pour énumérer tous les motifs qui y commencent.
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+_END = ''  # clé de fin de motif dans le trie (aucun caractère réel n'est vide)
+
+
+def _trie_pattern(node: dict) -> str:
+    """Convertit un nœud du trie en expression régulière équivalente"""
+    branches = [re.escape(ch) + _trie_pattern(child)
+                for ch, child in sorted(node.items()) if ch != _END]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if _END in node:
+        # Un motif se termine ici : la suite est facultative
+        return '(?:' + body + ')?'
+    return body
+
+
+class LiteralMatcher:
+    """
+    Automate de recherche pour une liste de motifs littéraux.
+
+    Les indices retournés sont ceux de la liste `patterns` ; deux motifs
+    identiques (après passage en minuscules si ignore_case) sont tous deux
+    signalés. Avec ignore_case=True les positions se réfèrent à text.lower().
+    """
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False):
+        self.patterns: List[str] = list(patterns)
+        self.ignore_case = ignore_case
+        self._trie: dict = {}
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError(f"Motif vide à l'index {index}")
+            key = pattern.lower() if ignore_case else pattern
+            node = self._trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node.setdefault(_END, []).append(index)
+        self._regex = re.compile('(?=' + _trie_pattern(self._trie) + ')') if self._trie else None
+
+    def _prepare(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def _iter_hits(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """(index du motif, début, fin) pour chaque occurrence, chevauchements compris"""
+        if self._regex is None:
+            return
+        for candidate in self._regex.finditer(text):
+            start = candidate.start()
+            node = self._trie
+            pos = start
+            while True:
+                if _END in node:
+                    for index in node[_END]:
+                        yield index, start, pos
+                if pos >= len(text):
+                    break
+                node = node.get(text[pos])
+                if node is None:
+                    break
+                pos += 1
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Toutes les occurrences (index du motif, position), chevauchements compris"""
+        for index, start, _ in self._iter_hits(self._prepare(text)):
+            yield index, start
+
+    def scan(self, text: str) -> Dict[int, List[int]]:
+        """
+        Positions des occurrences par motif, sans chevauchement pour un même
+        motif : len(result[i]) == text.count(patterns[i]).
+        """
+        hits: Dict[int, List[int]] = {}
+        last_end: Dict[int, int] = {}
+        for index, start, end in self._iter_hits(self._prepare(text)):
+            if start < last_end.get(index, 0):
+                continue
+            hits.setdefault(index, []).append(start)
+            last_end[index] = end
+        return hits
+
+    def counts(self, text: str) -> Dict[int, int]:
+        """Nombre d'occurrences par motif (même sémantique que str.count)"""
+        return {index: len(positions) for index, positions in self.scan(text).items()}
+
+
+def compile_table(table: Sequence[Sequence[str]], column: int = 0,
+                  ignore_case: bool = False) -> LiteralMatcher:
+    """Compile une table de corrections [(fautif, correct, ...), ...] sur la colonne donnée"""
+    return LiteralMatcher((row[column] for row in table), ignore_case=ignore_case)
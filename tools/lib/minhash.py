@@ -0,0 +1,146 @@
+"""
+Détection de quasi-doublons par MinHash + LSH.
+
+Chaque document est réduit à l'ensemble de ses shingles (k mots consécutifs),
+puis à une signature MinHash de `num_perm` entiers : la proportion de
+composantes égales entre deux signatures estime la similarité de Jaccard des
+deux ensembles. Le LSH découpe les signatures en bandes ; deux documents qui
+partagent une bande tombent dans le même seau et deviennent candidats, ce qui
+évite la comparaison de toutes les paires.
+"""
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Nombre premier > 2**32 : (a * h + b) tient dans un uint64 pour a, b, h < 2**32
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(2 ** 32 - 1)
+
+NUMBER_RE = re.compile(r'[0-9]+(?:[\s.,\u00a0\u202f][0-9]{3})*')
+WORD_RE = re.compile(r"[\w#'-]+")
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules, nombres -> #num# (comme check_duplication_fuzzy.cjs), espaces réduits"""
+    return ' '.join(NUMBER_RE.sub('#num#', text.lower()).split())
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    """Empreintes CRC32 (uint64) des shingles de k mots du texte normalisé, sans doublons"""
+    words = WORD_RE.findall(normalize_text(text))
+    if len(words) < k:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = [' '.join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    unique = set(grams)
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in unique), dtype=np.uint64, count=len(unique))
+
+
+class MinHasher:
+    """Famille de `num_perm` permutations (a * h + b) mod p, déterministe pour un `seed` donné"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> Optional[np.ndarray]:
+        """Signature (uint32) d'un ensemble d'empreintes ; None s'il est vide"""
+        if not len(hashes):
+            return None
+        permuted = (np.outer(hashes, self.a) + self.b) % _PRIME
+        return (permuted.min(axis=0) & _MAX_HASH).astype(np.uint32)
+
+
+def similarity(signatures: np.ndarray, i: int, others) -> np.ndarray:
+    """Jaccard estimée entre la signature i et les signatures `others`"""
+    return (signatures[others] == signatures[i]).mean(axis=-1)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x: int, y: int):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def lsh_clusters(signatures: np.ndarray, threshold: float = 0.8, bands: int = 16,
+                 groups: Optional[Sequence[Hashable]] = None) -> List[Tuple[List[int], float]]:
+    """
+    Regroupe les documents dont la similarité estimée atteint `threshold`.
+
+    Dans chaque seau LSH, un membre est comparé aux représentants des clusters
+    déjà rencontrés dans ce seau (un par racine de l'union-find) et rejoint
+    ceux qu'il atteint ; s'il n'en atteint aucun, il est comparé (en un seul
+    calcul numpy) aux membres précédents, puis devient représentant s'il
+    reste seul. Un seau de m pages formant k clusters coûte O(m * k) au lieu
+    de O(m²) ; la fermeture transitive donne les clusters. Avec `groups`, seuls les documents d'un
+    même groupe sont comparés. Retourne [(indices triés, similarité moyenne au
+    premier), ...], du plus gros cluster au plus petit.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    groups = groups if groups is not None else [None] * n
+    uf = _UnionFind(n)
+    for band in range(bands):
+        chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        for i in range(n):
+            buckets[(groups[i], chunk[i].tobytes())].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            representatives: List[int] = []
+            for pos, i in enumerate(members):
+                roots = {uf.find(r): r for r in representatives}
+                if uf.find(i) in roots:
+                    continue
+                representatives = list(roots.values())
+                matches = [r for r, score in zip(representatives, similarity(signatures, i, representatives))
+                           if score >= threshold] if representatives else []
+                if not matches and pos:
+                    # Proche d'un membre mais pas de son représentant : comparaison
+                    # vectorisée aux membres précédents, seulement dans ce cas
+                    seen = np.asarray(members[:pos])
+                    matches = seen[similarity(signatures, i, seen) >= threshold].tolist()
+                for r in matches:
+                    uf.union(i, r)
+                if not matches:
+                    representatives.append(i)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for i in range(n):
+        clusters[uf.find(i)].append(i)
+    result = []
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        score = float(similarity(signatures, members[0], members[1:]).mean())
+        result.append((members, score))
+    result.sort(key=lambda c: (-len(c[0]), c[0][0]))
+    return result
+
+
+def band_threshold(num_perm: int, bands: int) -> float:
+    """Similarité à partir de laquelle deux documents ont ~50 % de chances d'être candidats"""
+    return (1 / bands) ** (1 / (num_perm // bands))
+
+
+def signatures_matrix(signatures: Iterable[np.ndarray], num_perm: int) -> np.ndarray:
+    rows = list(signatures)
+    if not rows:
+        return np.zeros((0, num_perm), dtype=np.uint32)
+    return np.vstack(rows).astype(np.uint32)
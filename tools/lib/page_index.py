@@ -0,0 +1,230 @@
+"""
+Index persistant des pages HTML (SQLite, .cache/page-index.sqlite).
+
+Pour chaque page : title, meta description, canonical, og:url, robots
+(directives de toutes les balises robots, googlebot et bingbot), H1, blocs
+JSON-LD (et leurs @type), taille, nombre de mots et liens sortants.
+Les pages sont analysées une seule fois puis relues depuis l'index ; une page
+dont la taille ou la date de modification a changé est réanalysée à la volée.
+"""
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from . import REPO_ROOT
+
+INDEX_PATH = REPO_ROOT / '.cache' / 'page-index.sqlite'
+DEFAULT_DIRS = [REPO_ROOT / 'src' / 'pages']
+
+# À incrémenter quand extract_fields() change : l'index est alors reconstruit
+SCHEMA_VERSION = 3
+
+TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+DESCRIPTION_RE = re.compile(
+    r'<meta\s+name=["\']description["\'][^>]*content=["\']([^"\']*)["\']'
+    r'|<meta\s+content=["\']([^"\']*)["\'][^>]*name=["\']description["\']', re.IGNORECASE)
+CANONICAL_RE = re.compile(
+    r'<link[^>]*rel=["\']canonical["\'][^>]*href=["\']([^"\']+)["\']'
+    r'|<link[^>]*href=["\']([^"\']+)["\'][^>]*rel=["\']canonical["\']', re.IGNORECASE)
+OG_URL_RE = re.compile(r'<meta[^>]*property=["\']og:url["\'][^>]*content=["\']([^"\']+)["\']', re.IGNORECASE)
+# robots et variantes par moteur (googlebot, bingbot, ...) : toutes comptent pour noindex
+ROBOTS_RE = re.compile(
+    r'<meta\s+name=["\'](?:robots|googlebot|bingbot)["\'][^>]*content=["\']([^"\']*)["\']'
+    r'|<meta\s+content=["\']([^"\']*)["\'][^>]*name=["\'](?:robots|googlebot|bingbot)["\']', re.IGNORECASE)
+H1_RE = re.compile(r'<h1[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+JSONLD_RE = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+                       re.IGNORECASE | re.DOTALL)
+JSONLD_TYPE_RE = re.compile(r'"@type"\s*:\s*"([^"]+)"')
+FAQ_JSONLD_RE = re.compile(r'<script[^>]*type=["\']application\/ld\+json["\'][^>]*>[\s\S]*?"@type"\s*:\s*"FAQPage"[\s\S]*?<\/script>', re.I)
+FAQ_MICRODATA_RE = re.compile(r'itemscope[^>]*itemtype=["\']https?:\/\/schema\.org\/FAQPage["\']|itemtype=["\']https?:\/\/schema\.org\/FAQPage["\']', re.I)
+LINK_RE = re.compile(r'<a\b[^>]*?\bhref\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+INVISIBLE_RE = re.compile(r'<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>|<!--.*?-->',
+                          re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+')
+
+
+def _first_group(match: Optional[re.Match]) -> Optional[str]:
+    if not match:
+        return None
+    return next((g for g in match.groups() if g is not None), None)
+
+
+def _strip_tags(fragment: str) -> str:
+    return ' '.join(html.unescape(TAG_RE.sub(' ', fragment)).split())
+
+
+def visible_text(content: str) -> str:
+    """Texte visible d'une page (sans script/style/commentaires ni balises)"""
+    return _strip_tags(INVISIBLE_RE.sub(' ', content))
+
+
+def extract_fields(content: str) -> Dict:
+    """Extrait les champs indexés d'une page HTML"""
+    title = _first_group(TITLE_RE.search(content))
+    h1 = _first_group(H1_RE.search(content))
+    jsonld = [block.strip() for block in JSONLD_RE.findall(content)]
+    return {
+        # Texte brut entre les balises : chaque script décide s'il le normalise
+        'title': title,
+        'description': _first_group(DESCRIPTION_RE.search(content)),
+        'canonical': _first_group(CANONICAL_RE.search(content)),
+        'og_url': _first_group(OG_URL_RE.search(content)),
+        'robots': ', '.join(a or b for a, b in ROBOTS_RE.findall(content)) or None,
+        'h1': _strip_tags(h1) if h1 is not None else None,
+        'jsonld': jsonld,
+        'jsonld_types': [t for block in jsonld for t in JSONLD_TYPE_RE.findall(block)],
+        'word_count': len(WORD_RE.findall(visible_text(content))),
+        'links': LINK_RE.findall(content),
+    }
+
+
+def page_key(path) -> str:
+    """Clé d'une page : chemin relatif à la racine du dépôt (séparateurs /)"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def derived_path(path: Path, root: Path, prefix: str) -> str:
+    """URL servie (cleanUrls) : src/pages/apl/index.html -> /pages/apl ; public/scenarios/x.html -> /scenarios/x"""
+    rel = Path(path).relative_to(root).as_posix()[:-len('.html')]
+    if rel == 'index':
+        return prefix or '/'
+    if rel.endswith('/index'):
+        rel = rel[:-len('/index')]
+    return f'{prefix}/{rel}'
+
+
+_COLUMNS = ['path', 'sha256', 'size', 'mtime_ns', 'title', 'description', 'canonical',
+            'og_url', 'robots', 'h1', 'jsonld', 'jsonld_types', 'word_count']
+_JSON_COLUMNS = ('jsonld', 'jsonld_types')
+
+
+class PageIndex:
+    """
+    Accès à l'index des pages.
+
+        with PageIndex() as index:
+            index.refresh()                      # src/pages par défaut
+            page = index.get('src/pages/rsa.html')
+            page['title'], page['canonical'], page['links']
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or INDEX_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.parsed = 0
+        self._init_schema()
+
+    def _init_schema(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.conn.executescript('DROP TABLE IF EXISTS pages; DROP TABLE IF EXISTS links;')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                path TEXT PRIMARY KEY, sha256 TEXT, size INTEGER, mtime_ns INTEGER,
+                title TEXT, description TEXT, canonical TEXT, og_url TEXT, robots TEXT,
+                h1 TEXT, jsonld TEXT, jsonld_types TEXT, word_count INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                path TEXT, position INTEGER, href TEXT, PRIMARY KEY (path, position)
+            );
+            CREATE INDEX IF NOT EXISTS links_href ON links (href);
+        ''')
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _store(self, key: str, path: Path, st: os.stat_result):
+        content_bytes = path.read_bytes()
+        digest = hashlib.sha256(content_bytes).hexdigest()
+        row = self.conn.execute('SELECT sha256 FROM pages WHERE path = ?', (key,)).fetchone()
+        if row and row['sha256'] == digest:
+            self.conn.execute('UPDATE pages SET size = ?, mtime_ns = ? WHERE path = ?',
+                              (st.st_size, st.st_mtime_ns, key))
+            return
+        fields = extract_fields(content_bytes.decode('utf-8', errors='replace'))
+        values = [key, digest, st.st_size, st.st_mtime_ns] + [
+            json.dumps(fields[c], ensure_ascii=False) if c in _JSON_COLUMNS else fields[c]
+            for c in _COLUMNS[4:]
+        ]
+        self.conn.execute(f'INSERT OR REPLACE INTO pages ({", ".join(_COLUMNS)}) '
+                          f'VALUES ({", ".join("?" * len(_COLUMNS))})', values)
+        self.conn.execute('DELETE FROM links WHERE path = ?', (key,))
+        self.conn.executemany('INSERT INTO links (path, position, href) VALUES (?, ?, ?)',
+                              [(key, i, href) for i, href in enumerate(fields['links'])])
+        self.parsed += 1
+
+    def _ensure_fresh(self, path: Path) -> Optional[str]:
+        """Réanalyse la page si elle a changé ; retourne sa clé (None si absente)"""
+        key = page_key(path)
+        try:
+            st = path.stat()
+        except OSError:
+            self.conn.execute('DELETE FROM pages WHERE path = ?', (key,))
+            self.conn.execute('DELETE FROM links WHERE path = ?', (key,))
+            return None
+        row = self.conn.execute('SELECT size, mtime_ns FROM pages WHERE path = ?', (key,)).fetchone()
+        if not row or row['size'] != st.st_size or row['mtime_ns'] != st.st_mtime_ns:
+            self._store(key, path, st)
+        return key
+
+    def refresh(self, dirs: Optional[Iterable] = None) -> int:
+        """
+        Met à jour l'index pour tous les .html des dossiers (récursif) et retire
+        les pages supprimées. Retourne le nombre de pages réanalysées.
+        """
+        before = self.parsed
+        for directory in (dirs or DEFAULT_DIRS):
+            directory = Path(directory)
+            if not directory.is_absolute():
+                directory = Path.cwd() / directory
+            seen = {self._ensure_fresh(path) for path in directory.rglob('*.html')}
+            prefix = page_key(directory).rstrip('/') + '/'
+            stale = [row['path'] for row in self.conn.execute(
+                'SELECT path FROM pages WHERE substr(path, 1, ?) = ?', (len(prefix), prefix))
+                if row['path'] not in seen]
+            for key in stale:
+                self.conn.execute('DELETE FROM pages WHERE path = ?', (key,))
+                self.conn.execute('DELETE FROM links WHERE path = ?', (key,))
+        self.conn.commit()
+        return self.parsed - before
+
+    def _record(self, row: sqlite3.Row) -> Dict:
+        record = dict(row)
+        for column in _JSON_COLUMNS:
+            record[column] = json.loads(record[column]) if record[column] else []
+        record['links'] = [r['href'] for r in self.conn.execute(
+            'SELECT href FROM links WHERE path = ? ORDER BY position', (record['path'],))]
+        return record
+
+    def get(self, path) -> Optional[Dict]:
+        """Champs indexés d'une page (réanalysée si elle a changé), None si absente"""
+        key = self._ensure_fresh(Path(path))
+        if key is None:
+            return None
+        return self._record(self.conn.execute('SELECT * FROM pages WHERE path = ?', (key,)).fetchone())
+
+    def pages(self, prefix: str = '') -> List[Dict]:
+        """Toutes les pages indexées dont la clé commence par `prefix`, triées par chemin"""
+        rows = self.conn.execute('SELECT * FROM pages WHERE substr(path, 1, ?) = ? ORDER BY path',
+                                 (len(prefix), prefix)).fetchall()
+        return [self._record(row) for row in rows]
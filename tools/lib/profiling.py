@@ -0,0 +1,229 @@
+"""
+Instrumentation optionnelle des scripts d'audit et d'analyse.
+
+Désactivée par défaut : stage() retourne alors un contexte vide partagé et
+count() ne fait rien, le coût se limite à un test par appel. Elle s'active
+par la variable d'environnement LESCALCULATEURS_PROFILE (« 1 » ou chemin du
+profil) ou par l'option --profile des scripts (add_profile_argument).
+
+    from lib.profiling import count, stage
+
+    with stage('lecture'):
+        data = read(...)
+        count(files=1, bytes=len(data))
+
+Les étapes s'imbriquent ; pour chacune on relève nombre d'appels, temps
+écoulé et temps CPU, fichiers, octets et correspondances (count). En fin de
+script un tableau récapitulatif est affiché sur stderr (temps propre, débit
+en fichiers et Mo par seconde) et le profil est écrit au format « folded
+stacks » (une ligne « a;b;c microsecondes » par pile, temps propre), lisible
+par flamegraph.pl, speedscope ou inferno.
+
+Les analyses réparties par scan_files() sur un pool de processus renvoient
+leurs mesures avec leur résultat : elles sont rattachées à l'étape en cours
+du processus principal (leurs temps s'additionnent, ils peuvent dépasser le
+temps écoulé de l'étape parente).
+"""
+import atexit
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import REPO_ROOT
+
+ENV_VAR = 'LESCALCULATEURS_PROFILE'
+PROFILE_DIR = REPO_ROOT / 'reports'
+
+# Mesures d'une pile d'étapes : appels, écoulé, CPU, fichiers, octets, correspondances
+CALLS, WALL, CPU, FILES, BYTES, MATCHES = range(6)
+Key = Tuple[str, ...]
+
+_NULL = nullcontext()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'key', 'wall', 'cpu')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler.stack
+        stack.append(self.name)
+        self.key = tuple(stack)
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stats = self.profiler.entry(self.key)
+        stats[CALLS] += 1
+        stats[WALL] += wall
+        stats[CPU] += cpu
+        self.profiler.stack.pop()
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.output: Optional[Path] = None
+        self.stack: List[str] = []
+        self.stats: Dict[Key, List[float]] = {}
+        self.pid = os.getpid()
+        self._root: Optional[_Stage] = None
+
+    def entry(self, key: Key) -> List[float]:
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = [0, 0.0, 0.0, 0, 0, 0]
+        return stats
+
+    def enable(self, output=None):
+        """Active l'instrumentation pour ce processus et ses processus fils"""
+        os.environ[ENV_VAR] = str(output) if output else '1'
+        if self.enabled:
+            return
+        self.enabled = True
+        if multiprocessing.parent_process() is not None:
+            # Processus du pool : les mesures repartent avec les résultats
+            return
+        script = Path(sys.argv[0]).stem or 'python'
+        self.output = Path(output) if output else PROFILE_DIR / f'profile-{script}.folded'
+        self._root = _Stage(self, script)
+        self._root.__enter__()
+        atexit.register(self.finish)
+
+    def count(self, files: int = 0, bytes: int = 0, matches: int = 0):
+        stats = self.entry(tuple(self.stack))
+        stats[FILES] += files
+        stats[BYTES] += bytes
+        stats[MATCHES] += matches
+
+    def drain(self) -> Dict[Key, List[float]]:
+        """Mesures accumulées depuis le dernier appel (processus du pool)"""
+        if self.pid != os.getpid():
+            # Processus issu d'un fork : on ignore les mesures et la pile héritées du parent
+            self.pid = os.getpid()
+            self.stats = {}
+            self.stack = []
+        stats, self.stats = self.stats, {}
+        return stats
+
+    def merge(self, stats: Dict[Key, List[float]]):
+        """Rattache des mesures d'un autre processus à l'étape en cours"""
+        prefix = tuple(self.stack)
+        for key, values in stats.items():
+            target = self.entry(prefix + key)
+            for i, value in enumerate(values):
+                target[i] += value
+
+    def finish(self):
+        if self._root is None or self.pid != os.getpid():
+            return
+        root, self._root = self._root, None
+        while len(self.stack) > 1:
+            self.stack.pop()
+        root.__exit__(None, None, None)
+        try:
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.output, 'w', encoding='utf-8') as f:
+                f.write(folded(self.stats))
+        except OSError as e:
+            print(f'⚠️  Profil non écrit ({self.output}) : {e}', file=sys.stderr)
+            return
+        print(summary(self.stats), file=sys.stderr)
+        print(f'🔥 Profil (folded stacks) : {self.output}', file=sys.stderr)
+
+
+PROFILER = Profiler()
+
+
+def stage(name: str):
+    """Contexte mesurant une étape (contexte vide si l'instrumentation est désactivée)"""
+    if not PROFILER.enabled:
+        return _NULL
+    return _Stage(PROFILER, name)
+
+
+def count(files: int = 0, bytes: int = 0, matches: int = 0):
+    """Ajoute fichiers, octets ou correspondances à l'étape en cours"""
+    if PROFILER.enabled:
+        PROFILER.count(files, bytes, matches)
+
+
+def enabled() -> bool:
+    return PROFILER.enabled
+
+
+def add_profile_argument(parser):
+    """Option --profile [FICHIER] commune aux scripts"""
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FICHIER',
+                        help=f"mesure le temps par étape et écrit un profil folded stacks "
+                             f"(défaut : reports/profile-<script>.folded ; aussi via {ENV_VAR})")
+
+
+def enable_from_args(args):
+    if getattr(args, 'profile', None) is not None:
+        PROFILER.enable(args.profile or None)
+
+
+def _self_times(stats: Dict[Key, List[float]]) -> Dict[Key, float]:
+    own = {key: values[WALL] for key, values in stats.items()}
+    for key, values in stats.items():
+        if len(key) > 1 and key[:-1] in own:
+            own[key[:-1]] -= values[WALL]
+    return {key: max(value, 0.0) for key, value in own.items()}
+
+
+def folded(stats: Dict[Key, List[float]]) -> str:
+    """Profil « folded stacks » : temps propre de chaque pile en microsecondes"""
+    lines = []
+    for key, value in _self_times(stats).items():
+        micros = int(value * 1e6)
+        if micros:
+            frames = ';'.join(name.replace(';', ',').replace('\n', ' ') for name in key)
+            lines.append(f'{frames} {micros}')
+    return '\n'.join(lines) + '\n'
+
+
+def summary(stats: Dict[Key, List[float]]) -> str:
+    """Tableau des étapes (arborescence) : temps, débit, correspondances"""
+    own = _self_times(stats)
+    totals: Dict[Key, List[float]] = {}
+    for key, values in stats.items():
+        # Fichiers, octets et correspondances cumulés sur la sous-arborescence
+        for depth in range(1, len(key) + 1):
+            total = totals.setdefault(key[:depth], [0, 0, 0])
+            total[0] += values[FILES]
+            total[1] += values[BYTES]
+            total[2] += values[MATCHES]
+    lines = [f"{'étape':44s} {'appels':>7s} {'total':>8s} {'propre':>8s} {'CPU':>8s} "
+             f"{'fichiers':>8s} {'fich./s':>8s} {'Mo/s':>7s} {'corresp.':>8s}"]
+
+    def walk(prefix: Key):
+        children = [key for key in stats if len(key) == len(prefix) + 1 and key[:len(prefix)] == prefix]
+        for key in sorted(children, key=lambda k: -stats[k][WALL]):
+            values = stats[key]
+            files, size, matches = totals[key]
+            wall = values[WALL]
+            label = ('  ' * (len(key) - 1) + key[-1])[:44]
+            rate = f'{files / wall:8.0f}' if files and wall else f"{'':8s}"
+            throughput = f'{size / 1e6 / wall:7.1f}' if size and wall else f"{'':7s}"
+            lines.append(f'{label:44s} {int(values[CALLS]):7d} {wall:7.3f}s {own[key]:7.3f}s {values[CPU]:7.3f}s '
+                         f"{int(files) or '':>8} {rate} {throughput} {int(matches) or '':>8}")
+            walk(key)
+
+    walk(())
+    return '\n'.join(lines)
+
+
+if os.environ.get(ENV_VAR, '') not in ('', '0'):
+    PROFILER.enable(None if os.environ[ENV_VAR] == '1' else os.environ[ENV_VAR])
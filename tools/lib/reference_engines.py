@@ -0,0 +1,216 @@
+"""
+Moteurs de calcul de référence, vectorisés (NumPy).
+
+Réplique fidèle de src/utils/rsaCalculEngine.ts, aplCalculEngine.ts et
+irCalculEngine.ts, appliquée à des lots d'entrées d'un seul coup : chaque
+champ d'entrée est un tableau (une case par scénario) et chaque formule est
+évaluée une seule fois pour tout le lot. Les constantes viennent des mêmes
+sources que le site (social-baremes.ts, baremeIR2026), lues par
+lib.ts_constants ; les arrondis suivent la sémantique JS (Math.round vers
++infini sur les demis, Math.floor).
+
+Sert d'oracle pour vérifier les montants affichés par les pages pSEO après un
+changement de barème. `prime_activite` reprend de même le moteur embarqué dans
+scenario-engine/generate-pages.cjs (barèmes de scenario-engine/data/scenarios.json).
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from . import REPO_ROOT
+from .ts_constants import evaluate_file, load_constants
+
+SOCIAL_BAREMES_TS = REPO_ROOT / 'src' / 'data' / 'social-baremes.ts'
+IR_ENGINE_TS = REPO_ROOT / 'src' / 'utils' / 'irCalculEngine.ts'
+
+
+def js_round(values: np.ndarray) -> np.ndarray:
+    """Math.round élément par élément"""
+    return np.floor(values + 0.5)
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """Math.round(x * 100) / 100"""
+    return js_round(values * 100) / 100
+
+
+def column(inputs: Sequence[Dict], key: str, default=0) -> np.ndarray:
+    """Champ numérique d'une liste d'entrées ; valeurs absentes ou non numériques -> default (`|| 0`)"""
+    values = []
+    for item in inputs:
+        value = item.get(key)
+        values.append(value if isinstance(value, (int, float)) and not isinstance(value, bool) else default)
+    return np.asarray(values, dtype=np.float64)
+
+
+def labels(inputs: Sequence[Dict], key: str) -> np.ndarray:
+    """Champ texte d'une liste d'entrées (chaîne vide si absent)"""
+    return np.asarray([str(item.get(key) or '') for item in inputs], dtype=object)
+
+
+def prime_activite(b: Dict, situation: np.ndarray, enfants: np.ndarray, revenus_prof: np.ndarray,
+                   logement: np.ndarray, autres_revenus=0.0) -> Dict[str, np.ndarray]:
+    """
+    calculerPrime de scenario-engine/generate-pages.cjs sur des tableaux
+    diffusables entre eux (`b` = bloc « barèmes » de scenarios.json)
+    """
+    situation = np.asarray(situation, dtype=object)
+    logement = np.asarray(logement, dtype=object)
+    revenus_prof = np.asarray(revenus_prof, dtype=np.float64)
+    n = np.maximum(0, np.floor(np.asarray(enfants, dtype=np.float64)))
+    nf = b['montantForfaitaire']['nonMajoree']
+    mf = b['montantForfaitaire']['majoree']
+    monoparental = np.select(
+        [n <= 0, n == 1, n == 2, n == 3],
+        [nf['unePersonne'], mf['isole1Enfant'], mf['isole2Enfants'], mf['isole3Enfants']],
+        mf['isole4Enfants'] + (n - 4) * mf['personneSupplementaire'])
+    couple = np.select(
+        [n <= 0, n == 1, n == 2, n == 3],
+        [nf['coupleOuIsole1Enfant'], nf['couple1EnfantOuIsole2Enfants'], nf['couple2Enfants'], nf['couple3Enfants']],
+        nf['couple3Enfants'] + (n - 3) * nf['personneSupplementaire'])
+    seul = np.select(
+        [n <= 0, n == 1, n == 2, n == 3],
+        [nf['unePersonne'], nf['coupleOuIsole1Enfant'], nf['couple1EnfantOuIsole2Enfants'], nf['isole3Enfants']],
+        nf['isole3Enfants'] + (n - 3) * nf['personneSupplementaire'])
+    montant_base = np.where(situation == 'monoparental', monoparental,
+                            np.where(situation == 'couple', couple, seul))
+
+    bo = b['bonification']
+    r = np.maximum(0, revenus_prof)
+    progression = _round2(bo['montantMaximum'] * ((r - bo['seuilDebut']) / (bo['seuilMaximum'] - bo['seuilDebut'])))
+    bonification = np.select([r < bo['seuilDebut'], r >= bo['seuilMaximum']],
+                             [0.0, bo['montantMaximum']], progression)
+
+    foyer = np.where(situation == 'couple', 2, 1) + n
+    fl = b['forfaitLogement']
+    forfait = np.select([foyer <= 1, foyer == 2],
+                        [fl['unePersonne'], fl['deuxPersonnes']], fl['troisPersonnesOuPlus'])
+    forfait = np.where(logement == 'loue', 0.0, forfait)
+
+    rpc = revenus_prof * b['revenusProfessionnelsPrisEnCompte']
+    total = revenus_prof + np.maximum(0, autres_revenus) + forfait
+    montant = np.maximum(0, _round2(montant_base + bonification + rpc - total))
+    valid = (situation != '') & (logement != '') & (revenus_prof > 0)
+    return {
+        'montantEstime': np.where(valid, montant, 0.0),
+        'montantBase': np.where(valid, montant_base, 0.0),
+        'bonification': np.where(valid, bonification, 0.0),
+    }
+
+
+class ReferenceEngines:
+    """Constantes chargées une fois, formules appliquées par lots"""
+
+    def __init__(self, baremes: Dict = None, ir_bareme: List[Dict] = None):
+        flat = baremes if baremes is not None else load_constants(SOCIAL_BAREMES_TS)
+        self.b = {key[len('socialBaremes.'):]: value for key, value in flat.items()
+                  if key.startswith('socialBaremes.')}
+        if ir_bareme is None:
+            ir_bareme = evaluate_file(str(IR_ENGINE_TS))['baremeIR2026']
+        self.ir_plafonds = np.asarray([t['plafond'] for t in ir_bareme], dtype=np.float64)
+        self.ir_taux = np.asarray([t['taux'] for t in ir_bareme], dtype=np.float64)
+
+    # -- RSA (rsaCalculEngine.calculerRSA) ------------------------------------
+    def rsa(self, inputs: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        b = self.b
+        situation = labels(inputs, 'situation')
+        logement = labels(inputs, 'logement')
+        activite = labels(inputs, 'activite')
+        enfants = np.maximum(0, np.floor(column(inputs, 'enfants')))
+        revenus = column(inputs, 'revenus')
+        valid = (situation != '') & (logement != '') & (activite != '')
+
+        c = 'rsa.coefficientsFoyer.'
+        supp = (enfants - 2) * b[c + 'personneSupplementaire']
+        couple = situation == 'couple'
+        coefficient = np.where(
+            couple,
+            np.select([enfants <= 0, enfants == 1],
+                      [b[c + 'coupleOuSeulAvec1Enfant'], b[c + 'coupleAvec1OuSeulAvec2Enfants']],
+                      b[c + 'coupleAvec2Enfants'] + supp),
+            np.select([enfants <= 0, enfants == 1],
+                      [b[c + 'seulSansEnfant'], b[c + 'coupleOuSeulAvec1Enfant']],
+                      b[c + 'coupleAvec1OuSeulAvec2Enfants'] + supp))
+        montant_base = _round2(b['rsa.montantForfaitaireBase'] * coefficient)
+
+        foyer = np.where(couple, 2, 1) + enfants
+        f = 'rsa.forfaitLogement.'
+        forfait = np.select([foyer <= 1, foyer == 2],
+                            [b[f + 'unePersonne'], b[f + 'deuxPersonnes']], b[f + 'troisPersonnesOuPlus'])
+        forfait = np.where((logement == 'loue') | (logement == 'sans-abri'), 0.0, forfait)
+
+        revenus_pris = np.where(activite == 'actif',
+                                _round2(revenus * b['rsa.revenusActivitePrisEnCompte']),
+                                np.maximum(0, _round2(revenus)))
+        montant = np.maximum(0, _round2(montant_base - revenus_pris - forfait))
+        return {
+            'montantEstime': np.where(valid, montant, 0.0),
+            'montantBase': np.where(valid, montant_base, 0.0),
+            'forfaitLogement': np.where(valid, forfait, 0.0),
+            'revenusPris': np.where(valid, revenus_pris, 0.0),
+            'valid': valid,
+        }
+
+    # -- APL (aplCalculEngine.calculerAPL) ------------------------------------
+    def apl(self, inputs: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        b = self.b
+        situation = labels(inputs, 'situation')
+        region = labels(inputs, 'region')
+        enfants_saisis = column(inputs, 'enfants', np.nan)
+        enfants = np.maximum(0, np.floor(np.nan_to_num(enfants_saisis)))
+        revenus = column(inputs, 'revenus_mensuels', np.nan)
+        loyer = column(inputs, 'loyer_mensuel', np.nan)
+        valid = ((situation != '') & (region != '') & ~np.isnan(enfants_saisis)
+                 & ~np.isnan(revenus) & ~np.isnan(loyer) & (revenus >= 0) & (loyer >= 0))
+
+        zones = {'idf': 'zone1', 'province': 'zone2', 'dom': 'zone3'}
+        base_province = b['apl.plafondsLoyer.zone2.seul']
+        plafond_loyer = np.asarray([b.get(f'apl.plafondsLoyer.{zones[r]}.seul', base_province)
+                                    if r in zones else base_province for r in region], dtype=np.float64)
+        plafond_loyer += np.where(situation == 'couple', b['apl.moteur.bonusLoyerCouple'], 0)
+        plafond_loyer += enfants * b['apl.moteur.bonusLoyerParEnfant']
+        loyer_pris = np.minimum(loyer, plafond_loyer)
+
+        forfait = np.asarray([b.get(f'apl.moteur.forfaitLogement.{s}') or b['apl.moteur.forfaitLogement.seul']
+                              for s in situation], dtype=np.float64)
+        participation = np.maximum(b['apl.moteur.participationMinimum'],
+                                   revenus * b['apl.moteur.tauxParticipation'] - forfait)
+        apl_brute = np.where(participation >= loyer_pris, 0.0, loyer_pris - participation)
+        apl_brute = np.maximum(0, apl_brute)
+
+        base_apl = np.asarray([b.get(f'apl.moteur.plafondAplBase.{s}', np.nan) for s in situation],
+                              dtype=np.float64)
+        plafond_apl = np.minimum(base_apl + np.minimum(enfants, 3) * b['apl.moteur.bonusPlafondAplParEnfant'],
+                                 b['apl.moteur.plafondAplAbsolu'])
+        apl = np.floor(np.minimum(apl_brute, plafond_apl))
+        return {
+            'apl_estimee': np.where(valid, apl, np.nan),
+            'apl_brute': np.where(valid, np.floor(apl_brute), np.nan),
+            'participation': np.where(valid, js_round(participation), np.nan),
+            'plafond_loyer': plafond_loyer,
+            'valid': valid,
+        }
+
+    # -- Impôt sur le revenu (irCalculEngine.calculerIR) ----------------------
+    def ir(self, inputs: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        revenu = column(inputs, 'revenu', np.nan)
+        parts = column(inputs, 'parts', np.nan)
+        valid = np.isfinite(revenu) & (revenu >= 0) & np.isfinite(parts) & (parts > 0)
+        qf = np.where(valid, revenu / np.where(valid, parts, 1), 0.0)
+
+        # Une colonne par tranche ; au-delà de la tranche du QF la base est nulle,
+        # ce qui équivaut au `break` du moteur TS
+        previous = np.concatenate(([0.0], self.ir_plafonds[:-1]))
+        bases = np.maximum(0, np.minimum(qf[:, None], self.ir_plafonds[None, :]) - previous[None, :])
+        impot_par_part = np.zeros(len(qf))
+        for k in range(len(self.ir_taux)):
+            impot_par_part = impot_par_part + bases[:, k] * self.ir_taux[k]
+        ir_brut = impot_par_part * parts
+        marginal_index = np.minimum(np.searchsorted(self.ir_plafonds, qf, side='left'), len(self.ir_taux) - 1)
+        return {
+            'irBrut': np.where(valid, ir_brut, np.nan),
+            'tauxMoyen': np.where(valid & (revenu > 0), ir_brut / np.where(revenu > 0, revenu, 1), 0.0),
+            'tauxMarginal': self.ir_taux[marginal_index],
+            'mensualiteMoyenne': np.where(valid, ir_brut / 12, np.nan),
+            'valid': valid,
+        }
@@ -0,0 +1,349 @@
+"""
+Règles par expressions régulières avec comptabilité du coût de chaque motif.
+
+Un RuleRunner compile ses motifs une seule fois par processus et mesure,
+pour chaque règle, le nombre d'appels, le temps passé, les caractères
+parcourus, les correspondances et l'appel le plus lent. Les mesures des
+processus du pool de scan_files() sont rapatriées avec les résultats ;
+cost_report() classe ensuite les règles les plus coûteuses.
+
+À la compilation, chaque motif est analysé (arbre de re._parser) pour
+signaler les risques de retour arrière catastrophique :
+  - quantificateurs imbriqués, « (a+)+ » (exponentiel) ;
+  - alternance répétée dont les branches commencent pareil, « (\\wb|ab)* »
+    (exponentiel) ;
+  - quantificateurs adjacents sur des caractères communs, « \\d+\\d* »
+    (polynomial) ;
+  - joker non borné au milieu du motif, « taxe.*foncière » : chaque début
+    possible relit la fin de la ligne (quadratique par ligne).
+
+Un motif qui commence par « \\b » suivi de caractères littéraux (« \\b610 é\\b »)
+empêche le moteur de chercher directement son préfixe : il est compilé sous
+la forme équivalente « 610(?<!\\w610) é\\b », des dizaines de fois plus rapide.
+"""
+import json
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from .profiling import PROFILER, stage
+from .scan import register_worker_stats
+
+# Mesures d'une règle : appels, secondes, caractères, correspondances, appel le plus lent
+CALLS, SECONDS, CHARS, MATCHES, SLOWEST = range(5)
+
+_RUNNERS: Dict[str, 'RuleRunner'] = {}
+_PID = os.getpid()
+
+_LEADING_WORD_LITERAL = re.compile(r'\\b(\w+)(?![*+?{\w])')
+_DIGITS = frozenset(map(ord, '0123456789'))
+_SPACES = frozenset(map(ord, ' \t\n\r\f\v'))
+
+
+class RegexRule:
+    """Motif compilé d'un RuleRunner"""
+
+    def __init__(self, index: int, pattern: str, label: str, flags: int = 0):
+        self.index = index
+        self.pattern = pattern
+        self.label = label
+        self.flags = flags
+        self.risks = backtracking_risks(pattern, flags)
+        self.compiled_pattern = hoist_literal_prefix(pattern, flags)
+        self.regex = re.compile(self.compiled_pattern, flags)
+
+
+class RuleRunner:
+    """
+    Jeu de règles nommé (le nom identifie ses mesures entre processus).
+
+        MONTANTS = RuleRunner('montants', [(motif, libellé), ...], re.IGNORECASE)
+        for rule in MONTANTS:
+            matches = MONTANTS.findall(rule, text)
+    """
+
+    def __init__(self, name: str, rules: Sequence[Tuple[str, str]], flags: int = 0):
+        self.name = name
+        self.rules = [RegexRule(i, pattern, label, flags) for i, (pattern, label) in enumerate(rules)]
+        self.stats = [[0, 0.0, 0, 0, 0.0] for _ in self.rules]
+        _RUNNERS[name] = self
+
+    def __iter__(self) -> Iterator[RegexRule]:
+        return iter(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _account(self, rule: RegexRule, seconds: float, chars: int, matches: int):
+        stats = self.stats[rule.index]
+        stats[CALLS] += 1
+        stats[SECONDS] += seconds
+        stats[CHARS] += chars
+        stats[MATCHES] += matches
+        if seconds > stats[SLOWEST]:
+            stats[SLOWEST] = seconds
+
+    def findall(self, rule: RegexRule, text: str) -> list:
+        with stage(f'règle {rule.label}'):
+            start = time.perf_counter()
+            matches = rule.regex.findall(text)
+            self._account(rule, time.perf_counter() - start, len(text), len(matches))
+            if PROFILER.enabled:
+                PROFILER.count(matches=len(matches))
+        return matches
+
+    def search(self, rule: RegexRule, text: str) -> Optional[re.Match]:
+        with stage(f'règle {rule.label}'):
+            start = time.perf_counter()
+            match = rule.regex.search(text)
+            self._account(rule, time.perf_counter() - start, len(text), match is not None)
+        return match
+
+    def reset(self):
+        self.stats = [[0, 0.0, 0, 0, 0.0] for _ in self.rules]
+
+
+def drain_costs() -> Dict[str, List[List[float]]]:
+    """Mesures accumulées depuis le dernier appel, par jeu de règles (processus du pool)"""
+    global _PID
+    if _PID != os.getpid():
+        # Processus issu d'un fork : on ignore les mesures héritées du parent
+        _PID = os.getpid()
+        for runner in _RUNNERS.values():
+            runner.reset()
+    costs = {name: runner.stats for name, runner in _RUNNERS.items() if any(s[CALLS] for s in runner.stats)}
+    for name in costs:
+        _RUNNERS[name].reset()
+    return costs
+
+
+def merge_costs(costs: Dict[str, List[List[float]]]):
+    for name, rules in costs.items():
+        runner = _RUNNERS.get(name)
+        if runner is None:
+            continue
+        for stats, other in zip(runner.stats, rules):
+            for i in (CALLS, SECONDS, CHARS, MATCHES):
+                stats[i] += other[i]
+            stats[SLOWEST] = max(stats[SLOWEST], other[SLOWEST])
+
+
+register_worker_stats(drain_costs, merge_costs)
+
+
+# ============================================================
+# ANALYSE STATIQUE DES MOTIFS
+# ============================================================
+def hoist_literal_prefix(pattern: str, flags: int = 0) -> str:
+    """« \\bABC reste » -> « ABC(?<!\\wABC) reste » (même langage, préfixe littéral visible)"""
+    match = _LEADING_WORD_LITERAL.match(pattern)
+    if not match or flags & re.VERBOSE:
+        return pattern
+    literal = match.group(1)
+    if not re.fullmatch(r'\w+', literal, flags & re.ASCII):
+        return pattern
+    return f'{literal}(?<!\\w{literal}){pattern[match.end():]}'
+
+
+def _is_unbounded(op, av) -> bool:
+    return op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[1] == sre_parse.MAXREPEAT
+
+
+def _chars(items, ignore_case: bool) -> Optional[frozenset]:
+    """Caractères qu'une sous-expression peut consommer (None = presque tous)"""
+    found = set()
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            found.add(av)
+        elif op is sre_parse.IN:
+            for kind, value in av:
+                if kind is sre_parse.LITERAL:
+                    found.add(value)
+                elif kind is sre_parse.RANGE and value[1] - value[0] < 256:
+                    found.update(range(value[0], value[1] + 1))
+                elif kind is sre_parse.CATEGORY and value is sre_parse.CATEGORY_DIGIT:
+                    found.update(_DIGITS)
+                elif kind is sre_parse.CATEGORY and value is sre_parse.CATEGORY_SPACE:
+                    found.update(_SPACES)
+                else:
+                    return None
+        elif op is sre_parse.SUBPATTERN:
+            sub = _chars(av[-1], ignore_case)
+            if sub is None:
+                return None
+            found |= sub
+        elif op is sre_parse.BRANCH:
+            for branch in av[1]:
+                sub = _chars(branch, ignore_case)
+                if sub is None:
+                    return None
+                found |= sub
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            sub = _chars(av[2], ignore_case)
+            if sub is None:
+                return None
+            found |= sub
+        elif op in (sre_parse.ANY, sre_parse.NOT_LITERAL, sre_parse.GROUPREF, sre_parse.CATEGORY):
+            return None
+    if ignore_case:
+        found |= {ord(c) for code in found for c in (chr(code).lower(), chr(code).upper()) if len(c) == 1}
+    return frozenset(found)
+
+
+def _first_chars(items, ignore_case: bool) -> Optional[frozenset]:
+    """Caractères par lesquels une séquence peut commencer"""
+    found = set()
+    for op, av in items:
+        if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            continue
+        if op is sre_parse.SUBPATTERN:
+            chars = _first_chars(av[-1], ignore_case)
+        elif op is sre_parse.BRANCH:
+            chars = frozenset()
+            for branch in av[1]:
+                sub = _first_chars(branch, ignore_case)
+                if sub is None:
+                    return None
+                chars |= sub
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            chars = _first_chars(av[2], ignore_case)
+        else:
+            chars = _chars([(op, av)], ignore_case)
+        if chars is None:
+            return None
+        found |= chars
+        if not (op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] == 0):
+            break
+    return frozenset(found)
+
+
+def _overlap(a: Optional[frozenset], b: Optional[frozenset]) -> bool:
+    return a is None or b is None or bool(a & b)
+
+
+def _contains_repeat(items) -> bool:
+    for op, av in items:
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[1] > 1:
+            return True
+        if op is sre_parse.SUBPATTERN and _contains_repeat(av[-1]):
+            return True
+        if op is sre_parse.BRANCH and any(_contains_repeat(branch) for branch in av[1]):
+            return True
+    return False
+
+
+def _ambiguous_branch(items, ignore_case: bool) -> bool:
+    for op, av in items:
+        if op is sre_parse.SUBPATTERN and _ambiguous_branch(av[-1], ignore_case):
+            return True
+        if op is sre_parse.BRANCH:
+            firsts = [_first_chars(branch, ignore_case) for branch in av[1]]
+            for i, first in enumerate(firsts):
+                if any(_overlap(first, other) for other in firsts[i + 1:]):
+                    return True
+    return False
+
+
+def _is_wildcard(items) -> bool:
+    return len(items) == 1 and items[0][0] is sre_parse.ANY
+
+
+def _walk(items, ignore_case: bool, risks: List[str], before: bool, after: bool):
+    """`before`/`after` : le motif englobant consomme quelque chose avant/après `items`"""
+    previous = None
+    for position, (op, av) in enumerate(items):
+        has_before = before or position > 0
+        has_after = after or position < len(items) - 1
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            body = av[2]
+            if _is_unbounded(op, av):
+                if _contains_repeat(body):
+                    risks.append('exponentiel : quantificateurs imbriqués')
+                elif _ambiguous_branch(body, ignore_case):
+                    risks.append('exponentiel : alternance répétée à branches ambiguës')
+                if previous is not None and _overlap(previous, _chars(body, ignore_case)):
+                    risks.append('polynomial : quantificateurs adjacents sur des caractères communs')
+                if has_before and has_after and _is_wildcard(body):
+                    risks.append('quadratique par ligne : joker non borné au milieu du motif')
+                previous = _chars(body, ignore_case)
+            else:
+                previous = None
+            _walk(body, ignore_case, risks, has_before, has_after)
+        elif op is sre_parse.SUBPATTERN:
+            _walk(av[-1], ignore_case, risks, has_before, has_after)
+            previous = None
+        elif op is sre_parse.BRANCH:
+            for branch in av[1]:
+                _walk(branch, ignore_case, risks, has_before, has_after)
+            previous = None
+        elif op is not sre_parse.AT:
+            previous = None
+
+
+def backtracking_risks(pattern: str, flags: int = 0) -> List[str]:
+    """Risques de retour arrière catastrophique relevés dans le motif (sans doublons)"""
+    risks: List[str] = []
+    _walk(list(sre_parse.parse(pattern, flags)), bool(flags & re.IGNORECASE), risks, False, False)
+    return list(dict.fromkeys(risks))
+
+
+# ============================================================
+# RAPPORT
+# ============================================================
+def cost_rows(runners: Optional[Sequence[RuleRunner]] = None) -> List[Dict]:
+    """Règles mesurées, de la plus coûteuse à la moins coûteuse"""
+    rows = []
+    for runner in runners or _RUNNERS.values():
+        for rule, stats in zip(runner.rules, runner.stats):
+            if not stats[CALLS]:
+                continue
+            rows.append({
+                'runner': runner.name,
+                'rule': rule.label,
+                'pattern': rule.pattern,
+                'compiled': rule.compiled_pattern if rule.compiled_pattern != rule.pattern else None,
+                'calls': stats[CALLS],
+                'seconds': round(stats[SECONDS], 6),
+                'mb_per_s': round(stats[CHARS] / 1e6 / stats[SECONDS], 1) if stats[SECONDS] else None,
+                'matches': stats[MATCHES],
+                'slowest_ms': round(stats[SLOWEST] * 1000, 3),
+                'risks': rule.risks,
+            })
+    rows.sort(key=lambda row: -row['seconds'])
+    return rows
+
+
+def cost_report(runners: Optional[Sequence[RuleRunner]] = None, limit: int = 5) -> str:
+    """Tableau des règles les plus coûteuses (vide si aucune n'a été évaluée)"""
+    rows = cost_rows(runners)
+    if not rows:
+        return ''
+    total = sum(row['seconds'] for row in rows)
+    lines = [f"Règles les plus coûteuses ({len(rows)} mesurées, {total:.3f} s au total) :",
+             f"  {'règle':38s} {'temps':>8s} {'part':>5s} {'Mo/s':>7s} {'max ms':>7s} {'corresp.':>8s}"]
+    for row in rows[:limit]:
+        label = f"{row['runner']}/{row['rule']}"[:38]
+        share = row['seconds'] / total * 100 if total else 0
+        speed = f"{row['mb_per_s']:7.1f}" if row['mb_per_s'] else f"{'':7s}"
+        lines.append(f"  {label:38s} {row['seconds']:7.3f}s {share:4.0f}% {speed} "
+                     f"{row['slowest_ms']:7.2f} {row['matches']:8d}")
+    # Risques relevés à la compilation, que la règle ait été évaluée ou non
+    for runner in runners or _RUNNERS.values():
+        for rule in runner.rules:
+            if rule.risks:
+                lines.append(f"  ⚠️  {runner.name}/{rule.label} ({rule.pattern}) : {'; '.join(rule.risks)}")
+    return '\n'.join(lines)
+
+
+def write_cost_report(path, runners: Optional[Sequence[RuleRunner]] = None):
+    """Classement complet au format JSON"""
+    path = str(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'rules': cost_rows(runners)}, f, ensure_ascii=False, indent=2)
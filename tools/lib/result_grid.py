@@ -0,0 +1,167 @@
+"""
+Grilles de résultats précalculées (.cache/grids/).
+
+Pour un calculateur de scenario-engine/data/scenarios.json, la grille est le
+produit cartésien complet situation × enfants × revenu × logement, évalué en
+un seul passage vectorisé. Elle est stockée en deux fichiers :
+
+    <calculateur>.json  en-tête : axes, champs, barèmes utilisés, champs fixés
+    <calculateur>.bin   int32 little-endian, montants en centimes, ordre C,
+                        forme = tailles des axes + [nombre de champs]
+
+Le binaire se lit tel quel depuis Node (Int32Array sur le Buffer) comme depuis
+Python (numpy.fromfile). Les barèmes sont recopiés dans l'en-tête : une grille
+dont les barèmes ne correspondent plus à scenarios.json est périmée. De même
+pour le code des moteurs : l'en-tête porte l'empreinte (engine_digest) du
+texte des fonctions de calcul JS et Python ; generate-pages.cjs la recalcule
+avec la même règle et ignore une grille construite avec un autre moteur.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import REPO_ROOT
+
+GRID_DIR = REPO_ROOT / '.cache' / 'grids'
+SCENARIOS_JSON = REPO_ROOT / 'scenario-engine' / 'data' / 'scenarios.json'
+GENERATOR_JS = REPO_ROOT / 'scenario-engine' / 'generate-pages.cjs'
+REFERENCE_PY = REPO_ROOT / 'tools' / 'lib' / 'reference_engines.py'
+
+# Fonctions dont dépendent les montants d'une grille, par calculateur.
+# À garder identique à ENGINE_SOURCES de generate-pages.cjs.
+ENGINE_SOURCES = {
+    'prime-activite': [
+        (GENERATOR_JS, ['getPrimeForfait', 'getHousingForfait', 'getBonification', 'calculerPrime']),
+        (REFERENCE_PY, ['js_round', '_round2', 'prime_activite']),
+    ],
+}
+
+# À incrémenter quand le format change
+GRID_VERSION = 1
+
+AXES = ('situation', 'enfants', 'revenusProf', 'logement')
+
+
+def apply_override(value: float, override) -> float:
+    """applyOverrides de generate-pages.cjs pour un champ numérique (« +100 », « *0.8 »)"""
+    if isinstance(override, str) and override.startswith('+'):
+        return value + float(override[1:])
+    if isinstance(override, str) and override.startswith('*'):
+        return float(np.floor(value * float(override[1:]) + 0.5))
+    return override
+
+
+def grid_axes(aide: Dict) -> Dict[str, list]:
+    """
+    Valeurs de chaque axe : options des listes, min..max des nombres, et pour
+    le revenu les revenuLevels complétés des revenus atteints par les
+    scénarios (« +100 », « *0.8 », ...), pour que chaque page soit couverte
+    """
+    fields = {f['id']: f for f in aide['fields']}
+    levels = aide.get('revenuLevels') or [fields['revenusProf']['default']]
+    revenus = set(float(r) for r in levels)
+    enfants = set(range(int(fields['enfants'].get('min', 0)), int(fields['enfants'].get('max', 10)) + 1))
+    for scenario in aide.get('scenarios', []):
+        overrides = scenario.get('overrides', {})
+        if 'revenusProf' in overrides:
+            revenus.update(float(apply_override(r, overrides['revenusProf'])) for r in levels)
+        if 'enfants' in overrides:
+            value = apply_override(float(fields['enfants']['default']), overrides['enfants'])
+            enfants.add(int(value))
+    return {
+        'situation': list(fields['situation']['options']),
+        'enfants': sorted(enfants),
+        'revenusProf': [int(r) if r.is_integer() else r for r in sorted(revenus)],
+        'logement': list(fields['logement']['options']),
+    }
+
+
+def fixed_fields(aide: Dict) -> Dict:
+    """Champs hors axes, fixés à leur valeur par défaut dans la grille"""
+    return {f['id']: f.get('default') for f in aide['fields'] if f['id'] not in AXES}
+
+
+def mesh(axes: Dict[str, list]) -> Tuple[np.ndarray, ...]:
+    """Tableaux diffusables (un axe par dimension) pour évaluer toute la grille d'un coup"""
+    arrays = []
+    for dim, name in enumerate(AXES):
+        shape = [1] * len(AXES)
+        shape[dim] = len(axes[name])
+        dtype = object if name in ('situation', 'logement') else np.float64
+        arrays.append(np.asarray(axes[name], dtype=dtype).reshape(shape))
+    return tuple(arrays)
+
+
+def function_source(text: str, name: str) -> str:
+    """
+    Texte d'une fonction de premier niveau (« function name( » ou « def name( ») :
+    de sa première ligne jusqu'à la prochaine ligne non indentée qui ne ferme
+    pas un bloc (« } », « ) »), lignes vides finales retirées. Même règle que
+    functionSource() dans generate-pages.cjs.
+    """
+    lines = text.split('\n')
+    starts = (f'function {name}(', f'def {name}(')
+    start = next((i for i, line in enumerate(lines) if line.startswith(starts)), None)
+    if start is None:
+        return ''
+    block = [lines[start]]
+    for line in lines[start + 1:]:
+        if line and not line[0].isspace() and line[0] not in '})':
+            break
+        block.append(line)
+    while block and not block[-1].strip():
+        block.pop()
+    return '\n'.join(block)
+
+
+def engine_digest(name: str) -> str:
+    """Empreinte du code des moteurs (JS et Python) d'un calculateur"""
+    h = hashlib.sha256()
+    for path, functions in ENGINE_SOURCES.get(name, []):
+        text = Path(path).read_text(encoding='utf-8').replace('\r\n', '\n')
+        for function in functions:
+            h.update(function_source(text, function).encode('utf-8') + b'\n')
+    return h.hexdigest()[:16]
+
+
+def write_grid(name: str, header: Dict, values: np.ndarray, grid_dir: Optional[Path] = None) -> Tuple[Path, Path]:
+    """Écrit l'en-tête JSON et le binaire (montants en euros convertis en centimes)"""
+    grid_dir = Path(grid_dir or GRID_DIR)
+    grid_dir.mkdir(parents=True, exist_ok=True)
+    cents = np.floor(values * 100 + 0.5).astype('<i4')
+    header = dict(header, version=GRID_VERSION, dtype='int32', unit='centimes', order='C',
+                  shape=list(cents.shape), bin=f'{name}.bin')
+    bin_path = grid_dir / f'{name}.bin'
+    json_path = grid_dir / f'{name}.json'
+    cents.tofile(bin_path)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(header, f, ensure_ascii=False, indent=2)
+    return json_path, bin_path
+
+
+def read_grid(name: str, grid_dir: Optional[Path] = None) -> Optional[Tuple[Dict, np.ndarray]]:
+    """(en-tête, tableau en euros) ; None si la grille n'existe pas ou n'est pas à la version courante"""
+    grid_dir = Path(grid_dir or GRID_DIR)
+    json_path = grid_dir / f'{name}.json'
+    if not json_path.exists():
+        return None
+    with open(json_path, encoding='utf-8') as f:
+        header = json.load(f)
+    if header.get('version') != GRID_VERSION:
+        return None
+    cents = np.fromfile(grid_dir / header['bin'], dtype='<i4').reshape(header['shape'])
+    return header, cents / 100
+
+
+def lookup(header: Dict, values: np.ndarray, **point) -> Optional[Dict[str, float]]:
+    """Résultats d'un point de la grille (champs -> euros) ; None si le point est hors grille"""
+    index: List[int] = []
+    for name in AXES:
+        try:
+            index.append(header['axes'][name].index(point[name]))
+        except ValueError:
+            return None
+    return dict(zip(header['fields'], (float(v) for v in values[tuple(index)])))
@@ -0,0 +1,109 @@
+"""
+Moteur de scan parallèle des pages HTML.
+
+Chaque fichier est lu une seule fois (octets) et décodé une seule fois (texte) ;
+les analyses sont réparties sur un pool de processus et les résultats sont
+restitués dans l'ordre des fichiers en entrée.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, List, Sequence, Tuple, TypeVar
+
+from .profiling import PROFILER, count, stage
+
+R = TypeVar('R')
+T = TypeVar('T')
+
+_WORKER_STATS: List[Tuple[Callable[[], Any], Callable[[Any], None]]] = [(PROFILER.drain, PROFILER.merge)]
+
+# Pages sources et dossiers miroirs produits par les étapes du pipeline
+# (chemins relatifs à la racine du dépôt)
+CORPUS_DIRS = ['src/pages', 'pages_SCHEMA_FINAL', 'pages_SIMULATEURS_PLUS', 'pages_YMYL_FINAL',
+               'pages_YMYL_FINAL_V2', 'pages_YMYL_SAFE', 'src/pages_INDEPENDANT']
+
+
+def list_html_files(dirs: Iterable[str]) -> List[str]:
+    """Liste les fichiers .html (non récursif) de chaque dossier, dans l'ordre des dossiers"""
+    files = []
+    for dir_path in dirs:
+        if not os.path.exists(dir_path):
+            continue
+        for filename in os.listdir(dir_path):
+            if filename.endswith('.html'):
+                files.append(os.path.join(dir_path, filename))
+    return files
+
+
+def decode_page(content_bytes: bytes) -> str:
+    """Décode en UTF-8 avec la même normalisation des fins de ligne que open(..., 'r')"""
+    text = content_bytes.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def read_page(filepath: str) -> Tuple[bytes, str]:
+    """Lit un fichier une seule fois et retourne (octets, texte décodé)"""
+    with stage('lecture'):
+        with open(filepath, 'rb') as f:
+            content_bytes = f.read()
+        count(files=1, bytes=len(content_bytes))
+        return content_bytes, decode_page(content_bytes)
+
+
+def resolve_jobs(jobs: int) -> int:
+    """0 ou valeur négative = tous les cœurs disponibles"""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def scan_files(files: Sequence[T], analyse: Callable[[T], R], jobs: int = 1,
+               chunksize: int = 8) -> List[R]:
+    """
+    Applique `analyse(item)` à chaque élément (chemin, ou tuple d'arguments).
+
+    `analyse` doit être une fonction de niveau module et les éléments doivent
+    être sérialisables par pickle.
+    Avec jobs=1 le scan reste séquentiel ; sinon il est réparti sur un pool de
+    processus. Dans tous les cas les résultats suivent l'ordre de `files`.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs == 1 or len(files) < 2:
+        if not PROFILER.enabled:
+            return [analyse(filepath) for filepath in files]
+        results = []
+        for item in files:
+            with stage(_name(analyse)):
+                results.append(analyse(item))
+        return results
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = []
+        for result, stats in pool.map(partial(_collect, analyse), files, chunksize=chunksize):
+            for (_, merge), values in zip(_WORKER_STATS, stats):
+                merge(values)
+            results.append(result)
+        return results
+
+
+def register_worker_stats(drain: Callable[[], Any], merge: Callable[[Any], None]):
+    """
+    Mesures tenues par processus (profil, coût des règles) à rapatrier du pool :
+    `drain()` est appelé dans le processus du pool après chaque élément, son
+    résultat est passé à `merge()` dans le processus principal.
+    """
+    _WORKER_STATS.append((drain, merge))
+
+
+def _collect(analyse: Callable[[T], R], item: T):
+    """Exécute l'analyse dans un processus du pool et renvoie ses mesures avec le résultat"""
+    for drain, _ in _WORKER_STATS:
+        drain()
+    with stage(_name(analyse)):
+        result = analyse(item)
+    return result, [drain() for drain, _ in _WORKER_STATS]
+
+
+def _name(analyse: Callable) -> str:
+    return getattr(analyse, '__name__', 'analyse')
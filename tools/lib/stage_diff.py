@@ -0,0 +1,287 @@
+"""
+Différences structurelles entre deux dossiers d'étape du pipeline
+(pages_YMYL_FINAL_V2 -> pages_SIMULATEURS_PLUS, pages_YMYL_SAFE -> pages_SCHEMA_FINAL...).
+
+Les fichiers sont appariés par chemin relatif, au suffixe d'étape près
+(aah_SIMULATEURS_PLUS.html <-> aah.html), puis comparés par empreinte : les
+pages identiques ne sont pas relues. Pour les autres, trois régions sont
+comparées séparément :
+
+- jsonld : blocs JSON-LD aplatis en chemins (« HowTo.step[0].name ») ;
+- texte : texte visible du <body>, diff mot à mot limité à la zone modifiée
+  (préfixe et suffixe communs écartés avant difflib) ;
+- liens : href du <body>, ajoutés et retirés.
+
+Une page modifiée seulement dans son balisage (attributs, espaces) n'a aucune
+région modifiée. Les pages dont les modifications ont la même forme (mêmes
+clés JSON-LD, mêmes passages aux nombres près, mêmes liens) sont regroupées en
+motifs : une relecture porte sur quelques motifs et non sur chaque page.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .blob_store import BlobStore, stage_name
+from .cache import file_digest
+from .page_index import JSONLD_RE, LINK_RE, visible_text
+from .scan import read_page
+
+# Suffixes ajoutés aux noms de fichiers par les étapes du pipeline
+# (output_path() de scripts/add_simulateur_schemas.py)
+STAGE_SUFFIXES = ('_SIMULATEURS_PLUS',)
+
+BODY_RE = re.compile(r'<body\b[^>]*>(.*)</body\s*>', re.IGNORECASE | re.DOTALL)
+NUMBER_RE = re.compile(r'\d+(?:[\s.,\u00a0\u202f]\d+)*')
+INDEX_RE = re.compile(r'\[\d+\]')
+MAX_SNIPPET = 300
+# Deux modifications séparées par au plus MERGE_GAP mots inchangés forment un seul passage
+MERGE_GAP = 2
+
+
+def page_key(relpath: str) -> str:
+    """Chemin relatif sans suffixe d'étape : clé d'appariement entre deux dossiers"""
+    stem, ext = os.path.splitext(relpath)
+    for suffix in STAGE_SUFFIXES:
+        if stem.endswith(suffix):
+            return stem[:-len(suffix)] + ext
+    return relpath
+
+
+def tree_digests(directory, store: Optional[BlobStore] = None) -> Dict[str, str]:
+    """
+    {chemin relatif: sha256} des pages .html d'un dossier (récursif). Les
+    empreintes du manifeste de l'étape (tools/stage_store.py) sont reprises
+    quand taille et date du fichier n'ont pas changé.
+    """
+    directory = Path(directory)
+    manifest = (store or BlobStore()).read_manifest(stage_name(directory)) or {}
+    known = manifest.get('files', {})
+    digests = {}
+    for path in directory.rglob('*.html'):
+        if not path.is_file():
+            continue
+        relpath = path.relative_to(directory).as_posix()
+        entry = known.get(relpath)
+        st = path.stat()
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            digests[relpath] = entry['sha256']
+        else:
+            digests[relpath] = file_digest(path)
+    return digests
+
+
+def pair_files(old: Dict[str, str], new: Dict[str, str]) -> Tuple[List[Tuple[str, str]], List[str], List[str]]:
+    """
+    Apparie deux listes de chemins relatifs : le nom exact l'emporte, sinon le
+    nom sans suffixe d'étape. Retourne (paires (ancien, nouveau), seulement
+    dans l'ancien, seulement dans le nouveau).
+    """
+    def by_key(relpaths) -> Dict[str, str]:
+        keyed: Dict[str, str] = {}
+        for relpath in sorted(relpaths, key=lambda p: (page_key(p) != p, p)):
+            keyed.setdefault(page_key(relpath), relpath)
+        return keyed
+
+    old_keys, new_keys = by_key(old), by_key(new)
+    pairs = [(old_keys[key], new_keys[key]) for key in sorted(new_keys) if key in old_keys]
+    paired_old = {o for o, _ in pairs}
+    paired_new = {n for _, n in pairs}
+    return pairs, sorted(p for p in old if p not in paired_old), sorted(p for p in new if p not in paired_new)
+
+
+# ---------- régions ----------
+
+def _flatten(value, prefix: str, out: Dict[str, str]):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(item, f'{prefix}.{key}', out)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            _flatten(item, f'{prefix}[{i}]', out)
+    else:
+        out[prefix] = json.dumps(value, ensure_ascii=False)
+
+
+def flatten_jsonld(blocks: List[str]) -> Dict[str, str]:
+    """
+    Blocs JSON-LD aplatis en {chemin: valeur JSON}. Chaque bloc est préfixé par
+    son @type (« HowTo », « BreadcrumbList#2 » pour le second du même type),
+    un bloc invalide est gardé tel quel (espaces normalisés).
+    """
+    out: Dict[str, str] = {}
+    seen: Counter = Counter()
+    for raw in blocks:
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            label = data.get('@type') or 'objet'
+            label = '/'.join(label) if isinstance(label, list) else str(label)
+        else:
+            label = 'liste' if isinstance(data, list) else 'invalide'
+        seen[label] += 1
+        prefix = label if seen[label] == 1 else f'{label}#{seen[label]}'
+        if data is None:
+            out[prefix] = ' '.join(raw.split())
+        else:
+            _flatten(data, prefix, out)
+    return out
+
+
+def extract_regions(content: str) -> Tuple[Dict[str, str], List[str], List[str]]:
+    """(JSON-LD aplati, mots du texte visible du body, liens du body)"""
+    body = BODY_RE.search(content)
+    body = body.group(1) if body else content
+    return (flatten_jsonld([block.strip() for block in JSONLD_RE.findall(content)]),
+            visible_text(body).split(), LINK_RE.findall(body))
+
+
+def _snippet(words: List[str]) -> str:
+    text = ' '.join(words)
+    return text if len(text) <= MAX_SNIPPET else text[:MAX_SNIPPET - 1] + '…'
+
+
+def token_diff(old: List[str], new: List[str]) -> List[Dict]:
+    """
+    Passages modifiés entre deux suites de mots : [{'at': position dans
+    l'ancien texte, 'old': texte retiré, 'new': texte ajouté}].
+    """
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    a, b = old[start:len(old) - end], new[start:len(new) - end]
+    if not a and not b:
+        return []
+    hunks: List[List[int]] = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            continue
+        if hunks and i1 - hunks[-1][1] <= MERGE_GAP and j1 - hunks[-1][3] <= MERGE_GAP:
+            hunks[-1][1], hunks[-1][3] = i2, j2
+        else:
+            hunks.append([i1, i2, j1, j2])
+    return [{'at': start + i1, 'old': _snippet(a[i1:i2]), 'new': _snippet(b[j1:j2])}
+            for i1, i2, j1, j2 in hunks]
+
+
+def diff_pages(task: Tuple[str, str]) -> Dict:
+    """
+    Compare deux pages (chemins) région par région. Retourne
+    {'jsonld': {'added', 'removed', 'changed'}, 'text': [passages],
+     'links': {'added', 'removed'}, 'words': [ancien, nouveau]} (sérialisable en JSON).
+    """
+    old_path, new_path = task
+    old_jsonld, old_words, old_links = extract_regions(read_page(old_path)[1])
+    new_jsonld, new_words, new_links = extract_regions(read_page(new_path)[1])
+    old_count, new_count = Counter(old_links), Counter(new_links)
+    return {
+        'jsonld': {
+            'added': {k: v for k, v in new_jsonld.items() if k not in old_jsonld},
+            'removed': {k: v for k, v in old_jsonld.items() if k not in new_jsonld},
+            'changed': {k: [old_jsonld[k], v] for k, v in new_jsonld.items()
+                        if k in old_jsonld and old_jsonld[k] != v},
+        },
+        'text': token_diff(old_words, new_words),
+        'links': {'added': sorted((new_count - old_count).elements()),
+                  'removed': sorted((old_count - new_count).elements())},
+        'words': [len(old_words), len(new_words)],
+    }
+
+
+# ---------- agrégation ----------
+
+def changed_regions(result: Dict) -> List[str]:
+    regions = []
+    if any(result['jsonld'].values()):
+        regions.append('jsonld')
+    if result['text']:
+        regions.append('texte')
+    if any(result['links'].values()):
+        regions.append('liens')
+    return regions
+
+
+def _shape(text: str) -> str:
+    return NUMBER_RE.sub('#', text)
+
+
+def _block_types(keys) -> List[str]:
+    return sorted({key.split('.', 1)[0].split('[', 1)[0] for key in keys})
+
+
+def signature(result: Dict) -> str:
+    """
+    Forme d'une modification : clés JSON-LD sans indices, passages aux nombres
+    près et liens. Deux pages de même signature ont subi la même transformation.
+    """
+    jsonld = result['jsonld']
+    parts = sorted({f'{sign}{INDEX_RE.sub("[]", key)}'
+                    for sign, keys in (('+', jsonld['added']), ('-', jsonld['removed']), ('~', jsonld['changed']))
+                    for key in keys})
+    parts += [f"{_shape(hunk['old'])}=>{_shape(hunk['new'])}" for hunk in result['text']]
+    parts += [f'+{href}' for href in result['links']['added']] + [f'-{href}' for href in result['links']['removed']]
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def describe(result: Dict) -> str:
+    """Résumé d'une ligne : « JSON-LD +HowTo +BreadcrumbList ; texte 1 passage (+45 mots) ; liens +3 »"""
+    jsonld = result['jsonld']
+    parts = []
+    blocks = [f'+{t}' for t in _block_types(jsonld['added'])] + [f'-{t}' for t in _block_types(jsonld['removed'])] \
+        + [f'~{t}' for t in _block_types(jsonld['changed'])]
+    if blocks:
+        parts.append('JSON-LD ' + ' '.join(blocks))
+    if result['text']:
+        delta = result['words'][1] - result['words'][0]
+        parts.append(f"texte {len(result['text'])} passage{'s' if len(result['text']) > 1 else ''} ({delta:+d} mots)")
+    links = result['links']
+    if links['added'] or links['removed']:
+        parts.append('liens ' + ' '.join(f'{sign}{len(hrefs)}' for sign, hrefs in
+                                        (('+', links['added']), ('-', links['removed'])) if hrefs))
+    return ' ; '.join(parts) or 'balisage seul'
+
+
+def detail_lines(result: Dict, limit: int = 6) -> List[str]:
+    """Quelques lignes lisibles d'une modification (exemple d'un motif)"""
+    lines = []
+    jsonld = result['jsonld']
+    for sign, entries in (('+', jsonld['added']), ('-', jsonld['removed'])):
+        for key, value in entries.items():
+            lines.append(f'{sign} {key} = {value}')
+    for key, (old, new) in jsonld['changed'].items():
+        lines.append(f'~ {key} : {old} -> {new}')
+    for hunk in result['text']:
+        if hunk['old']:
+            lines.append(f"- « {hunk['old']} »")
+        if hunk['new']:
+            lines.append(f"+ « {hunk['new']} »")
+    lines += [f'+ lien {href}' for href in result['links']['added']]
+    lines += [f'- lien {href}' for href in result['links']['removed']]
+    shown = [line if len(line) <= 160 else line[:159] + '…' for line in lines[:limit]]
+    if len(lines) > limit:
+        shown.append(f'... {len(lines) - limit} autres')
+    return shown
+
+
+def group_patterns(pages: List[Dict]) -> List[Dict]:
+    """Motifs de modification triés par nombre de pages : signature, résumé, exemple, pages"""
+    groups: Dict[str, Dict] = {}
+    for page in pages:
+        key = page['signature']
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'signature': key, 'summary': page['summary'], 'regions': page['regions'],
+                                   'example': page['new'], 'detail': detail_lines(page['diff'], limit=20),
+                                   'pages': []}
+        group['pages'].append(page['new'])
+    return sorted(groups.values(), key=lambda g: (-len(g['pages']), g['example']))
@@ -0,0 +1,229 @@
+"""
+Corpus de pages synthétique et reproductible pour les benchmarks.
+
+La structure reprend celle des pages réelles (src/pages/rsa/rsa-2-enfants.html,
+src/pages/apl.html, ...) : en-tête avec title, description, canonical, Open
+Graph et JSON-LD (WebPage, FAQPage, BreadcrumbList), bloc d'estimation avec
+montants en entités (« ~468,55 &#8364; »), tableau de scénarios, formulaire
+de simulateur, FAQ en <details> (parfois en microdonnées), liens internes,
+script du simulateur en ligne. Le texte est tiré d'un vocabulaire fixe avec un
+générateur pseudo-aléatoire initialisé par (graine, numéro de page) : même
+graine et même taille => octets identiques, quelle que soit la machine.
+
+Arborescence produite sous `root` (celle du dépôt, pour que les scripts
+tournent tels quels avec LESCALCULATEURS_ROOT=root) :
+
+    src/index.html
+    src/pages/<section>.html                 une page pilier par section
+    src/pages/<section>/<slug>.html          pages pSEO (l'essentiel du volume)
+    pages_YMYL_FINAL_V2/<slug>.html          miroir à plat d'une partie des pages
+
+Environ 60 % des pages pSEO sont des variantes d'un même gabarit (quasi-
+doublons) ; une faible part porte des défauts connus (mojibake, « € » à la
+place d'un accent, « é » à la place de « € », espaces doublées) pour que les
+scanners aient de quoi signaler.
+"""
+import json
+import random
+import shutil
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+GENERATOR_VERSION = 1
+DOMAIN = 'https://www.lescalculateurs.fr'
+MIRROR_DIR = 'pages_YMYL_FINAL_V2'
+MIRROR_SHARE = 0.4
+TEMPLATE_SHARE = 0.6
+DEFECT_PAGES = 0.2
+
+SECTIONS = {
+    'apl': 'APL', 'rsa': 'RSA', 'prime-activite': "Prime d'activité", 'impot': 'Impôt sur le revenu',
+    'notaire': 'Frais de notaire', 'taxe-fonciere': 'Taxe foncière', 'pret': 'Prêt immobilier',
+    'salaire': 'Salaire brut/net', 'ik': 'Indemnités kilométriques', 'plusvalue': 'Plus-value immobilière',
+    'charges': 'Charges de copropriété', 'are': 'Allocation chômage', 'aah': 'AAH', 'asf': 'ASF',
+    'crypto-bourse': 'Plus-value crypto',
+}
+PROFILS = ['personne seule', 'couple sans enfant', 'parent isolé avec un enfant', 'couple avec 2 enfants',
+           'étudiant', 'retraité', 'couple avec 3 enfants', 'jeune actif', 'auto-entrepreneur',
+           'salarié à temps partiel']
+VILLES = ['Paris', 'Lyon', 'Marseille', 'Toulouse', 'Nantes', 'Bordeaux', 'Lille', 'Rennes', 'Nice',
+          'Strasbourg', 'Montpellier', 'Grenoble', 'Dijon', 'Angers', 'Brest', 'Caen', 'Limoges', 'Tours']
+SUJETS = ['Cette estimation', 'Le montant affiché', 'Le simulateur', 'Le barème 2026', 'La CAF',
+          "L'administration fiscale", 'Votre situation familiale', 'Le calcul trimestriel', 'Ce scénario type',
+          'La base ressources']
+VERBES = ['tient compte de', 'repose sur', 'dépend de', 'intègre', 'ne remplace pas', 's\'appuie sur',
+          'varie selon', 'reprend', 'exclut', 'prend en charge']
+COMPLEMENTS = ['vos revenus des trois derniers mois', 'la composition du foyer', 'le forfait logement',
+               'les barèmes officiels publiés au 1er avril', 'le montant forfaitaire', 'la zone géographique',
+               'les aides déjà perçues', 'le loyer plafonné', 'la décote et le quotient familial',
+               'les revenus du patrimoine', 'la déclaration trimestrielle de ressources', 'un arrondi à l\'euro']
+FINS = ['pour un premier ordre de grandeur.', 'à titre indicatif.', 'avant toute démarche officielle.',
+        'selon les règles en vigueur en 2026.', 'sans valeur contractuelle.', 'dans la plupart des cas.']
+DEFECTS = ['mari€', 'propriét€', '€ partir de', '610 é par mois', 'Ã©ligible', 'estimÃ©', 'montant  estimé']
+
+
+def _euros(value: float) -> str:
+    """1234.5 -> « 1&nbsp;234,50 &#8364; » (forme des pages générées)"""
+    whole, cents = f'{value:.2f}'.split('.')
+    groups = []
+    while whole:
+        groups.insert(0, whole[-3:])
+        whole = whole[:-3]
+    return '&nbsp;'.join(groups) + f',{cents} &#8364;'
+
+
+def _sentence(rng: random.Random) -> str:
+    return f'{rng.choice(SUJETS)} {rng.choice(VERBES)} {rng.choice(COMPLEMENTS)} {rng.choice(FINS)}'
+
+
+def _paragraphs(rng: random.Random, count: int, defects: bool) -> List[str]:
+    paragraphs = []
+    for _ in range(count):
+        sentences = [_sentence(rng) for _ in range(rng.randint(2, 5))]
+        if defects and rng.random() < 0.3:
+            sentences.insert(rng.randrange(len(sentences) + 1), rng.choice(DEFECTS))
+        paragraphs.append(f'<p class="mt-4 text-slate-700 leading-relaxed">{" ".join(sentences)}</p>')
+    return paragraphs
+
+
+def _jsonld(data: dict) -> str:
+    return f'<script type="application/ld+json">{json.dumps(data, ensure_ascii=True, separators=(",", ":"))}</script>'
+
+
+def _script(rng: random.Random, section: str) -> str:
+    """Script du simulateur en ligne (les vraies pages en embarquent plusieurs ko)"""
+    lines = [f'const BAREME_{section.upper().replace("-", "_")} = {{']
+    for i in range(rng.randint(20, 60)):
+        lines.append(f'  tranche{i}: {{ seuil: {rng.randint(0, 90000)}, taux: {rng.random():.4f} }},')
+    lines.append('};')
+    lines.append('function calculer(revenus, foyer) { let total = 0; for (const t of Object.values('
+                 f'BAREME_{section.upper().replace("-", "_")})) {{ if (revenus > t.seuil) {{ '
+                 'total += (revenus - t.seuil) * t.taux; } } return Math.round(total / foyer * 100) / 100; }')
+    return '<script>\n' + '\n'.join(lines) + '\n</script>'
+
+
+def render_page(seed: int, number: int, section: str, slug: str, template: bool) -> str:
+    """HTML d'une page ; les pages « gabarit » ne diffèrent que par le profil, la ville et les montants"""
+    rng = random.Random(f'{seed}:{number}')
+    text_rng = random.Random(f'{seed}:{section}') if template else rng
+    label = SECTIONS[section]
+    profil, ville = rng.choice(PROFILS), rng.choice(VILLES)
+    url = f'{DOMAIN}/pages/{section}/{slug}' if slug else f'{DOMAIN}/pages/{section}'
+    title = f'{label} {profil} à {ville} : estimation 2026' if slug else f'Simulateur {label} 2026'
+    description = f'Estimez {label} 2026 pour un profil {profil} à {ville}. Calcul gratuit basé sur les barèmes officiels.'
+    amount = rng.uniform(50, 4000)
+    defects = rng.random() < DEFECT_PAGES
+
+    faq = [(f'Comment est calculé {label} pour un {profil} ?', _sentence(text_rng)) for _ in range(text_rng.randint(3, 6))]
+    head = [
+        '<!doctype html>', '<html lang="fr">', '  <head>',
+        '    <meta charset="UTF-8" />',
+        '    <meta name="viewport" content="width=device-width, initial-scale=1.0" />',
+        f'    <title>{title} | Les Calculateurs</title>',
+        f'    <meta name="description" content="{description}" />',
+        '    <meta name="robots" content="index, follow" />',
+        f'    <link rel="canonical" href="{url}" />',
+        f'    <meta property="og:url" content="{url}" />',
+        f'    <meta property="og:title" content="{title}" />',
+        '    <link rel="stylesheet" href="/tailwind.css" />',
+        '    ' + _jsonld({'@context': 'https://schema.org', '@type': 'WebPage', 'name': title,
+                          'description': description, 'url': url}),
+        '    ' + _jsonld({'@context': 'https://schema.org', '@type': 'FAQPage', 'mainEntity': [
+            {'@type': 'Question', 'name': q, 'acceptedAnswer': {'@type': 'Answer', 'text': a}} for q, a in faq]}),
+        '    ' + _jsonld({'@context': 'https://schema.org', '@type': 'BreadcrumbList', 'itemListElement': [
+            {'@type': 'ListItem', 'position': 1, 'name': 'Accueil', 'item': DOMAIN},
+            {'@type': 'ListItem', 'position': 2, 'name': label, 'item': f'{DOMAIN}/pages/{section}'}]}),
+        '  </head>',
+    ]
+    nav = ' '.join(f'<a href="/pages/{s}" class="hover:text-purple-700">{l}</a>' for s, l in SECTIONS.items())
+    rows = []
+    for i in range(text_rng.randint(4, 12)):
+        value = amount * (1 + i * 0.08)
+        rows.append(f'<tr><td class="px-4 py-2">{rng.choice(PROFILS)}</td>'
+                    f'<td class="px-4 py-2 text-right">{_euros(value)}</td>'
+                    f'<td class="px-4 py-2 text-right">{_euros(value * 12)}</td></tr>')
+    microdata = ' itemscope itemtype="https://schema.org/FAQPage"' if text_rng.random() < 0.2 else ''
+    details = '\n'.join(f'<details class="rounded-xl border p-4"><summary class="font-semibold">{q}</summary>'
+                        f'<p class="mt-2 text-slate-700">{a}</p></details>' for q, a in faq)
+    siblings = ' '.join(f'<a href="/pages/{section}/{section}-{rng.randrange(1000)}">{label} cas {k + 1}</a>'
+                        for k in range(rng.randint(3, 8)))
+    body = [
+        '  <body class="bg-slate-50">',
+        f'    <header class="border-b bg-white"><nav class="mx-auto flex max-w-5xl gap-4 px-4 py-3 text-sm">{nav}</nav></header>',
+        '    <main class="mx-auto max-w-5xl px-4 py-10">',
+        f'      <h1 class="text-3xl font-bold">{title}</h1>',
+        f'      <p class="mt-4 text-lg">Montant indicatif autour de ~{_euros(amount)} par mois pour ce sc&#233;nario type.</p>',
+        *('      ' + p for p in _paragraphs(text_rng, text_rng.randint(8, 30), defects)),
+        f'      <form id="{section}-form" class="mt-8 grid gap-4"><label>Revenus mensuels <input type="number" name="revenus" /></label>'
+        '<label>Enfants <input type="number" name="enfants" /></label><button type="submit">Calculer</button></form>',
+        '      <table class="mt-8 w-full"><thead><tr><th>Profil</th><th>Par mois</th><th>Par an</th></tr></thead>',
+        f'      <tbody>{"".join(rows)}</tbody></table>',
+        f'      <section class="mt-8"{microdata}><h2 class="text-2xl font-bold">Questions fr&eacute;quentes</h2>{details}</section>',
+        *('      ' + p for p in _paragraphs(rng, rng.randint(2, 8), defects)),
+        f'      <nav class="mt-8 text-sm">Voir aussi : {siblings}</nav>',
+        '    </main>',
+        '    ' + _script(text_rng, section),
+        '    <footer class="mt-12 border-t py-6 text-center text-sm">&copy; 2026 LesCalculateurs.fr</footer>',
+        '  </body>', '</html>', '',
+    ]
+    return '\n'.join(head + body)
+
+
+def plan(pages: int) -> List[Tuple[str, str, bool]]:
+    """(section, slug, gabarit) de chaque page : d'abord les piliers, puis les pages pSEO réparties par section"""
+    sections = list(SECTIONS)
+    entries = [(section, '', False) for section in sections][:pages]
+    for i in range(pages - len(entries)):
+        section = sections[i % len(sections)]
+        template = (i * 7919) % 100 < TEMPLATE_SHARE * 100
+        entries.append((section, f'{section}-{i}', template))
+    return entries
+
+
+def generate(root, pages: int, seed: int = 1) -> Dict:
+    """
+    Écrit le corpus sous `root` (recréé) et retourne son manifeste
+    {version, pages, seed, files, bytes}. Réutilise le corpus existant si le
+    manifeste correspond.
+    """
+    root = Path(root)
+    manifest_path = root / 'corpus.json'
+    expected = {'version': GENERATOR_VERSION, 'pages': pages, 'seed': seed}
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        if all(manifest.get(k) == v for k, v in expected.items()):
+            return manifest
+    except (OSError, ValueError):
+        pass
+
+    if root.exists():
+        shutil.rmtree(root)
+    pages_dir = root / 'src' / 'pages'
+    mirror_dir = root / MIRROR_DIR
+    pages_dir.mkdir(parents=True)
+    mirror_dir.mkdir()
+    files = written = 0
+    home_links = ' '.join(f'<a href="/pages/{s}">{l}</a>' for s, l in SECTIONS.items())
+    home = (f'<!doctype html>\n<html lang="fr"><head><meta charset="UTF-8" /><title>Les Calculateurs</title>'
+            f'<link rel="canonical" href="{DOMAIN}/" /></head><body><nav>{home_links}</nav></body></html>\n')
+    (root / 'src' / 'index.html').write_text(home, encoding='utf-8')
+    for number, (section, slug, template) in enumerate(plan(pages)):
+        content = render_page(seed, number, section, slug, template).encode('utf-8')
+        path = pages_dir / section / f'{slug}.html' if slug else pages_dir / f'{section}.html'
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(content)
+        files += 1
+        written += len(content)
+        if not slug or (number * 2654435761) % 100 < MIRROR_SHARE * 100:
+            # Étape YMYL du pipeline : même page, avertissement ajouté
+            mirrored = content.replace(b'<main class="mx-auto max-w-5xl px-4 py-10">',
+                                       b'<main class="mx-auto max-w-5xl px-4 py-10"><p class="ymyl">'
+                                       b'Estimation indicative, ne remplace pas une simulation officielle.</p>', 1)
+            name = f'{slug or section}.html'
+            (mirror_dir / name).write_bytes(mirrored)
+            files += 1
+            written += len(mirrored)
+
+    manifest = dict(expected, files=files, bytes=written)
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return manifest
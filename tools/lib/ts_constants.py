@@ -0,0 +1,423 @@
+"""
+Lecture des constantes de barème déclarées en TypeScript, sans moteur JS.
+
+Les fichiers de données (src/data/social-baremes.ts) sont des littéraux
+d'objets avec quelques constantes numériques, des fonctions d'une seule
+instruction `return <expression>;` (revalorise, round2) et des références à
+des imports JSON (baremes.json). Ce module en évalue le sous-ensemble utile :
+nombres, chaînes, booléens, tableaux, objets, identifiants, accès membres,
+opérateurs arithmétiques, appels de fonctions du fichier, Math.round /
+Math.floor / Math.ceil / Math.min / Math.max (sémantique JS) et
+Number.POSITIVE_INFINITY. Les annotations de type, `type`, `interface`,
+`as ...` et les fonctions à plusieurs instructions sont ignorées.
+
+Le résultat est aplati en table {"socialBaremes.rsa.montantForfaitaireBase":
+651.69, ...} et mis en cache (.cache/constants/) par empreinte du fichier
+source et des JSON importés.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import REPO_ROOT
+
+CACHE_DIR = REPO_ROOT / '.cache' / 'constants'
+CACHE_VERSION = 1
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<template>`(?:[^`\\]|\\.)*`)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<op>=>|\.\.\.|[{}()\[\];:,.?<>=+\-*/%|&!])
+''', re.VERBOSE | re.DOTALL)
+
+_OPENING = {'{': '}', '(': ')', '[': ']', '<': '>'}
+
+
+class TsParseError(ValueError):
+    pass
+
+
+def _js_round(value: float) -> float:
+    """Math.round : arrondi à l'entier le plus proche, les demis vers +infini"""
+    return float(math.floor(value + 0.5))
+
+
+_MATH = {
+    'round': _js_round,
+    'floor': lambda v: float(math.floor(v)),
+    'ceil': lambda v: float(math.ceil(v)),
+    'min': min,
+    'max': max,
+    'abs': abs,
+}
+
+
+_GLOBALS = {
+    'Math': _MATH,
+    'Number': {'POSITIVE_INFINITY': math.inf, 'NEGATIVE_INFINITY': -math.inf,
+               'MAX_SAFE_INTEGER': 2 ** 53 - 1},
+}
+
+
+def js_round2(value: float) -> float:
+    """Équivalent Python de `Math.round(value * 100) / 100`"""
+    return _js_round(value * 100) / 100
+
+
+def tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    while pos < len(source):
+        match = _TOKEN_RE.match(source, pos)
+        if not match:
+            line = source.count('\n', 0, pos) + 1
+            raise TsParseError(f'Caractère inattendu ligne {line} : {source[pos]!r}')
+        kind = match.lastgroup
+        if kind != 'ws':
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    return tokens
+
+
+def _string(literal: str) -> str:
+    """Valeur d'un littéral chaîne entre guillemets simples ou doubles"""
+    if literal[0] == "'":
+        literal = '"' + literal[1:-1].replace("\\'", "'").replace('"', '\\"') + '"'
+    return json.loads(literal)
+
+
+class _Function:
+    def __init__(self, params: List[str], body: List[Tuple[str, str]]):
+        self.params = params
+        self.body = body
+
+
+class _Parser:
+    """Évaluateur descendant récursif, une instance par fichier"""
+
+    def __init__(self, tokens: List[Tuple[str, str]], scope: Dict[str, Any]):
+        self.tokens = tokens
+        self.pos = 0
+        self.scope = scope
+        self.exported: List[str] = []
+        self.imported: List[str] = []
+
+    # -- navigation --------------------------------------------------------
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else ('eof', '')
+
+    def next(self) -> Tuple[str, str]:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def accept(self, value: str) -> bool:
+        if self.peek()[1] == value and self.peek()[0] in ('op', 'name'):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, value: str):
+        if not self.accept(value):
+            raise TsParseError(f'« {value} » attendu, trouvé « {self.peek()[1]} »')
+
+    def skip_balanced(self, angle: bool = False):
+        """
+        Saute un groupe {...}, (...) ou [...] (imbrications comprises) ; avec
+        angle=True (annotations de type) <...> compte aussi comme un groupe
+        """
+        depth = []
+        while True:
+            kind, value = self.next()
+            if kind == 'eof':
+                raise TsParseError('Groupe non refermé')
+            if kind == 'op' and value in _OPENING and (angle or value != '<'):
+                depth.append(_OPENING[value])
+            elif kind == 'op' and depth and value == depth[-1]:
+                depth.pop()
+                if not depth:
+                    return
+
+    def skip_type(self, before_body: bool = False):
+        """Saute une annotation de type (après « : » ou « as ») ; before_body : s'arrête à « { »"""
+        while True:
+            kind, value = self.peek()
+            if before_body and value == '{':
+                return
+            if kind == 'op' and value in _OPENING:
+                self.skip_balanced(angle=True)
+            elif kind in ('name', 'string', 'number') or value in ('.', '|', '&'):
+                self.pos += 1
+            else:
+                return
+
+    def skip_statement(self):
+        while self.peek()[0] != 'eof':
+            kind, value = self.peek()
+            if kind == 'op' and value in _OPENING and value != '<':
+                self.skip_balanced()
+            elif self.next()[1] == ';':
+                return
+
+    # -- instructions --------------------------------------------------------
+    def program(self, imports: Dict[str, Any]):
+        while self.peek()[0] != 'eof':
+            exported = self.accept('export')
+            kind, value = self.peek()
+            if value == 'import' and self.peek(1)[0] == 'name' and self.peek(2)[1] == 'from':
+                self.next()
+                name = self.next()[1]
+                self.expect('from')
+                module = _string(self.next()[1])
+                if module in imports:
+                    self.scope[name] = imports[module]
+                    self.imported.append(name)
+                self.accept(';')
+            elif value in ('const', 'let', 'var'):
+                self.next()
+                name = self.next()[1]
+                if self.accept(':'):
+                    self.skip_type()
+                self.expect('=')
+                self.scope[name] = self.expression()
+                if exported:
+                    self.exported.append(name)
+                self.accept(';')
+            elif value == 'function':
+                self.next()
+                name = self.next()[1]
+                function = self.function()
+                if function is not None:
+                    self.scope[name] = function
+            elif value in ('interface', 'enum', 'class'):
+                # Déclaration sans « ; » final : on saute jusqu'à la fin du bloc
+                while self.peek()[1] != '{':
+                    self.next()
+                self.skip_balanced()
+            else:
+                # type, interface, déclarations non gérées
+                self.skip_statement()
+
+    def function(self) -> Optional[_Function]:
+        """Fonction `{ return <expression>; }` ; None (corps sauté) pour les autres"""
+        self.expect('(')
+        params = []
+        while not self.accept(')'):
+            params.append(self.next()[1])
+            if self.accept(':'):
+                self.skip_type()
+            if self.accept('='):
+                # Valeur par défaut : non évaluée
+                while self.peek()[1] not in (',', ')'):
+                    if self.peek()[1] in '{([':
+                        self.skip_balanced()
+                    else:
+                        self.next()
+            self.accept(',')
+        if self.accept(':'):
+            self.skip_type(before_body=True)
+        if self.peek(1)[1] != 'return':
+            self.skip_balanced()
+            return None
+        self.expect('{')
+        self.expect('return')
+        start = self.pos
+        self.skip_statement()
+        body = self.tokens[start:self.pos - 1]
+        self.expect('}')
+        return _Function(params, body)
+
+    # -- expressions -------------------------------------------------------
+    def expression(self) -> Any:
+        value = self.additive()
+        while self.accept('as'):
+            self.skip_type()
+        return value
+
+    def additive(self) -> Any:
+        value = self.multiplicative()
+        while self.peek()[1] in ('+', '-') and self.peek()[0] == 'op':
+            op = self.next()[1]
+            right = self.multiplicative()
+            value = value + right if op == '+' else value - right
+        return value
+
+    def multiplicative(self) -> Any:
+        value = self.unary()
+        while self.peek()[1] in ('*', '/', '%') and self.peek()[0] == 'op':
+            op = self.next()[1]
+            right = self.unary()
+            if op == '*':
+                value = value * right
+            elif op == '/':
+                value = value / right
+            else:
+                value = math.fmod(value, right)
+        return value
+
+    def unary(self) -> Any:
+        if self.accept('-'):
+            return -self.unary()
+        if self.accept('+'):
+            return self.unary()
+        return self.postfix()
+
+    def postfix(self) -> Any:
+        value = self.primary()
+        while True:
+            if self.accept('.'):
+                key = self.next()[1]
+                value = value[key] if isinstance(value, dict) else getattr(value, key)
+            elif self.accept('['):
+                key = self.expression()
+                self.expect(']')
+                value = value[int(key)] if isinstance(value, list) else value[key]
+            elif self.accept('('):
+                args = []
+                while not self.accept(')'):
+                    args.append(self.expression())
+                    self.accept(',')
+                value = self.call(value, args)
+            else:
+                return value
+
+    def call(self, func: Any, args: List[Any]) -> Any:
+        if isinstance(func, _Function):
+            scope = dict(self.scope)
+            scope.update(zip(func.params, args))
+            parser = _Parser(func.body + [('eof', '')], scope)
+            return parser.expression()
+        if callable(func):
+            return func(*args)
+        raise TsParseError(f'Appel non évaluable : {func!r}')
+
+    def primary(self) -> Any:
+        kind, value = self.next()
+        if kind == 'number':
+            number = float(value)
+            return int(number) if number.is_integer() and '.' not in value and 'e' not in value.lower() else number
+        if kind == 'string':
+            return _string(value)
+        if kind == 'name':
+            if value in ('true', 'false'):
+                return value == 'true'
+            if value in ('null', 'undefined'):
+                return None
+            if value in _GLOBALS:
+                return _GLOBALS[value]
+            if value not in self.scope:
+                raise TsParseError(f'Identifiant inconnu : {value}')
+            return self.scope[value]
+        if value == '(':
+            result = self.expression()
+            self.expect(')')
+            return result
+        if value == '[':
+            items = []
+            while not self.accept(']'):
+                items.append(self.expression())
+                self.accept(',')
+            return items
+        if value == '{':
+            return self.object()
+        raise TsParseError(f'Expression inattendue : « {value} »')
+
+    def object(self) -> Dict[str, Any]:
+        result = {}
+        while not self.accept('}'):
+            kind, key = self.next()
+            if kind == 'string':
+                key = _string(key)
+            if self.accept(':'):
+                result[key] = self.expression()
+            else:
+                # Raccourci { nom }
+                result[key] = self.scope[key]
+            self.accept(',')
+        return result
+
+
+def _imports(source: str, base_dir: str) -> Dict[str, str]:
+    """{module tel qu'écrit: chemin} des imports JSON du fichier"""
+    modules = re.findall(r'''import\s+\w+\s+from\s+["']([^"']+\.json)["']''', source)
+    return {module: os.path.normpath(os.path.join(base_dir, module)) for module in modules}
+
+
+def evaluate_file(path: str) -> Dict[str, Any]:
+    """
+    Constantes publiques du fichier : `export const`, imports JSON et
+    constantes scalaires de premier niveau (APRIL_2026_UPLIFT). Les alias
+    locaux d'objets (baremesData) ne sont pas repris.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    imports = {}
+    for module, json_path in _imports(source, os.path.dirname(path)).items():
+        with open(json_path, 'r', encoding='utf-8') as f:
+            imports[module] = json.load(f)
+    scope: Dict[str, Any] = {}
+    parser = _Parser(tokenize(source), scope)
+    parser.program(imports)
+    public = set(parser.exported) | set(parser.imported)
+    return {name: value for name, value in scope.items()
+            if name in public or isinstance(value, (int, float, str, bool))}
+
+
+def flatten(value: Any, prefix: str = '') -> Dict[str, Any]:
+    """{"a.b.0.c": valeur scalaire} ; les tableaux sont indexés par position"""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {prefix: value}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f'{prefix}.{key}' if prefix else str(key)))
+    return flat
+
+
+def _sources_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        content = f.read()
+    h = hashlib.sha256(content)
+    for json_path in sorted(_imports(content.decode('utf-8'), os.path.dirname(path)).values()):
+        with open(json_path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def load_constants(path, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Table aplatie des constantes d'un fichier TypeScript de données.
+
+    Le cache est invalidé dès que le fichier ou l'un des JSON qu'il importe
+    change de contenu.
+    """
+    path = str(path)
+    digest = _sources_digest(path)
+    cache_path = CACHE_DIR / (os.path.splitext(os.path.basename(path))[0] + '.json')
+    if use_cache:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION and cached.get('sha256') == digest:
+                return cached['constants']
+        except (OSError, ValueError):
+            pass
+    constants = flatten(evaluate_file(path))
+    if use_cache:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'sha256': digest, 'source': path,
+                       'constants': constants}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, cache_path)
+    return constants
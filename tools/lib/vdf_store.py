@@ -0,0 +1,263 @@
+"""
+Fichier VDF « Revenu des Français à la commune » en colonnes (numpy).
+
+Le CSV (vdf/revenu-des-francais-a-la-commune-*.csv, ~35 000 communes, « ; »)
+est lu une seule fois en flux puis enregistré colonne par colonne dans
+.cache/vdf/ : les colonnes numériques en float64 (NaN si vide ou secret
+statistique), les colonnes texte en chaînes de largeur fixe, les deux
+chargées en mémoire mappée aux exécutions suivantes. Les cellules marquées
+secrètes (« s », « nd », ...) sont en plus relevées dans un masque, pour les
+distinguer des cellules vides (voir VdfStore.secret). Un index trié des codes
+géographiques (codes + permutation) donne la ligne d'une commune par
+recherche dichotomique, et top_k() sélectionne les k premières communes par
+sélection partielle (np.partition) sans trier tout le fichier.
+
+Les colonnes se désignent par leur en-tête ou par un alias de ALIASES
+(« mediane », « q1 », « q3 », ...). Le fichier est reconverti si sa taille,
+sa date ou son empreinte change.
+"""
+import csv
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import REPO_ROOT
+
+VDF_DIR = REPO_ROOT / 'vdf'
+VDF_GLOB = 'revenu-des-francais-a-la-commune-*.csv'
+STORE_DIR = REPO_ROOT / '.cache' / 'vdf'
+STORE_VERSION = 2
+
+# Alias -> en-têtes candidats (le premier présent est retenu)
+ALIASES = {
+    'code': ('Code géographique',),
+    'nom': ('Nom géographique GMS', 'Nom géographique'),
+    'mediane': ('[DISP] Médiane (€)',),
+    'mediane_dec': ('[DEC] Médiane (€)',),
+    'q1': ('[DISP] 1ᵉ quartile (€)',),
+    'q3': ('[DISP] 3ᵉ quartile (€)',),
+}
+
+_MISSING = ('', 's', 'nd', 'n.d.', 'NA', 'N/A', '-')
+
+
+def find_vdf_csv(directory=None) -> Optional[Path]:
+    """Export VDF le plus récent du dossier (le nom porte un horodatage)"""
+    candidates = sorted(Path(directory or VDF_DIR).glob(VDF_GLOB))
+    return candidates[-1] if candidates else None
+
+
+def parse_number(value: str) -> float:
+    """« 23 540,5 » -> 23540.5 ; NaN si vide ou secret statistique"""
+    value = value.strip().replace(' ', '').replace('\u00a0', '').replace('\u202f', '').replace(',', '.')
+    if value in _MISSING:
+        return np.nan
+    return float(value)
+
+
+def _file_state(path: Path) -> dict:
+    st = path.stat()
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def convert(csv_path, store_dir=None) -> dict:
+    """
+    Convertit le CSV en colonnes .npy. Une colonne est numérique si toutes ses
+    valeurs non vides se lisent comme des nombres ; les colonnes d'alias texte
+    (code, nom) restent toujours du texte (codes à zéro initial, 2A/2B).
+    Retourne le manifeste écrit.
+    """
+    csv_path = Path(csv_path)
+    store_dir = Path(store_dir or STORE_DIR)
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        headers = [h.strip() for h in next(reader)]
+        cells: List[List[str]] = [[] for _ in headers]
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            row = row + [''] * (len(headers) - len(row))
+            for values, cell in zip(cells, row):
+                values.append(cell.strip())
+
+    text_headers = {h for alias in ('code', 'nom') for h in ALIASES[alias]}
+    store_dir.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for i, (header, values) in enumerate(zip(headers, cells)):
+        kind = 'text'
+        data = None
+        if header not in text_headers:
+            try:
+                data = np.asarray([parse_number(v) for v in values], dtype=np.float64)
+                kind = 'number'
+            except ValueError:
+                pass
+        if data is None:
+            data = np.asarray(values, dtype=str)
+        filename = f'col{i:03d}.npy'
+        np.save(store_dir / filename, data)
+        column = {'header': header, 'file': filename, 'kind': kind}
+        if kind == 'number':
+            secret = np.isnan(data) & (np.asarray(values, dtype=str) != '')
+            if secret.any():
+                column['secret'] = f'col{i:03d}_secret.npy'
+                np.save(store_dir / column['secret'], secret)
+        columns.append(column)
+
+    code_header = _resolve(headers, 'code')
+    if code_header is not None:
+        codes = np.asarray(cells[headers.index(code_header)], dtype=str)
+        order = np.argsort(codes, kind='stable').astype(np.int64)
+        np.save(store_dir / 'code_sorted.npy', codes[order])
+        np.save(store_dir / 'code_order.npy', order)
+
+    manifest = {
+        'version': STORE_VERSION,
+        'rows': len(cells[0]) if cells else 0,
+        'source': {'path': str(csv_path.resolve()), 'name': csv_path.name,
+                   'state': _file_state(csv_path), 'sha256': _sha256(csv_path)},
+        'columns': columns,
+        'code_index': code_header is not None,
+    }
+    with open(store_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def _resolve(headers, name: str) -> Optional[str]:
+    if name in headers:
+        return name
+    return next((h for h in ALIASES.get(name, ()) if h in headers), None)
+
+
+class VdfStore:
+    """
+    Lecture du fichier VDF converti.
+
+        vdf = VdfStore.ensure()                     # convertit si besoin
+        mediane = vdf.column('mediane')
+        rows = vdf.top_k(mediane, 20)               # 20 plus hautes médianes
+        vdf.record('75056')                         # dict d'une commune
+    """
+
+    def __init__(self, store_dir=None):
+        self.store_dir = Path(store_dir or STORE_DIR)
+        self.manifest = self._read_manifest(self.store_dir)
+        self.headers = [c['header'] for c in self.manifest.get('columns', [])]
+        self._files = {c['header']: c['file'] for c in self.manifest.get('columns', [])}
+        self._secret_files = {c['header']: c['secret'] for c in self.manifest.get('columns', []) if 'secret' in c}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._code_sorted = self._code_order = None
+        if self.manifest.get('code_index'):
+            self._code_sorted = self._load('code_sorted.npy')
+            self._code_order = self._load('code_order.npy')
+
+    @staticmethod
+    def _read_manifest(store_dir: Path) -> dict:
+        try:
+            with open(store_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get('version') == STORE_VERSION else {}
+
+    @classmethod
+    def ensure(cls, csv_path=None, store_dir=None) -> 'VdfStore':
+        """Ouvre le fichier converti, après (re)conversion si le CSV a changé"""
+        csv_path = Path(csv_path) if csv_path else find_vdf_csv()
+        if csv_path is None or not csv_path.exists():
+            raise FileNotFoundError(f'Export VDF introuvable ({VDF_DIR / VDF_GLOB})')
+        store_dir = Path(store_dir or STORE_DIR)
+        manifest = cls._read_manifest(store_dir)
+        source = manifest.get('source', {})
+        if source.get('path') != str(csv_path.resolve()):
+            convert(csv_path, store_dir)
+        elif source.get('state') != _file_state(csv_path):
+            if source.get('sha256') != _sha256(csv_path):
+                convert(csv_path, store_dir)
+            else:
+                # Fichier seulement touché : on garde les colonnes
+                source['state'] = _file_state(csv_path)
+                with open(store_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return cls(store_dir)
+
+    def _load(self, filename: str) -> np.ndarray:
+        # np.load ne sait pas mapper un fichier vide
+        return np.load(self.store_dir / filename, mmap_mode='r' if len(self) else None)
+
+    def __len__(self) -> int:
+        return int(self.manifest.get('rows', 0))
+
+    def resolve(self, name: str) -> str:
+        header = _resolve(self.headers, name)
+        if header is None:
+            raise KeyError(f'Colonne VDF inconnue : {name}')
+        return header
+
+    def has(self, name: str) -> bool:
+        return _resolve(self.headers, name) is not None
+
+    def column(self, name: str) -> np.ndarray:
+        """Colonne entière (mémoire mappée) par en-tête ou alias"""
+        header = self.resolve(name)
+        if header not in self._columns:
+            self._columns[header] = self._load(self._files[header])
+        return self._columns[header]
+
+    def secret(self, name: str) -> np.ndarray:
+        """Masque des cellules sous secret statistique (NaN non vides) d'une colonne numérique"""
+        header = self.resolve(name)
+        if header not in self._secret_files:
+            return np.zeros(len(self), dtype=bool)
+        return self._load(self._secret_files[header])
+
+    def row(self, code: str) -> Optional[int]:
+        """Ligne d'une commune par code géographique (recherche dichotomique)"""
+        if self._code_sorted is None or not len(self):
+            return None
+        i = int(np.searchsorted(self._code_sorted, code))
+        if i < len(self._code_sorted) and self._code_sorted[i] == code:
+            return int(self._code_order[i])
+        return None
+
+    def record(self, code: str, columns: Optional[List[str]] = None) -> Optional[dict]:
+        """Valeurs d'une commune (toutes les colonnes par défaut, NaN -> None)"""
+        i = self.row(code)
+        if i is None:
+            return None
+        result = {}
+        for name in columns or self.headers:
+            value = self.column(name)[i]
+            if isinstance(value, np.floating):
+                value = None if np.isnan(value) else float(value)
+            else:
+                value = str(value)
+            result[name] = value
+        return result
+
+    @staticmethod
+    def top_k(values: np.ndarray, k: int, mask: Optional[np.ndarray] = None, largest: bool = True) -> np.ndarray:
+        """
+        Lignes des k plus grandes (ou plus petites) valeurs, NaN exclus, triées ;
+        à valeur égale l'ordre du fichier est conservé (comme un tri stable)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        keep = ~np.isnan(values) if mask is None else (mask & ~np.isnan(values))
+        rows = np.flatnonzero(keep)
+        key = -values[rows] if largest else values[rows]
+        if k < len(rows):
+            # Seuil du k-ième puis toutes les lignes qui l'atteignent, pour
+            # départager les égalités par ordre du fichier
+            kth = np.partition(key, k - 1)[k - 1]
+            selected = key <= kth
+            rows, key = rows[selected], key[selected]
+        order = np.lexsort((rows, key))[:k]
+        return rows[order]
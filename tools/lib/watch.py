@@ -0,0 +1,186 @@
+"""
+Surveillance des dossiers de pages (inotify, repli par scrutation).
+
+InotifyWatcher s'appuie directement sur l'API inotify de la libc (ctypes,
+aucune dépendance) et surveille récursivement les dossiers, y compris ceux
+créés après le démarrage. PollingWatcher compare périodiquement taille et date
+de modification de chaque fichier : plus lent mais portable (macOS, Windows,
+montages réseau, limite max_user_watches atteinte). make_watcher() choisit
+inotify quand il est disponible.
+
+Les deux exposent wait(timeout) -> ensemble des chemins modifiés, créés ou
+supprimés (None = file d'événements débordée, tout rescanner) ; collect()
+regroupe une rafale d'enregistrements (éditeur, git checkout, script de
+correction) en un seul lot.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Masques inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct('iIII')
+
+
+def _matches(name: str, suffixes: Tuple[str, ...]) -> bool:
+    return name.endswith(suffixes)
+
+
+class InotifyWatcher:
+    """Surveillance récursive par inotify (Linux)"""
+
+    def __init__(self, dirs: Iterable, suffixes: Tuple[str, ...] = ('.html',)):
+        self.suffixes = suffixes
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        self._dirs: Dict[int, str] = {}
+        try:
+            for directory in dirs:
+                if os.path.isdir(directory):
+                    self._add_tree(str(directory))
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, root: str):
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                # ENOSPC : limite fs.inotify.max_user_watches atteinte
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch {dirpath}')
+            self._dirs[wd] = dirpath
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', errors='surrogateescape')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                directory = self._dirs.get(wd)
+                if directory is None or mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_MOVED_FROM | IN_DELETE):
+                        # Dossier retiré d'un bloc : son contenu n'est pas détaillé
+                        return None
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # Nouveau dossier : on le surveille et on signale son contenu
+                        self._add_tree(path)
+                        changed.update(str(p) for p in Path(path).rglob('*') if _matches(p.name, self.suffixes))
+                    continue
+                if name and _matches(name, self.suffixes):
+                    changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """Scrutation périodique (taille, date de modification) : repli portable"""
+
+    def __init__(self, dirs: Iterable, suffixes: Tuple[str, ...] = ('.html',), interval: float = 0.5):
+        self.dirs = [str(d) for d in dirs]
+        self.suffixes = suffixes
+        self.interval = interval
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        for root in self.dirs:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                for name in filenames:
+                    if _matches(name, self.suffixes):
+                        path = os.path.join(dirpath, name)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        state[path] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def close(self):
+        pass
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self._snapshot()
+            changed = {path for path in state.keys() | self._state.keys()
+                       if state.get(path) != self._state.get(path)}
+            self._state = state
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            pause = self.interval if deadline is None else min(self.interval, max(deadline - time.monotonic(), 0))
+            time.sleep(pause)
+
+
+def make_watcher(dirs: List, suffixes: Tuple[str, ...] = ('.html',), polling: bool = False,
+                 interval: float = 0.5):
+    """inotify si disponible, sinon scrutation"""
+    if not polling and hasattr(os, 'O_CLOEXEC'):
+        try:
+            return InotifyWatcher(dirs, suffixes)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(dirs, suffixes, interval)
+
+
+def collect(watcher, quiet: float = 0.15, max_wait: float = 2.0,
+            timeout: Optional[float] = None) -> Optional[Set[str]]:
+    """
+    Attend un premier changement puis prolonge la collecte tant que d'autres
+    arrivent à moins de `quiet` secondes d'intervalle (au plus `max_wait`).
+    Retourne l'ensemble des chemins (vide si `timeout` expire, None si tout est
+    à rescanner).
+    """
+    changed = watcher.wait(timeout)
+    if not changed:
+        return changed
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        more = watcher.wait(quiet)
+        if more is None:
+            return None
+        if not more:
+            break
+        changed |= more
+    return changed
@@ -0,0 +1,110 @@
+"""
+Lecture en flux des exports Search Console (.xlsx).
+
+openpyxl.load_workbook() en mode complet construit le modèle objet de toutes
+les feuilles (Graphique, Requêtes, Pages, ...) même quand une seule sert.
+Ici le classeur est ouvert en lecture seule (flux), seule la feuille demandée
+est matérialisée en tuples de valeurs, et le résultat est mémorisé dans
+.cache/workbooks/ tant que la taille et la date de modification du fichier
+ne changent pas.
+"""
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, List, Tuple
+
+from . import REPO_ROOT
+from .profiling import stage
+
+CACHE_DIR = REPO_ROOT / '.cache' / 'workbooks'
+CACHE_VERSION = 1
+
+Row = Tuple[Any, ...]
+
+
+def _cache_path(path: str):
+    key = hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f'{key}.pickle'
+
+
+def _file_state(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _read_memo(path: str) -> Dict[str, Any]:
+    """Entrée mémorisée du classeur, vide si absente ou périmée"""
+    try:
+        with open(_cache_path(path), 'rb') as f:
+            memo = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        return {}
+    if memo.get('version') != CACHE_VERSION or memo.get('state') != _file_state(path):
+        return {}
+    return memo
+
+
+def _write_memo(path: str, memo: Dict[str, Any]) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    target = _cache_path(path)
+    tmp = target.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        pickle.dump(memo, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+
+
+def _stream_sheet(path: str, sheet: str, min_row: int) -> Tuple[List[str], List[Row]]:
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        names = list(wb.sheetnames)
+        if sheet is None:
+            return names, []
+        if sheet not in names:
+            raise KeyError(f'Worksheet {sheet} does not exist.')
+        rows = []
+        for row in wb[sheet].iter_rows(min_row=min_row, values_only=True):
+            # Les exports s'arrêtent à la première ligne sans clé
+            if not row or row[0] is None:
+                break
+            rows.append(tuple(row))
+    finally:
+        wb.close()
+    # En lecture seule, les cellules vides en fin de ligne peuvent manquer
+    width = max((len(r) for r in rows), default=0)
+    return names, [r + (None,) * (width - len(r)) for r in rows]
+
+
+def sheet_names(path, use_cache: bool = True) -> List[str]:
+    """Noms des feuilles du classeur"""
+    path = str(path)
+    memo = _read_memo(path) if use_cache else {}
+    if 'sheetnames' not in memo:
+        memo.setdefault('sheets', {})
+        with stage('openpyxl'):
+            memo['sheetnames'], _ = _stream_sheet(path, None, 2)
+        if use_cache:
+            memo.update(version=CACHE_VERSION, state=_file_state(path))
+            _write_memo(path, memo)
+    return memo['sheetnames']
+
+
+def load_sheet(path, sheet: str, min_row: int = 2, use_cache: bool = True) -> List[Row]:
+    """
+    Lignes (tuples de valeurs) d'une feuille, à partir de `min_row` et jusqu'à
+    la première ligne dont la première cellule est vide. Lève KeyError si la
+    feuille n'existe pas.
+    """
+    path = str(path)
+    memo = _read_memo(path) if use_cache else {}
+    key = f'{sheet}@{min_row}'
+    sheets = memo.setdefault('sheets', {})
+    if key not in sheets:
+        if 'sheetnames' in memo and sheet not in memo['sheetnames']:
+            raise KeyError(f'Worksheet {sheet} does not exist.')
+        with stage('openpyxl'):
+            memo['sheetnames'], sheets[key] = _stream_sheet(path, sheet, min_row)
+        if use_cache:
+            memo.update(version=CACHE_VERSION, state=_file_state(path))
+            _write_memo(path, memo)
+    return sheets[key]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Scanner d'encodage : UTF-8 invalide, double encodage, contrôles, confusions €/é.
+
+Usage : python tools/scan_encoding.py [fichier ou dossier ...] [-j N] [--json rapport.json]
+        (défaut : src/pages et les dossiers miroirs pages_*, récursif)
+
+Chaque fichier est mappé en mémoire et analysé en une passe vectorisée (voir
+lib.encoding_scan) ; les résultats sont mis en cache par empreinte de fichier
+(.cache/audit/), un nouveau passage ne relit que les pages modifiées. Assez
+rapide pour être lancé à chaque enregistrement, sur un fichier ou sur tous les
+miroirs.
+
+Sortie au format chemin:ligne (cliquable dans l'éditeur) avec la position en
+octets. Code de retour 1 si un défaut critique (UTF-8 invalide, U+FFFD, double
+encodage, caractère de contrôle) est trouvé ; les confusions €/é et le BOM
+sont signalés sans faire échouer.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+from lib import REPO_ROOT
+from lib.cache import AuditCache, rules_fingerprint
+from lib.encoding_scan import CLASSES, CRITICAL, MAX_FINDINGS, scan_file
+from lib.scan import CORPUS_DIRS, scan_files
+
+CACHE_VERSION = 1
+EXTENSIONS = ('.html',)
+
+
+def list_files(targets: List[str]) -> List[str]:
+    """Fichiers donnés tels quels, dossiers parcourus récursivement (.html)"""
+    files = []
+    for target in targets:
+        path = Path(target)
+        if not path.is_absolute():
+            path = (Path.cwd() / path) if path.exists() else REPO_ROOT / path
+        if path.is_file():
+            files.append(str(path))
+        elif path.is_dir():
+            files.extend(str(p) for p in sorted(path.rglob('*'), key=lambda p: p.as_posix())
+                         if p.is_file() and p.suffix in EXTENSIONS)
+    return files
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Détection des problèmes d'encodage au niveau des octets")
+    parser.add_argument('targets', nargs='*', help='fichiers ou dossiers (défaut : src/pages et les miroirs)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='nombre de processus (0 = tous les cœurs, défaut : 1)')
+    parser.add_argument('--json', help='écrit le rapport complet dans ce fichier JSON')
+    parser.add_argument('--limit', type=int, default=10, help='défauts affichés par fichier (défaut : 10)')
+    parser.add_argument('--no-cache', action='store_true', help='ignore le cache des résultats')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    files = list_files(args.targets or CORPUS_DIRS)
+
+    cache = AuditCache('scan_encoding', rules_fingerprint(CACHE_VERSION, CLASSES, MAX_FINDINGS),
+                       enabled=not args.no_cache, by_content=True)
+    results = [cache.get(path) for path in files]
+    dirty = [i for i, result in enumerate(results) if result is None]
+    groups = cache.group_pending([files[i] for i in dirty])
+    for group, result in zip(groups, scan_files([files[dirty[g[0]]] for g in groups], scan_file, args.jobs)):
+        for j in group:
+            results[dirty[j]] = result
+            cache.put(files[dirty[j]], result)
+    cache.save()
+    elapsed = time.perf_counter() - start
+
+    totals = Counter()
+    affected = 0
+    for path, result in zip(files, results):
+        if not result['counts']:
+            continue
+        affected += 1
+        totals.update(result['counts'])
+        shown = os.path.relpath(path)
+        summary = ', '.join(f'{name} ×{count}' for name, count in result['counts'].items())
+        print(f"{shown} : {summary}")
+        for name, offset, line, snippet in result['findings'][:args.limit]:
+            print(f"  {shown}:{line}: [{name}] octet {offset} : {snippet}")
+        if len(result['findings']) > args.limit:
+            print(f"  ... {len(result['findings']) - args.limit} autres")
+
+    if args.json:
+        report = {
+            'files': len(files),
+            'totals': dict(totals),
+            'results': {os.path.relpath(path, REPO_ROOT): result
+                        for path, result in zip(files, results) if result['counts']},
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    size = sum(result['size'] for result in results)
+    print(f"\n{len(files)} fichiers ({size / 1e6:.1f} Mo) en {elapsed:.2f} s "
+          f"({len(groups)} analysés, {len(files) - len(groups)} depuis le cache ou partagés)")
+    if not totals:
+        print("✅ Aucun problème d'encodage")
+        return
+    print(f"{affected} fichier(s) concerné(s) : " + ', '.join(f'{name} {totals[name]}' for name in CLASSES if totals[name]))
+    if any(totals[name] for name in CRITICAL):
+        print("❌ Défauts d'encodage critiques")
+        sys.exit(1)
+    print("⚠️ Avertissements uniquement")
+
+
+if __name__ == '__main__':
+    main()
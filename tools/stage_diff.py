@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Ce qu'une étape du pipeline a changé : diff structurel entre deux dossiers de pages.
+
+Usage : python tools/stage_diff.py pages_YMYL_FINAL_V2 pages_SIMULATEURS_PLUS
+        python tools/stage_diff.py pages_YMYL_SAFE pages_SCHEMA_FINAL -j 4 --json reports/schema.json
+
+Les pages sont appariées au suffixe d'étape près (_SIMULATEURS_PLUS), les
+pages identiques (même empreinte) sont écartées sans être relues et les
+autres sont comparées en parallèle sur le JSON-LD, le texte visible et les
+liens (voir lib/stage_diff.py). La console affiche les motifs de
+modification (pages transformées de la même façon) ; le rapport JSON
+(reports/stage-diff-report.json par défaut) contient le détail par page.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from lib import REPO_ROOT
+from lib.blob_store import BlobStore, stage_name
+from lib.profiling import add_profile_argument, enable_from_args, stage
+from lib.scan import scan_files
+from lib.stage_diff import changed_regions, describe, diff_pages, group_patterns, pair_files, signature, tree_digests
+
+DEFAULT_REPORT = REPO_ROOT / 'reports' / 'stage-diff-report.json'
+
+
+def resolve_dir(target: str) -> Path:
+    path = Path(target)
+    if not path.is_absolute() and not path.exists():
+        path = REPO_ROOT / path
+    if not path.is_dir():
+        sys.exit(f"❌ Dossier introuvable : {target}")
+    return path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Diff structurel entre deux dossiers d'étape du pipeline")
+    parser.add_argument('old', help="dossier de l'étape d'origine (ex. pages_YMYL_FINAL_V2)")
+    parser.add_argument('new', help="dossier de l'étape produite (ex. pages_SIMULATEURS_PLUS)")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="nombre de processus (0 = tous les cœurs, 1 = séquentiel)")
+    parser.add_argument('--json', default=str(DEFAULT_REPORT),
+                        help="rapport détaillé (défaut : reports/stage-diff-report.json)")
+    parser.add_argument('--patterns', type=int, default=10, help="motifs affichés (défaut : 10)")
+    parser.add_argument('--lines', type=int, default=6, help="lignes de détail par motif (défaut : 6)")
+    add_profile_argument(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    enable_from_args(args)
+    start = time.perf_counter()
+    old_dir, new_dir = resolve_dir(args.old), resolve_dir(args.new)
+
+    with stage('empreintes'):
+        store = BlobStore()
+        old_digests, new_digests = tree_digests(old_dir, store), tree_digests(new_dir, store)
+    pairs, only_old, only_new = pair_files(old_digests, new_digests)
+    changed = [(o, n) for o, n in pairs if old_digests[o] != new_digests[n]]
+
+    with stage('diff'):
+        diffs = scan_files([(str(old_dir / o), str(new_dir / n)) for o, n in changed], diff_pages, jobs=args.jobs)
+
+    with stage('agrégation'):
+        pages = []
+        for (o, n), result in zip(changed, diffs):
+            pages.append({'old': o, 'new': n, 'regions': changed_regions(result), 'summary': describe(result),
+                          'signature': signature(result), 'diff': result})
+        patterns = group_patterns(pages)
+        regions = {region: sum(region in page['regions'] for page in pages) for region in ('jsonld', 'texte', 'liens')}
+        counts = {
+            'old_files': len(old_digests),
+            'new_files': len(new_digests),
+            'paired': len(pairs),
+            'renamed': sum(o != n for o, n in pairs),
+            'identical': len(pairs) - len(changed),
+            'changed': len(changed),
+            'markup_only': sum(not page['regions'] for page in pages),
+            'only_old': len(only_old),
+            'only_new': len(only_new),
+        }
+    elapsed = time.perf_counter() - start
+
+    with stage('rapport'):
+        report = {
+            'old': stage_name(old_dir),
+            'new': stage_name(new_dir),
+            'generated': datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z'),
+            'elapsed': round(elapsed, 3),
+            'counts': counts,
+            'regions': regions,
+            'patterns': patterns,
+            'only_old': only_old,
+            'only_new': only_new,
+            'pages': pages,
+        }
+        output = Path(args.json)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+
+    print(f"🔎 {report['old']} -> {report['new']}")
+    print(f"   {counts['paired']} pages appariées ({counts['renamed']} renommées), "
+          f"{counts['identical']} identiques, {counts['changed']} modifiées")
+    if only_old or only_new:
+        print(f"   {len(only_old)} seulement dans {report['old']}, {len(only_new)} seulement dans {report['new']}")
+    if pages:
+        print(f"   Régions : JSON-LD {regions['jsonld']}, texte {regions['texte']}, liens {regions['liens']}, "
+              f"balisage seul {counts['markup_only']}")
+        print(f"\n{len(patterns)} motif(s) de modification :")
+        for pattern in patterns[:args.patterns]:
+            n = len(pattern['pages'])
+            print(f"\n  [{n} page{'s' if n > 1 else ''}] {pattern['summary']}")
+            print(f"    ex. {pattern['example']}")
+            for line in pattern['detail'][:args.lines]:
+                print(f"      {line}")
+        if len(patterns) > args.patterns:
+            rest = patterns[args.patterns:]
+            print(f"\n  ... {len(rest)} autres motifs ({sum(len(p['pages']) for p in rest)} pages)")
+    for label, paths in ((report['old'], only_old), (report['new'], only_new)):
+        if paths:
+            print(f"\nSeulement dans {label} : " + ', '.join(paths[:5]) + (' ...' if len(paths) > 5 else ''))
+    print(f"\n✅ Rapport : {output} ({elapsed:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Stockage adressé par contenu des dossiers d'étape du pipeline (voir lib/blob_store.py).
+
+Usage : python tools/stage_store.py snapshot [dossier ...]     (défaut : src/pages et pages_*)
+        python tools/stage_store.py dedupe [dossier ...]       (snapshot + copies à la demande)
+        python tools/stage_store.py checkout <étape> [--to DOSSIER] [--prune]
+        python tools/stage_store.py status | verify [étape ...] | diff <étape> <étape> | gc
+
+`snapshot` range les pages dans .cache/blobs et écrit le manifeste de chaque
+étape sans toucher aux dossiers. `dedupe` remplace ensuite chaque fichier par
+une copie à la demande (reflink) de son blob : les pages identiques d'une
+étape à l'autre partagent leurs blocs sur le disque, et une page réécrite sur
+place par un script ne modifie qu'elle-même. Sur un système de fichiers sans
+reflink (ext4, NTFS...), dedupe se limite au snapshot : les dossiers restent
+des fichiers ordinaires et les blobs s'y ajoutent, l'espace disque augmente
+au lieu de baisser (les octets écrits sont affichés). `checkout` reconstruit
+une étape (ou l'écrit ailleurs) en n'écrivant que les fichiers qui diffèrent.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from lib import REPO_ROOT
+from lib.blob_store import BlobStore, diff_manifests, stage_name
+from lib.scan import CORPUS_DIRS
+
+
+def default_dirs():
+    return [REPO_ROOT / d for d in CORPUS_DIRS if (REPO_ROOT / d).is_dir()]
+
+
+def mb(size: int) -> str:
+    return f'{size / 1e6:.1f} Mo'
+
+
+def cmd_snapshot(store: BlobStore, args, share: bool = False):
+    start = time.perf_counter()
+    shared = False
+    for directory in [Path(d) for d in args.dirs] or default_dirs():
+        if not directory.is_dir():
+            print(f"⚠️  {directory} introuvable")
+            continue
+        manifest, hashed = store.snapshot(directory, parent=args.parent)
+        line = f"  {manifest['name']:28s} {len(manifest['files']):5d} fichiers, {hashed} relus"
+        if share:
+            if store.supports_reflink(directory):
+                counts = store.checkout(manifest['name'])
+                line += f", {counts['written']} partagés"
+                shared = True
+            else:
+                line += ", inchangé (pas de reflink sur ce système de fichiers)"
+        print(line)
+    usage = store.usage()
+    print(f"Étapes : {mb(usage['logical_bytes'])} | blobs distincts : {usage['blobs']} "
+          f"({mb(usage['referenced_bytes'])}) | {time.perf_counter() - start:.2f}s")
+    print(f"Blobs écrits : {mb(store.bytes_written)} dans {store.objects}"
+          + ("" if shared else " (en plus des dossiers, aucun bloc partagé)"))
+
+
+def cmd_checkout(store: BlobStore, args):
+    try:
+        counts = store.checkout(args.stage, args.to, prune=args.prune)
+    except KeyError as e:
+        sys.exit(f"❌ {e.args[0]}")
+    print(f"{args.stage} : {counts['written']} écrits, {counts['unchanged']} inchangés, "
+          f"{counts['removed']} retirés")
+
+
+def cmd_status(store: BlobStore, args):
+    usage = store.usage()
+    if not usage['stages']:
+        print("Aucune étape enregistrée (python tools/stage_store.py snapshot)")
+        return
+    print(f"{'étape':28s} {'fichiers':>8s} {'taille':>10s} {'parent'}")
+    for stage in usage['stages']:
+        print(f"{stage['name']:28s} {stage['files']:8d} {mb(stage['bytes']):>10s} {stage['parent'] or ''}")
+    saved = usage['logical_bytes'] - usage['referenced_bytes']
+    print(f"\nTaille des étapes : {mb(usage['logical_bytes'])}")
+    print(f"Contenu distinct  : {mb(usage['referenced_bytes'])} ({usage['blobs']} blobs, "
+          f"{saved / usage['logical_bytes'] * 100 if usage['logical_bytes'] else 0:.0f} % partagé)")
+    print(f"Stockage          : {mb(usage['stored_bytes'])} (blobs non référencés : tools/stage_store.py gc)")
+
+
+def cmd_verify(store: BlobStore, args):
+    names = args.stages or [manifest['name'] for manifest in store.manifests()]
+    failed = False
+    for name in names:
+        try:
+            report = store.verify(name)
+        except KeyError as e:
+            sys.exit(f"❌ {e.args[0]}")
+        problems = {kind: paths for kind, paths in report.items() if paths}
+        if not problems:
+            print(f"✅ {name}")
+            continue
+        failed = True
+        print(f"❌ {name} : " + ', '.join(f"{len(paths)} {kind}" for kind, paths in problems.items()))
+        for kind, paths in problems.items():
+            for path in paths[:args.limit]:
+                print(f"    {kind:14s} {path}")
+    if failed:
+        sys.exit(1)
+
+
+def cmd_diff(store: BlobStore, args):
+    manifests = [store.read_manifest(stage_name(REPO_ROOT / name)) or store.read_manifest(name)
+                 for name in (args.old, args.new)]
+    for name, manifest in zip((args.old, args.new), manifests):
+        if manifest is None:
+            sys.exit(f"❌ Étape inconnue : {name}")
+    diff = diff_manifests(*manifests)
+    print(f"{args.old} -> {args.new} : {len(diff['changed'])} modifiés, {len(diff['added'])} ajoutés, "
+          f"{len(diff['removed'])} supprimés, {len(diff['unchanged'])} identiques")
+    for kind, sign in (('changed', '~'), ('added', '+'), ('removed', '-')):
+        for path in diff[kind][:args.limit]:
+            print(f"  {sign} {path}")
+
+
+def cmd_gc(store: BlobStore, args):
+    removed, size = store.gc()
+    print(f"{removed} blobs supprimés ({mb(size)})")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stockage adressé par contenu des étapes du pipeline")
+    parser.add_argument('--store', help="dossier du stockage (défaut : .cache/blobs)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('snapshot', "enregistre les dossiers sans les modifier"),
+                            ('dedupe', "enregistre puis remplace les fichiers par des copies à la demande "
+                                       "(reflink : btrfs, XFS...). Sans reflink (ext4, NTFS) les dossiers "
+                                       "ne changent pas et les blobs s'ajoutent à l'espace disque")):
+        command = sub.add_parser(name, help=help_text, description=help_text)
+        command.add_argument('dirs', nargs='*', help="dossiers (défaut : src/pages et pages_*)")
+        command.add_argument('--parent', help="étape d'origine à noter dans le manifeste")
+    checkout = sub.add_parser('checkout', help="matérialise une étape")
+    checkout.add_argument('stage')
+    checkout.add_argument('--to', help="dossier cible (défaut : celui de l'étape)")
+    checkout.add_argument('--prune', action='store_true', help="retire les fichiers absents du manifeste")
+    sub.add_parser('status', help="taille des étapes et du stockage")
+    verify = sub.add_parser('verify', help="compare les dossiers à leur manifeste")
+    verify.add_argument('stages', nargs='*')
+    verify.add_argument('--limit', type=int, default=10)
+    diff = sub.add_parser('diff', help="fichiers modifiés entre deux étapes (par empreinte)")
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--limit', type=int, default=20)
+    sub.add_parser('gc', help="supprime les blobs qu'aucune étape ne référence")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = BlobStore(args.store)
+    if args.command == 'snapshot':
+        cmd_snapshot(store, args)
+    elif args.command == 'dedupe':
+        cmd_snapshot(store, args, share=True)
+    elif args.command == 'checkout':
+        cmd_checkout(store, args)
+    elif args.command == 'status':
+        cmd_status(store, args)
+    elif args.command == 'verify':
+        cmd_verify(store, args)
+    elif args.command == 'diff':
+        cmd_diff(store, args)
+    elif args.command == 'gc':
+        cmd_gc(store, args)
+
+
+if __name__ == '__main__':
+    main()
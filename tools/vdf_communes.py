@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Requêtes sur le fichier VDF par commune (revenus disponibles, quartiles).
+
+Usage : python tools/vdf_communes.py --code 75056 69123
+        python tools/vdf_communes.py --top 20 --by mediane [--lowest]
+        python tools/vdf_communes.py --convert [--csv vdf/revenu-des-francais-a-la-commune-XXX.csv]
+
+Le CSV est converti une fois en colonnes numpy (.cache/vdf/, voir
+lib.vdf_store) puis lu en mémoire mappée : une fiche commune ou un top 20 sur
+toutes les communes prend quelques millisecondes.
+"""
+import argparse
+import json
+import sys
+import time
+
+from lib.vdf_store import VdfStore, convert, find_vdf_csv
+
+COLUMNS = ('code', 'nom', 'mediane', 'q1', 'q3')
+
+
+def _number(value) -> str:
+    return 'n.d.' if value is None else f'{value:,.0f}'.replace(',', ' ')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fiches et classements des communes (fichier VDF)')
+    parser.add_argument('--csv', help='export VDF (défaut : le plus récent de vdf/)')
+    parser.add_argument('--code', nargs='+', default=[], help='codes géographiques à afficher')
+    parser.add_argument('--top', type=int, default=0, help='nombre de communes à classer')
+    parser.add_argument('--by', default='mediane', help='colonne de classement (alias ou en-tête, défaut : mediane)')
+    parser.add_argument('--lowest', action='store_true', help='classe par valeurs croissantes')
+    parser.add_argument('--convert', action='store_true', help='force la reconversion du CSV')
+    parser.add_argument('--json', action='store_true', help='sortie JSON')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    try:
+        if args.convert:
+            csv_path = args.csv or find_vdf_csv()
+            if csv_path is None:
+                raise FileNotFoundError('Export VDF introuvable dans vdf/')
+            convert(csv_path)
+        vdf = VdfStore.ensure(args.csv)
+    except FileNotFoundError as e:
+        sys.exit(f'❌ {e}')
+    opened = time.perf_counter() - start
+
+    result = {'communes': {}, 'top': []}
+    for code in args.code:
+        result['communes'][code] = vdf.record(code, [c for c in COLUMNS if vdf.has(c)])
+    if args.top:
+        try:
+            values = vdf.column(args.by)
+        except KeyError as e:
+            sys.exit(f'❌ {e.args[0]}')
+        if values.dtype.kind != 'f':
+            sys.exit(f'❌ Colonne non numérique : {args.by}')
+        for row in VdfStore.top_k(values, args.top, largest=not args.lowest):
+            entry = {c: str(vdf.column(c)[row]) for c in ('code', 'nom') if vdf.has(c)}
+            entry[args.by] = float(values[row])
+            result['top'].append(entry)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+
+    print(f"Fichier VDF : {vdf.manifest['source']['name']} ({len(vdf)} communes), ouvert en {opened * 1000:.1f} ms")
+    for code, record in result['communes'].items():
+        if record is None:
+            print(f"\n{code} : commune introuvable")
+            continue
+        print(f"\n{code} {record.get('nom', '')}")
+        for name, value in record.items():
+            if name not in ('code', 'nom'):
+                print(f"  {name:10s} {_number(value)}")
+    if result['top']:
+        order = 'plus basses' if args.lowest else 'plus hautes'
+        print(f"\nTop {len(result['top'])} ({args.by}, valeurs les {order}) :")
+        for i, entry in enumerate(result['top'], 1):
+            print(f"  {i:3d}. {entry.get('code', ''):6s} {entry.get('nom', ''):40s} {_number(entry[args.by]):>10s}")
+    print(f"\nRequêtes traitées en {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
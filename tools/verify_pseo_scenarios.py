@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Vérification des montants affichés par les pages pSEO (RSA, APL, impôt).
+
+Usage : python tools/verify_pseo_scenarios.py [--output rapport.json] [--verbose]
+
+Les entrées de chaque scénario (data/pseo/*-scenarios.js) sont rassemblées en
+tableaux, puis recalculées en un seul passage vectorisé par calculateur avec
+les moteurs de référence (lib.reference_engines, copie NumPy des moteurs TS).
+Le résultat est comparé au montant « … autour de ~… » de la page générée
+(src/pages/<calculateur>/<slug>.html). À relancer après chaque mise à jour de
+social-baremes.ts ou du barème IR : une page non régénérée apparaît en écart.
+
+Code de sortie 1 si au moins un écart est trouvé.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lib import REPO_ROOT
+from lib.reference_engines import ReferenceEngines
+from lib.ts_constants import evaluate_file
+
+SCENARIOS_DIR = REPO_ROOT / 'data' / 'pseo'
+PAGES_DIR = REPO_ROOT / 'src' / 'pages'
+
+# calculateur -> (fichiers de scénarios, dossier des pages, méthode, champ du résultat)
+CALCULATEURS = {
+    'rsa': (('rsa-pilot-scenarios.js', 'rsa-absence-revenu-scenarios.js'), 'rsa', 'rsa', 'montantEstime'),
+    'apl': (('apl-pilot-scenarios.js', 'apl-absence-revenu-scenarios.js'), 'apl', 'apl', 'apl_estimee'),
+    'impot': (('impot-pilot-scenarios.js',), 'impot', 'ir', 'irBrut'),
+}
+
+# Montant affiché dans le bloc résultat des pages générées :
+#   « Montant indicatif autour de ~1&#8239;173,04 &#8364; »
+#   « Estimation indicative autour de ~320, 00 &#8364; »
+#   « Montant indicatif autour de <strong>~3&#8239;906 EUR</strong> »
+#   « Estimation indicative : ~0, 00 &#8364; » (montant nul)
+STATED_RE = re.compile(
+    r'(?:Montant indicatif|Estimation indicative) (?:autour de|:)\s*(?:<strong>)?~'
+    r'((?:[-\d\s.,]|&#8239;|&nbsp;|&#160;)+?)\s*(?:&#8364;|&euro;|€|EUR)')
+_SPACES_RE = re.compile(r'\s|&#8239;|&nbsp;|&#160;')
+
+TOLERANCE = 0.005
+
+
+def parse_stated(raw: str) -> Optional[float]:
+    """« 1&#8239;173,04 » -> 1173.04 ; None si illisible"""
+    compact = _SPACES_RE.sub('', raw).replace(',', '.')
+    try:
+        return float(compact)
+    except ValueError:
+        return None
+
+
+def load_scenarios(files) -> List[Dict]:
+    """Scénarios exportés par les fichiers (toutes constantes exportées, dans l'ordre)"""
+    scenarios = []
+    for name in files:
+        for value in evaluate_file(str(SCENARIOS_DIR / name)).values():
+            if isinstance(value, list):
+                scenarios.extend(s for s in value if isinstance(s, dict) and 'slug' in s)
+    return scenarios
+
+
+def stated_amount(path) -> Optional[str]:
+    if not path.exists():
+        return None
+    match = STATED_RE.search(path.read_text(encoding='utf-8', errors='replace'))
+    return match.group(1) if match else None
+
+
+def verify(engines: ReferenceEngines, name: str) -> Dict:
+    files, folder, method, field = CALCULATEURS[name]
+    scenarios = load_scenarios(files)
+    results = getattr(engines, method)([s.get('input') or {} for s in scenarios])
+    expected = results[field]
+    if method == 'ir':
+        # La page arrondit l'impôt à l'euro (Math.round)
+        expected = np.floor(expected + 0.5)
+
+    mismatches, missing = [], []
+    for i, scenario in enumerate(scenarios):
+        page = PAGES_DIR / folder / f"{scenario['slug']}.html"
+        relpath = page.relative_to(REPO_ROOT).as_posix()
+        if not results['valid'][i]:
+            missing.append({'page': relpath, 'reason': 'entrées invalides pour le moteur'})
+            continue
+        raw = stated_amount(page)
+        if raw is None:
+            reason = 'page absente' if not page.exists() else 'montant affiché introuvable'
+            missing.append({'page': relpath, 'reason': reason})
+            continue
+        stated = parse_stated(raw)
+        if stated is None or abs(stated - expected[i]) > TOLERANCE:
+            mismatches.append({
+                'page': relpath,
+                'input': scenario.get('input'),
+                'expected': round(float(expected[i]), 2),
+                'stated': stated if stated is not None else raw,
+            })
+    return {'scenarios': len(scenarios), 'mismatches': mismatches, 'missing': missing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recalcule les scénarios pSEO et compare aux pages générées')
+    parser.add_argument('--output', help='écrit le rapport JSON dans ce fichier')
+    parser.add_argument('--verbose', action='store_true', help='détaille les pages sans montant vérifiable')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engines = ReferenceEngines()
+    report = {name: verify(engines, name) for name in CALCULATEURS}
+    elapsed = time.perf_counter() - start
+
+    total = sum(r['scenarios'] for r in report.values())
+    errors = sum(len(r['mismatches']) for r in report.values())
+    print(f"Scénarios pSEO recalculés : {total} en {elapsed:.2f}s")
+    for name, result in report.items():
+        ok = result['scenarios'] - len(result['mismatches']) - len(result['missing'])
+        print(f"\n{name.upper()} : {ok}/{result['scenarios']} conformes, "
+              f"{len(result['mismatches'])} écart(s), {len(result['missing'])} non vérifiable(s)")
+        for item in result['mismatches']:
+            print(f"  ❌ {item['page']} : attendu {item['expected']}, affiché {item['stated']}  {item['input']}")
+        if args.verbose:
+            for item in result['missing']:
+                print(f"  ⚠️ {item['page']} : {item['reason']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nRapport : {args.output}")
+
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
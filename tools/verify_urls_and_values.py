@@ -2,46 +2,48 @@
 """
 Vérification complète : URLs sources et valeurs des barèmes
 Compare nos données (social-baremes.ts) avec les vrais sites officiels.
+
+Options :
+  --offline DIR   rejoue les réponses enregistrées dans DIR (serveur HTTP local)
+  --record DIR    enregistre les réponses téléchargées dans DIR
+  --no-cache      ignore le cache HTTP (.cache/http)
+  --self-check    vérifie la couche de téléchargement hors ligne sur tools/fixtures/urls
+                  (ou sur --offline DIR) : 200, revalidation 304, 404, 5xx, nouvelles tentatives
 """
-import urllib.request
-import urllib.error
+import argparse
 import ssl
 import re
 import sys
 import json
 from datetime import datetime
 
+from lib.amount_index import format_cents, iter_amounts
+from lib.fetch import Fetcher, ResponseCache
+from lib.http_stub import FIXTURES_DIR, FixtureServer, record_fixture, self_check
+
 ssl_ctx = ssl.create_default_context()
 ssl_ctx.check_hostname = False
 ssl_ctx.verify_mode = ssl.CERT_NONE
 
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36'
 
-def fetch(url, timeout=15):
-    """Fetch URL and return decoded text."""
-    try:
-        req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
-        with urllib.request.urlopen(req, timeout=timeout, context=ssl_ctx) as resp:
-            content = resp.read()
-            # Try UTF-8 first, then latin-1
-            try:
-                return resp.status, content.decode('utf-8')
-            except UnicodeDecodeError:
-                return resp.status, content.decode('latin-1', errors='replace')
-    except urllib.error.HTTPError as e:
-        return e.code, f"HTTP {e.code}"
-    except urllib.error.URLError as e:
-        return 0, f"URL Error: {e.reason}"
-    except Exception as e:
-        return 0, f"ERROR: {type(e).__name__}: {e}"
+def fetch_all(urls, args):
+    """Télécharge toutes les URLs en parallèle (ou depuis les fixtures en mode --offline)."""
+    options = dict(per_host=args.per_host, timeout=15, user_agent=USER_AGENT, ssl_context=ssl_ctx)
+    if args.offline:
+        with FixtureServer(args.offline) as server:
+            return Fetcher(resolve=server.url_for, **options).fetch_all_sync(urls)
+    cache = None if args.no_cache else ResponseCache()
+    results = Fetcher(cache=cache, **options).fetch_all_sync(urls)
+    if args.record:
+        for url, result in results.items():
+            record_fixture(args.record, url, result)
+    return results
 
 def extract_numbers(text):
-    """Extract money amounts (X XXX,XX or X.XX) from text."""
-    nums = re.findall(r'(\d{1,3}(?:\s?\d{3})*[,.]\d{2})\s*(?:€|EUR|euro)', text)
-    clean = []
-    for n in nums:
-        clean.append(n.replace(' ', ''))
-    return clean
+    """Extract money amounts (X XXX,XX, X.XX or X €) from text, normalised as « 1173,04 »."""
+    return [format_cents(cents).replace(' ', '')
+            for cents, _, _, euro in iter_amounts(text.encode('utf-8')) if euro]
 
 def extract_percent(text):
     """Extract percentage values."""
@@ -137,6 +139,23 @@ TESTS = [
     },
 ]
 
+parser = argparse.ArgumentParser(description="Vérification des URLs sources et valeurs officielles")
+parser.add_argument('--offline', metavar='DIR', help="Rejouer les réponses enregistrées dans DIR")
+parser.add_argument('--record', metavar='DIR', help="Enregistrer les réponses dans DIR")
+parser.add_argument('--no-cache', action='store_true', help="Ignorer le cache HTTP")
+parser.add_argument('--per-host', type=int, default=2, help="Requêtes simultanées par hôte")
+parser.add_argument('--self-check', action='store_true',
+                    help="Vérifier le téléchargement hors ligne sur les fixtures (tools/fixtures/urls)")
+args = parser.parse_args()
+
+if args.self_check:
+    checks = self_check(args.offline or FIXTURES_DIR)
+    for label, ok, detail in checks:
+        print(f"{'✅' if ok else '❌'} {label} ({detail})")
+    failed = sum(not ok for _, ok, _ in checks)
+    print(f"\n{len(checks) - failed}/{len(checks)} vérifications réussies")
+    sys.exit(1 if failed else 0)
+
 print("=" * 80)
 print("VÉRIFICATION DES URLS SOURCES ET VALEURS OFFICIELLES")
 print(f"Date : {datetime.now().strftime('%d/%m/%Y %H:%M')}")
@@ -148,12 +167,15 @@ ko_urls = 0
 value_matches = 0
 value_misses = 0
 
+# Toutes les URLs sont téléchargées une seule fois, en parallèle ; le rapport réutilise ces résultats
+responses = fetch_all([test['url'] for test in TESTS], args)
+
 for i, test in enumerate(TESTS):
     print(f"\n📋 Test {i+1}/{len(TESTS)} : {test['name']}")
     print(f"   URL : {test['url']}")
     print(f"   Notre valeur : {test['our_value']}")
 
-    status, content = fetch(test['url'])
+    status, content = responses[test['url']][:2]
 
     if status and status != 200 and isinstance(status, int):
         if status >= 400:
@@ -213,7 +235,7 @@ print(f"Valeurs non confirmées : {value_misses}")
 if ko_urls > 0:
     print("\n⚠️ URLs à vérifier/corriger :")
     for test in TESTS:
-        status, _ = fetch(test["url"])
+        status = responses[test["url"]].status
         if isinstance(status, int) and status >= 400:
             print(f"   • {test['name']} → {test['url']} (HTTP {status})")
         elif isinstance(status, int) and status == 0:
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Audit continu des pages pendant l'édition.
+
+Usage : python tools/watch_pages.py [dossier ...] [--json findings.json] [--html findings.html]
+        python tools/watch_pages.py --once --json findings.json      (un passage puis sortie)
+
+Surveille src/pages et les miroirs pages_* (inotify, repli par scrutation avec
+--polling ou quand inotify est indisponible, voir lib.watch). Au démarrage
+toutes les pages sont analysées (résultats repris du cache .cache/audit/ pour
+les fichiers inchangés) ; ensuite chaque rafale d'enregistrements est
+regroupée puis seules les pages modifiées sont réanalysées, et seulement par
+les vérifications qui les concernent :
+
+- verify_all : critiques, grammaire, montants, espacements (dossiers de verify_all.py) ;
+- meta       : title, meta description, noindex (src/pages, comme audit-meta-tags.py) ;
+- faq        : FAQPage déclarée en JSON-LD et en microdonnées (find_faq_duplicates.py) ;
+- encodage   : UTF-8 invalide, double encodage, confusions €/é (scan_encoding.py).
+
+Le tableau des résultats reste en mémoire ; --json et --html le réécrivent
+(atomiquement) après chaque lot, la page HTML se rafraîchit seule.
+"""
+import argparse
+import html
+import json
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from lib import REPO_ROOT
+from lib.cache import AuditCache, rules_fingerprint
+from lib.encoding_scan import CLASSES as ENCODING_CLASSES, CRITICAL as ENCODING_CRITICAL, scan_content
+from lib.page_index import FAQ_JSONLD_RE, FAQ_MICRODATA_RE, extract_fields
+from lib.scan import CORPUS_DIRS, decode_page, scan_files
+from lib.watch import collect, make_watcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import verify_all  # noqa: E402
+
+CACHE_VERSION = 1
+SEVERITIES = ('CRITICAL', 'WARNING', 'INFO')
+META_SCOPE = 'src/pages/'
+
+
+def _relative(path: str) -> str:
+    return os.path.relpath(path, REPO_ROOT).replace(os.sep, '/')
+
+
+def _delta(value: int) -> str:
+    return f' ({value:+d})' if value else ''
+
+
+def check_verify_all(path: str, content_bytes: bytes, text: str) -> List[list]:
+    findings = [[severity, name, count] for severity, name, count in
+                verify_all.check_critical_errors(path, content_bytes)]
+    for check in (verify_all.check_grammar, verify_all.check_montants, verify_all.check_espacements):
+        findings.extend([severity, f'{category} : {message}', count]
+                        for severity, message, count, category in check(path, text))
+    return findings
+
+
+def check_meta(path: str, content_bytes: bytes, text: str) -> List[list]:
+    fields = extract_fields(text)
+    findings = []
+    if not (fields['title'] or '').strip():
+        findings.append(['WARNING', 'title absent', 1])
+    if not fields['description']:
+        findings.append(['WARNING', 'meta description absente', 1])
+    if 'noindex' in (fields['robots'] or ''):
+        findings.append(['WARNING', 'noindex', 1])
+    return findings
+
+
+def check_faq(path: str, content_bytes: bytes, text: str) -> List[list]:
+    if FAQ_JSONLD_RE.search(text) and FAQ_MICRODATA_RE.search(text):
+        return [['WARNING', 'FAQPage en double (JSON-LD et microdonnées)', 1]]
+    return []
+
+
+def check_encoding(path: str, content_bytes: bytes, text: str) -> List[list]:
+    result = scan_content(content_bytes)
+    findings = []
+    for name, count in result['counts'].items():
+        first = next(f for f in result['findings'] if f[0] == name)
+        severity = 'CRITICAL' if name in ENCODING_CRITICAL else 'WARNING'
+        findings.append([severity, f'{name} ligne {first[2]} (octet {first[1]}) : {first[3]}', count])
+    return findings
+
+
+# nom -> (concerne(chemin relatif), vérification, a besoin du texte décodé)
+CHECKS = {
+    'verify_all': (lambda rel: os.path.dirname(rel) in verify_all.dirs, check_verify_all, True),
+    'meta': (lambda rel: rel.startswith(META_SCOPE), check_meta, True),
+    'faq': (lambda rel: True, check_faq, True),
+    'encodage': (lambda rel: True, check_encoding, False),
+}
+
+
+def run_checks(path: str) -> Dict[str, List[list]]:
+    """Résultats de chaque vérification concernée par la page (page lue une seule fois)"""
+    rel = _relative(path)
+    content_bytes, text, error = None, None, None
+    try:
+        with open(path, 'rb') as f:
+            content_bytes = f.read()
+        text = decode_page(content_bytes)
+    except (OSError, UnicodeDecodeError) as e:
+        # Fichier retiré entre l'événement et la lecture (enregistrement atomique
+        # d'un éditeur), droits insuffisants, UTF-8 invalide : le watcher continue
+        error = [['CRITICAL', f'Erreur lecture: {e}', 1]]
+    results = {}
+    for name, (applies, check, needs_text) in CHECKS.items():
+        if not applies(rel):
+            continue
+        if content_bytes is None or (needs_text and text is None):
+            results[name] = error
+        else:
+            results[name] = check(path, content_bytes, text)
+    return results
+
+
+class FindingsTable:
+    """Résultats courants par page : {chemin relatif: {vérification: [[gravité, message, nombre], ...]}}"""
+
+    def __init__(self):
+        self.pages: Dict[str, Dict[str, List[list]]] = {}
+        self.updated_at: Optional[str] = None
+
+    def update(self, rel: str, results: Optional[Dict[str, List[list]]]):
+        if results is None:
+            self.pages.pop(rel, None)
+        else:
+            self.pages[rel] = results
+        self.updated_at = datetime.now().isoformat(timespec='seconds')
+
+    def counts(self, rel: Optional[str] = None) -> Counter:
+        pages = [self.pages.get(rel, {})] if rel is not None else self.pages.values()
+        return Counter(f[0] for results in pages for findings in results.values() for f in findings)
+
+    def rows(self) -> List[tuple]:
+        """(gravité, page, vérification, message, nombre), les plus graves d'abord"""
+        rows = [(f[0], rel, check, f[1], f[2])
+                for rel, results in self.pages.items()
+                for check, findings in results.items() for f in findings]
+        return sorted(rows, key=lambda row: (SEVERITIES.index(row[0]) if row[0] in SEVERITIES else 9,
+                                             row[1], row[2]))
+
+    def to_json(self) -> dict:
+        return {
+            'updatedAt': self.updated_at,
+            'pages': len(self.pages),
+            'totals': dict(self.counts()),
+            'findings': {rel: results for rel, results in sorted(self.pages.items())
+                         if any(results.values())},
+        }
+
+    def to_html(self, refresh: int = 2) -> str:
+        totals = self.counts()
+        body = '\n'.join(
+            f'<tr class="{severity.lower()}"><td>{severity}</td><td>{html.escape(rel)}</td>'
+            f'<td>{check}</td><td>{html.escape(str(message))}</td><td class="number">{count}</td></tr>'
+            for severity, rel, check, message, count in self.rows())
+        summary = ' · '.join(f'{severity} : {totals.get(severity, 0)}' for severity in SEVERITIES)
+        return f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta http-equiv="refresh" content="{refresh}">
+    <title>Audit continu des pages - Les Calculateurs</title>
+    <style>
+        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif; background: #f5f5f5; color: #333; margin: 20px; }}
+        table {{ width: 100%; border-collapse: collapse; font-size: 13px; background: white; }}
+        th, td {{ padding: 8px 12px; text-align: left; border-bottom: 1px solid #e0e0e0; vertical-align: top; }}
+        .number {{ text-align: right; }}
+        tr.critical td:first-child {{ color: #c62828; font-weight: 600; }}
+        tr.warning td:first-child {{ color: #ef6c00; }}
+        tr.info td:first-child {{ color: #888; }}
+    </style>
+</head>
+<body>
+    <h1>🔍 Audit continu des pages</h1>
+    <p>{len(self.pages)} pages · {summary} · mis à jour {self.updated_at}</p>
+    <table>
+        <thead><tr><th>Gravité</th><th>Page</th><th>Vérification</th><th>Détail</th><th class="number">Nb</th></tr></thead>
+        <tbody>
+{body}
+        </tbody>
+    </table>
+</body>
+</html>
+"""
+
+
+def write_atomic(path: str, data: str):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(data, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def list_pages(dirs: List[str]) -> List[str]:
+    files = []
+    for directory in dirs:
+        root = Path(directory) if Path(directory).is_absolute() else REPO_ROOT / directory
+        if root.is_dir():
+            files.extend(str(p) for p in sorted(root.rglob('*.html'), key=lambda p: p.as_posix()))
+    return files
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Audit continu des pages (surveillance des dossiers)')
+    parser.add_argument('dirs', nargs='*', help='dossiers surveillés (défaut : src/pages et les miroirs)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='processus pour le passage initial (0 = tous les cœurs, défaut : 1)')
+    parser.add_argument('--json', help='tableau des résultats réécrit après chaque lot (JSON)')
+    parser.add_argument('--html', help='tableau des résultats réécrit après chaque lot (HTML)')
+    parser.add_argument('--polling', action='store_true', help='scrutation au lieu d\'inotify')
+    parser.add_argument('--interval', type=float, default=0.5, help='période de scrutation en secondes')
+    parser.add_argument('--debounce', type=float, default=0.15,
+                        help='silence (s) qui clôt une rafale de modifications (défaut : 0.15)')
+    parser.add_argument('--once', action='store_true', help='passage initial puis sortie')
+    parser.add_argument('--no-cache', action='store_true', help='ignore le cache des résultats')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    dirs = args.dirs or CORPUS_DIRS
+    roots = [str(REPO_ROOT / d) if not Path(d).is_absolute() else d for d in dirs]
+    cache = AuditCache('watch_pages', rules_fingerprint(
+        CACHE_VERSION, sorted(CHECKS), verify_all.CACHE_VERSION, verify_all.CRITICAL_ERRORS,
+        verify_all.GRAMMAR_ERRORS, verify_all.MONTANT_ERRORS, verify_all.SPACE_ERRORS, verify_all.dirs,
+        META_SCOPE, FAQ_JSONLD_RE.pattern, FAQ_MICRODATA_RE.pattern, ENCODING_CLASSES,
+    ), enabled=not args.no_cache)
+    table = FindingsTable()
+
+    def dump():
+        if args.json:
+            write_atomic(args.json, json.dumps(table.to_json(), ensure_ascii=False, indent=2))
+        if args.html:
+            write_atomic(args.html, table.to_html())
+
+    def rescan():
+        start = time.perf_counter()
+        files = list_pages(roots)
+        results = [cache.get(path) for path in files]
+        dirty = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(dirty, scan_files([files[i] for i in dirty], run_checks, args.jobs)):
+            results[i] = result
+            cache.put(files[i], result)
+        cache.save()
+        table.pages.clear()
+        for path, result in zip(files, results):
+            table.update(_relative(path), result)
+        totals = table.counts()
+        print(f"📋 {len(files)} pages en {time.perf_counter() - start:.2f} s "
+              f"({len(dirty)} analysées, {len(files) - len(dirty)} depuis le cache) : "
+              + ', '.join(f'{severity} {totals.get(severity, 0)}' for severity in SEVERITIES))
+        dump()
+
+    rescan()
+    if args.once:
+        return
+
+    watcher = make_watcher(roots, polling=args.polling, interval=args.interval)
+    mode = 'inotify' if type(watcher).__name__ == 'InotifyWatcher' else f'scrutation toutes les {args.interval} s'
+    print(f"👀 Surveillance de {len(roots)} dossiers ({mode}), Ctrl+C pour arrêter")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            changed = collect(watcher, quiet=args.debounce)
+            if changed is None:
+                print("⚠️ File d'événements débordée : nouveau passage complet")
+                rescan()
+                continue
+            if not changed:
+                continue
+            start = time.perf_counter()
+            report = []
+            for path in sorted(changed):
+                rel = _relative(path)
+                before = table.counts(rel)
+                if os.path.exists(path):
+                    result = run_checks(path)
+                    cache.put(path, result)
+                    table.update(rel, result)
+                else:
+                    table.update(rel, None)
+                after = table.counts(rel)
+                report.append((rel, before, after))
+            elapsed = time.perf_counter() - start
+            stamp = datetime.now().strftime('%H:%M:%S')
+            for rel, before, after in report:
+                state = ', '.join(f'{severity} {after.get(severity, 0)}'
+                                  f'{_delta(after.get(severity, 0) - before.get(severity, 0))}'
+                                  for severity in SEVERITIES)
+                icon = '❌' if after.get('CRITICAL') else ('⚠️' if after.get('WARNING') else '✅')
+                print(f"[{stamp}] {icon} {rel} : {state}")
+            print(f"[{stamp}] {len(report)} page(s) réanalysée(s) en {elapsed * 1000:.0f} ms")
+            dump()
+            cache.save()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        cache.save()
+
+
+if __name__ == '__main__':
+    main()
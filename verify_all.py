@@ -3,12 +3,23 @@
 Script de vérification complète et renforcée pour tous les fichiers HTML
 Vérifie: UTF-8, grammaire, orthographe, espacements, symboles
 """
+import argparse
 import os
 import re
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from lib.cache import AuditCache, rules_fingerprint
+from lib.matcher import compile_table
+from lib.profiling import add_profile_argument, enable_from_args, stage
+from lib.regex_rules import RuleRunner, cost_report, write_cost_report
+from lib.scan import list_html_files, read_page, scan_files
+
 dirs = ['src/pages', 'pages_YMYL_FINAL', 'pages_YMYL_FINAL_V2', 'pages_SCHEMA_FINAL', 'pages_YMYL_SAFE']
 
+# À incrémenter quand la logique des fonctions check_* change (invalide le cache)
+CACHE_VERSION = 1
+
 # ============================================================
 # ERREURS CRITIQUES (bloquantes pour la production)
 # ==========================================================
@@ -62,6 +73,9 @@ GRAMMAR_ERRORS = [
     ('€ Le', '• Le', 'puce'),
 ]
 
+# Automate compilé une seule fois : un seul passage sur le texte par fichier
+GRAMMAR_MATCHER = compile_table(GRAMMAR_ERRORS, ignore_case=True)
+
 # ============================================================
 # ERREURS DE MONTANTS (€)
 # ============================================================
@@ -90,6 +104,10 @@ SPACE_ERRORS = [
     (r' €[0-9]', 'espace avant € chiffre'),
 ]
 
+# Motifs compilés une seule fois par processus, temps et correspondances comptés par règle
+MONTANT_RULES = RuleRunner('montants', MONTANT_ERRORS, re.IGNORECASE)
+SPACE_RULES = RuleRunner('espacements', SPACE_ERRORS)
+
 # ============================================================
 # FONCTIONS DE VÉRIFICATION
 # ============================================================
@@ -106,35 +124,67 @@ def check_critical_errors(filepath, content_bytes):
 def check_grammar(filepath, text):
     """Vérifie les erreurs de grammaire"""
     errors = []
-    for wrong, correct, category in GRAMMAR_ERRORS:
-        if wrong.lower() in text.lower():
-            # Compter les occurrences
-            count = text.lower().count(wrong.lower())
-            errors.append(('WARNING', f"{wrong} -> {correct}", count, category))
+    counts = GRAMMAR_MATCHER.counts(text)
+    for index, (wrong, correct, category) in enumerate(GRAMMAR_ERRORS):
+        if index in counts:
+            errors.append(('WARNING', f"{wrong} -> {correct}", counts[index], category))
     return errors
 
 def check_montants(filepath, text):
     """Vérifie les erreurs dans les montants"""
     errors = []
-    for pattern, desc in MONTANT_ERRORS:
-        matches = re.findall(pattern, text, re.IGNORECASE)
+    for rule in MONTANT_RULES:
+        matches = MONTANT_RULES.findall(rule, text)
         if matches:
-            errors.append(('WARNING', f"{desc}: {matches[:3]}", len(matches), 'montant'))
+            errors.append(('WARNING', f"{rule.label}: {matches[:3]}", len(matches), 'montant'))
     return errors
 
 def check_espacements(filepath, text):
     """Vérifie les espacements"""
     errors = []
-    for pattern, desc in SPACE_ERRORS:
-        matches = re.findall(pattern, text)
+    for rule in SPACE_RULES:
+        matches = SPACE_RULES.findall(rule, text)
         if matches:
             # Filtrer les faux positifs (ex: regex JS)
             filtered = [m for m in matches if not any(c in m for c in ['*', '/', "'", '[', ']', '(', ')', '{', '}'])]
             if filtered:
-                errors.append(('INFO', f"{desc}: {len(filtered)}x", len(filtered), 'espacement'))
+                errors.append(('INFO', f"{rule.label}: {len(filtered)}x", len(filtered), 'espacement'))
     return errors
 
+def analyse_file(filepath):
+    """
+    Lit le fichier une seule fois et applique toutes les vérifications.
+    Retourne (critical, grammar, montants, espacements).
+    """
+    try:
+        content_bytes, text = read_page(filepath)
+        with stage('critiques'):
+            critical = check_critical_errors(filepath, content_bytes)
+        with stage('grammaire'):
+            grammar = check_grammar(filepath, text)
+        with stage('montants'):
+            montants = check_montants(filepath, text)
+        with stage('espacements'):
+            espacements = check_espacements(filepath, text)
+        return critical, grammar, montants, espacements
+    except Exception as e:
+        return ([('CRITICAL', f'Erreur lecture: {e}', 1)], [], [], [])
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vérification complète des fichiers HTML")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Nombre de processus (0 = tous les cœurs, 1 = séquentiel)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignorer le cache et réanalyser tous les fichiers")
+    parser.add_argument('--rule-costs', metavar='FICHIER',
+                        help="Écrire le classement complet du coût des règles (JSON)")
+    add_profile_argument(parser)
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    enable_from_args(args)
+
     print("=" * 80)
     print("VÉRIFICATION COMPLÈTE DES FICHIERS HTML")
     print("=" * 80)
@@ -142,81 +192,82 @@ def main():
     all_critical = []
     all_warnings = []
     all_infos = []
-    files_checked = 0
     
-    for dir_path in dirs:
-        if not os.path.exists(dir_path):
-            continue
-            
-        for filename in os.listdir(dir_path):
-            if not filename.endswith('.html'):
-                continue
-                
-            filepath = os.path.join(dir_path, filename)
-            files_checked += 1
-            
-            try:
-                with open(filepath, 'rb') as f:
-                    content_bytes = f.read()
-                
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                
-                file_issues = []
-                
-                # Vérifications
-                critical = check_critical_errors(filepath, content_bytes)
-                grammar = check_grammar(filepath, text)
-                montants = check_montants(filepath, text)
-                espacements = check_espacements(filepath, text)
-                
-                if critical:
-                    all_critical.extend([(filepath, err) for err in critical])
-                    file_issues.extend([f"[CRITIQUE] {err[1]}" for err in critical])
-                
-                if grammar:
-                    all_warnings.extend([(filepath, err) for err in grammar])
-                    file_issues.extend([f"[AVERTISSEMENT] {err[1]}" for err in grammar])
-                
-                if montants:
-                    all_warnings.extend([(filepath, err) for err in montants])
-                    file_issues.extend([f"[MONTANT] {err[1]}" for err in montants])
-                
-                if espacements:
-                    all_infos.extend([(filepath, err) for err in espacements])
-                    
-            except Exception as e:
-                all_critical.append((filepath, ('CRITICAL', f'Erreur lecture: {e}', 1)))
+    with stage('liste'):
+        files = list_html_files(dirs)
+    files_checked = len(files)
+    
+    # Seuls les fichiers modifiés depuis le dernier passage sont réanalysés
+    with stage('cache'):
+        cache = AuditCache('verify_all', rules_fingerprint(
+            CACHE_VERSION, CRITICAL_ERRORS, GRAMMAR_ERRORS, MONTANT_ERRORS, SPACE_ERRORS
+        ), enabled=not args.no_cache, by_content=True)
+        results = [cache.get(filepath) for filepath in files]
+        dirty = [i for i, result in enumerate(results) if result is None]
+        # Pages identiques d'un dossier miroir à l'autre : une seule analyse par contenu
+        groups = cache.group_pending([files[i] for i in dirty])
+    with stage('analyse'):
+        scanned = scan_files([files[dirty[group[0]]] for group in groups], analyse_file, jobs=args.jobs)
+    with stage('cache'):
+        for group, result in zip(groups, scanned):
+            for j in group:
+                results[dirty[j]] = result
+                cache.put(files[dirty[j]], result)
+        cache.save()
+    
+    for filepath, (critical, grammar, montants, espacements) in zip(files, results):
+        if critical:
+            all_critical.extend([(filepath, err) for err in critical])
+        
+        if grammar:
+            all_warnings.extend([(filepath, err) for err in grammar])
+        
+        if montants:
+            all_warnings.extend([(filepath, err) for err in montants])
+        
+        if espacements:
+            all_infos.extend([(filepath, err) for err in espacements])
     
     # ============================================================
     # AFFICHAGE DES RÉSULTATS
     # ============================================================
-    print(f"\nFichiers vérifiés: {files_checked}")
-    print(f"Erreurs critiques: {len(all_critical)}")
-    print(f"Avertissements: {len(all_warnings)}")
-    print(f"Infos: {len(all_infos)}")
+    with stage('affichage'):
+        print(f"\nFichiers vérifiés: {files_checked}")
+        if cache.enabled:
+            print(f"Cache: {cache.hits} réutilisés, {cache.misses} réanalysés")
+        print(f"Erreurs critiques: {len(all_critical)}")
+        print(f"Avertissements: {len(all_warnings)}")
+        print(f"Infos: {len(all_infos)}")
     
-    if all_critical:
-        print("\n" + "=" * 80)
-        print("❌ ERREURS CRITIQUES (bloquantes pour production)")
-        print("=" * 80)
-        current_file = None
-        for filepath, err in all_critical:
-            if filepath != current_file:
-                print(f"\n{filepath}:")
-                current_file = filepath
-            print(f"  ❌ {err[0]}: {err[1]} ({err[2]}x)")
+        if all_critical:
+            print("\n" + "=" * 80)
+            print("❌ ERREURS CRITIQUES (bloquantes pour production)")
+            print("=" * 80)
+            current_file = None
+            for filepath, err in all_critical:
+                if filepath != current_file:
+                    print(f"\n{filepath}:")
+                    current_file = filepath
+                print(f"  ❌ {err[0]}: {err[1]} ({err[2]}x)")
     
-    if all_warnings:
-        print("\n" + "=" * 80)
-        print("⚠️  AVERTISSEMENTS (à corriger)")
-        print("=" * 80)
-        current_file = None
-        for filepath, err in all_warnings[:50]:  # Limiter l'affichage
-            if filepath != current_file:
-                print(f"\n{filepath}:")
-                current_file = filepath
-            print(f"  ⚠️  {err[3]}: {err[1]}")
+        if all_warnings:
+            print("\n" + "=" * 80)
+            print("⚠️  AVERTISSEMENTS (à corriger)")
+            print("=" * 80)
+            current_file = None
+            for filepath, err in all_warnings[:50]:  # Limiter l'affichage
+                if filepath != current_file:
+                    print(f"\n{filepath}:")
+                    current_file = filepath
+                print(f"  ⚠️  {err[3]}: {err[1]}")
+    
+        # Classement des règles regex les plus coûteuses (fichiers réanalysés seulement)
+        costs = cost_report([MONTANT_RULES, SPACE_RULES])
+        if costs:
+            print("\n" + costs)
+        if args.rule_costs:
+            write_cost_report(args.rule_costs, [MONTANT_RULES, SPACE_RULES])
+            print(f"Coût des règles : {args.rule_costs}")
     
     # ============================================================
     # RÉSUMÉ FINAL